@@ -0,0 +1,175 @@
+"""
+Tiered analysis engine with load-aware degradation
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+
+class AnalyzerTier:
+    """A pluggable analysis strategy, registered from most to least expensive"""
+
+    def __init__(self, name, analyze_func, description=''):
+        self.name = name
+        self.analyze_func = analyze_func
+        self.description = description
+
+    def analyze(self, resume_text, job_description, **options):
+        """Run the tier's analysis function"""
+        return self.analyze_func(resume_text, job_description, **options)
+
+
+class LoadController:
+    """Track in-flight analyses and recent latency to decide when to step down a tier"""
+
+    def __init__(self, max_queue_depth=8, p95_latency_ms=3000, window_seconds=30):
+        self.max_queue_depth = max_queue_depth
+        self.p95_latency_ms = p95_latency_ms
+        self.window_seconds = window_seconds
+        self.in_flight = 0
+        self.samples = {}  # tier name -> deque of (timestamp, latency_ms)
+        self.served = {}   # tier name -> request count
+        self.degraded = 0
+        self.lock = threading.Lock()
+
+    def configure(self, max_queue_depth=None, p95_latency_ms=None, window_seconds=None):
+        """Update thresholds without losing collected samples"""
+        with self.lock:
+            if max_queue_depth is not None:
+                self.max_queue_depth = max_queue_depth
+            if p95_latency_ms is not None:
+                self.p95_latency_ms = p95_latency_ms
+            if window_seconds is not None:
+                self.window_seconds = window_seconds
+
+    def _recent(self, tier_name, now):
+        """Drop samples older than the window and return the remaining latencies"""
+        samples = self.samples.get(tier_name)
+        if not samples:
+            return []
+        cutoff = now - self.window_seconds
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        return [latency for _, latency in samples]
+
+    def p95(self, tier_name):
+        """95th percentile latency (ms) of a tier over the window, or None without samples"""
+        with self.lock:
+            latencies = sorted(self._recent(tier_name, time.monotonic()))
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def is_overloaded(self, tier_name):
+        """Whether a tier should not take new work at the current load"""
+        if self.in_flight >= self.max_queue_depth:
+            return True
+        p95 = self.p95(tier_name)
+        return p95 is not None and p95 > self.p95_latency_ms
+
+    def record_degraded(self):
+        """Count a request that was served by a cheaper tier than requested"""
+        with self.lock:
+            self.degraded += 1
+
+    @contextmanager
+    def track(self, tier_name):
+        """Count an analysis as in flight and record its latency when done"""
+        with self.lock:
+            self.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            with self.lock:
+                self.in_flight -= 1
+                self.samples.setdefault(tier_name, deque(maxlen=1000)).append(
+                    (end, (end - start) * 1000)
+                )
+                self.served[tier_name] = self.served.get(tier_name, 0) + 1
+
+    def snapshot(self, tier_names):
+        """Current load figures for status reporting"""
+        p95s = {name: self.p95(name) for name in tier_names}
+        with self.lock:
+            return {
+                'in_flight': self.in_flight,
+                'max_queue_depth': self.max_queue_depth,
+                'p95_latency_threshold_ms': self.p95_latency_ms,
+                'p95_latency_ms': {name: round(value, 2) if value is not None else None
+                                   for name, value in p95s.items()},
+                'served': dict(self.served),
+                'degraded': self.degraded
+            }
+
+
+class AnalysisEngine:
+    """Single entry point for analyses; picks a tier per request"""
+
+    def __init__(self):
+        self.tiers = OrderedDict()
+        self.default_tier = None
+        self.controller = LoadController()
+
+    def register_tier(self, name, analyze_func, description=''):
+        """Register a tier; tiers must be registered from most to least expensive"""
+        self.tiers[name] = AnalyzerTier(name, analyze_func, description)
+        if self.default_tier is None:
+            self.default_tier = name
+
+    def configure(self, config):
+        """Apply ANALYZER_* settings from a Flask config mapping"""
+        default_tier = config.get('ANALYZER_DEFAULT_TIER')
+        if default_tier:
+            self.default_tier = default_tier
+        self.controller.configure(
+            max_queue_depth=config.get('ANALYZER_MAX_QUEUE_DEPTH'),
+            p95_latency_ms=config.get('ANALYZER_P95_LATENCY_MS'),
+            window_seconds=config.get('ANALYZER_LATENCY_WINDOW_SECONDS')
+        )
+
+    def select_tier(self, requested=None):
+        """Return (tier name, degraded) for a request, stepping down while overloaded"""
+        names = list(self.tiers.keys())
+        if not names:
+            raise RuntimeError('No analyzer tiers registered')
+
+        name = requested or self.default_tier
+        if name not in self.tiers:
+            raise ValueError(f"Unknown analyzer tier '{name}'. Available tiers: {', '.join(names)}")
+
+        position = names.index(name)
+        while position < len(names) - 1 and self.controller.is_overloaded(names[position]):
+            position += 1
+
+        return names[position], names[position] != name
+
+    def analyze(self, resume_text, job_description, tier=None, **options):
+        """Analyze a resume against a job description with the selected tier"""
+        tier_name, degraded = self.select_tier(tier)
+        if degraded:
+            self.controller.record_degraded()
+
+        with self.controller.track(tier_name):
+            result = self.tiers[tier_name].analyze(resume_text, job_description, **options)
+
+        result['tier'] = tier_name
+        result['degraded'] = degraded
+        return result
+
+    def status(self):
+        """Registered tiers and current load"""
+        return {
+            'default_tier': self.default_tier,
+            'tiers': [{'name': tier.name, 'description': tier.description}
+                      for tier in self.tiers.values()],
+            'load': self.controller.snapshot(list(self.tiers.keys()))
+        }
+
+
+# Shared engine instance; route modules register their tiers on import
+analysis_engine = AnalysisEngine()
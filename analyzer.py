@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_cors import cross_origin
 from flask_login import current_user, login_required
 import spacy
@@ -7,14 +7,30 @@ from collections import Counter
 import PyPDF2
 import docx
 import io
+from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
-from src.utils.skill_database import SKILL_DATABASE, get_relevant_skills_for_job, get_skill_weight
-from src.models import db, User, Resume, Analysis, JobDescription
+from functools import partial
+from sqlalchemy.orm import undefer_group
+from src.utils.skill_vocab import skill_vocab
+from src.utils.scoring_model import scoring_model
+from src.utils.analysis_engine import analysis_engine
+from src.utils.deadline import Deadline, choose_stage
+from src.utils.write_behind import WriteBehindWriter, IdAllocator
+from src.utils.pagination import keyset_page
+from src.utils.user_cache import user_cache
+from src.utils.passwords import password_hasher
+from src.utils.rate_limit import rate_limiter, rate_limited
+from src.utils.api_tokens import api_tokens, scope_required
+from src.routes.analyzer_demo import extract_keywords_simple, calculate_similarity_simple
+from src.models import db, User, Resume, ResumeStats, Analysis, AnalysisArchive, AnalysisSkill, JobDescription
 
 analyzer_bp = Blueprint('analyzer', __name__)
 
+# Largest page served by cursor-paginated history
+MAX_PER_PAGE = 100
+
 # Load spaCy model
 nlp = spacy.load('en_core_web_sm')
 
@@ -51,27 +67,13 @@ def preprocess_text(text):
 
 def extract_skills(text, job_description=None):
     """Extract skills from text using comprehensive skill database"""
-    text = preprocess_text(text)
-    found_skills = {}
-    
     # Get relevant skill categories based on job description
-    if job_description:
-        relevant_categories = get_relevant_skills_for_job(job_description)
-    else:
-        relevant_categories = list(SKILL_DATABASE.keys())
-    
-    for category in relevant_categories:
-        if category in SKILL_DATABASE:
-            found_skills[category] = []
-            skills_list = SKILL_DATABASE[category]['keywords']
-            
-            for skill in skills_list:
-                # Use word boundaries to avoid partial matches
-                pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-                if re.search(pattern, text):
-                    found_skills[category].append(skill)
+    model = scoring_model.current()
+    vocab = model.vocab
+    relevant_mask = model.relevant_mask(job_description) if job_description else vocab.all_mask
     
-    return found_skills
+    bits = vocab.encode(preprocess_text(text)) & relevant_mask
+    return vocab.decode(bits, vocab.categories_of(relevant_mask))
 
 def extract_keywords_nlp(text, top_n=20):
     """Extract important keywords using NLP"""
@@ -108,123 +110,287 @@ def calculate_similarity(resume_text, job_description):
     except:
         return 0.0
 
-def analyze_resume_job_match(resume_text, job_description):
-    """Main analysis function with improved scoring"""
-    # Preprocess texts
-    resume_clean = preprocess_text(resume_text)
-    job_clean = preprocess_text(job_description)
+# Pipeline stages needed to produce each output field
+FIELD_STAGES = {
+    'similarity_score': {'similarity'},
+    'skill_match_score': {'skills'},
+    'composite_score': {'skills', 'similarity'},
+    'resume_skills': {'skills'},
+    'job_skills': {'skills'},
+    'matching_skills': {'skills'},
+    'missing_skills': {'skills'},
+    'resume_skill_forms': {'skills'},
+    'job_skill_forms': {'skills'},
+    'resume_keywords': {'keywords'},
+    'job_keywords': {'keywords'},
+    'matching_keywords': {'keywords'},
+    'missing_keywords': {'keywords'},
+    'recommendations': {'skills', 'keywords', 'similarity'}
+}
+
+def parse_fields(fields_param):
+    """Parse a comma-separated ?fields= value into a set of output fields (None means all)"""
+    if not fields_param:
+        return None
+    
+    fields = {field.strip() for field in fields_param.split(',') if field.strip()}
+    unknown = fields - set(FIELD_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                         f"Available fields: {', '.join(FIELD_STAGES)}")
+    return fields
+
+def analyze_resume_job_match(resume_text, job_description,
+                             extract_keywords=extract_keywords_nlp,
+                             similarity=calculate_similarity,
+                             deadline=None, fields=None):
+    """Main analysis function with improved scoring
     
-    # Extract skills from both (pass job description for context-aware extraction)
-    resume_skills = extract_skills(resume_text, job_description)
-    job_skills = extract_skills(job_description)
+    Only the stages needed for the requested fields run (all fields when
+    fields is None). Skill extraction always runs when needed. Keyword
+    extraction and similarity are degraded to their cheap implementations
+    (or keywords skipped) when the optional deadline does not leave enough
+    time for them.
+    """
+    if fields is None:
+        fields = set(FIELD_STAGES)
+    stages = set().union(*(FIELD_STAGES[field] for field in fields))
     
-    # Extract keywords
-    resume_keywords = extract_keywords_nlp(resume_text)
-    job_keywords = extract_keywords_nlp(job_description)
+    # One model (and the vocabulary it was compiled against) for the whole
+    # analysis, even if a new one is swapped in meanwhile
+    model = scoring_model.current()
+    vocab = model.vocab
     
-    # Calculate overall similarity
-    similarity_score = calculate_similarity(resume_clean, job_clean)
+    # Preprocess texts
+    resume_clean = preprocess_text(resume_text)
+    job_clean = preprocess_text(job_description)
     
-    # Find matching and missing skills with weighted scoring
-    matching_skills = {}
-    missing_skills = {}
-    skill_match_score = 0
-    total_job_skills = 0
+    result = {}
     
-    for category in job_skills.keys():
-        resume_cat_skills = set(resume_skills.get(category, []))
-        job_cat_skills = set(job_skills.get(category, []))
+    if 'skills' in stages:
+        # Skill sets as vocabulary bitsets; the resume is limited to the
+        # categories relevant to the job description
+        relevant_mask = model.relevant_mask(job_description)
+        resume_bits, resume_forms = vocab.encode_forms(resume_clean)
+        resume_bits &= relevant_mask
+        job_bits, job_forms = vocab.encode_forms(job_clean)
         
-        matching_skills[category] = list(resume_cat_skills.intersection(job_cat_skills))
-        missing_skills[category] = list(job_cat_skills - resume_cat_skills)
+        # Weighted share of the job's skills per category found in the resume
+        skill_match_score = vocab.match_score(resume_bits, vocab.job_profile(job_bits, model.category_weights))
         
-        # Calculate weighted skill match score
-        category_weight = get_skill_weight(category)
-        matched_count = len(matching_skills[category])
-        total_count = len(job_cat_skills)
+        resume_skills = vocab.decode(resume_bits, vocab.categories_of(relevant_mask))
+        job_skills = vocab.decode(job_bits)
+        matching_skills = vocab.decode(resume_bits & job_bits)
+        missing_skills = vocab.decode(job_bits & ~resume_bits)
         
-        if total_count > 0:
-            skill_match_score += (matched_count / total_count) * category_weight
-            total_job_skills += category_weight
+        result.update({
+            'skill_match_score': round(skill_match_score, 2),
+            'resume_skills': resume_skills,
+            'job_skills': job_skills,
+            'matching_skills': matching_skills,
+            'missing_skills': missing_skills,
+            # Skills found under an alias or a typo: {canonical skill: [forms in the text]}
+            'resume_skill_forms': vocab.surface_forms(resume_bits, resume_forms),
+            'job_skill_forms': vocab.surface_forms(job_bits, job_forms)
+        })
     
-    # Normalize skill match score
-    if total_job_skills > 0:
-        skill_match_score = (skill_match_score / total_job_skills) * 100
-    else:
-        skill_match_score = 0
-    
-    # Find matching keywords
-    matching_keywords = list(set(resume_keywords).intersection(set(job_keywords)))
-    missing_keywords = list(set(job_keywords) - set(resume_keywords))
-    
-    # Calculate composite score (weighted average)
-    composite_score = (similarity_score * 0.4 + (skill_match_score / 100) * 0.6) * 100
-    
-    # Generate recommendations
-    recommendations = generate_recommendations(missing_skills, missing_keywords, composite_score, skill_match_score)
-    
-    return {
-        'similarity_score': round(similarity_score * 100, 2),
-        'skill_match_score': round(skill_match_score, 2),
-        'composite_score': round(composite_score, 2),
-        'resume_skills': resume_skills,
-        'job_skills': job_skills,
-        'matching_skills': matching_skills,
-        'missing_skills': missing_skills,
-        'resume_keywords': resume_keywords,
-        'job_keywords': job_keywords,
-        'matching_keywords': matching_keywords,
-        'missing_keywords': missing_keywords[:10],  # Limit to top 10
-        'recommendations': recommendations
-    }
+    if 'keywords' in stages:
+        # Extract keywords (optional stage)
+        keyword_func = choose_stage(deadline, 'keywords', extract_keywords, extract_keywords_simple)
+        if keyword_func:
+            resume_keywords = keyword_func(resume_text)
+            job_keywords = keyword_func(job_description)
+        else:
+            resume_keywords = []
+            job_keywords = []
+        
+        # Find matching keywords
+        matching_keywords = list(set(resume_keywords).intersection(set(job_keywords)))
+        missing_keywords = list(set(job_keywords) - set(resume_keywords))
+        
+        result.update({
+            'resume_keywords': resume_keywords,
+            'job_keywords': job_keywords,
+            'matching_keywords': matching_keywords,
+            'missing_keywords': missing_keywords[:10]  # Limit to top 10
+        })
+    
+    if 'similarity' in stages:
+        # Calculate overall similarity (degradable, never skipped)
+        similarity_func = choose_stage(deadline, 'similarity', similarity, calculate_similarity_simple)
+        similarity_score = similarity_func(resume_clean, job_clean)
+        result['similarity_score'] = round(similarity_score * 100, 2)
+    
+    if 'skills' in stages and 'similarity' in stages:
+        # Calculate composite score (weighted average)
+        composite_score = model.composite_score(similarity_score * 100, skill_match_score)
+        result['composite_score'] = round(composite_score, 2)
+    
+    if 'recommendations' in fields:
+        # Generate recommendations
+        result['recommendations'] = generate_recommendations(
+            missing_skills, missing_keywords, composite_score, skill_match_score, model
+        )
+    
+    # Drop intermediate outputs that were computed only as dependencies
+    result = {field: value for field, value in result.items() if field in fields}
+    
+    result['scoring_model_version'] = model.version
+    
+    if deadline is not None:
+        result['partial'] = deadline.partial
+        result['deadline'] = deadline.report()
+    
+    return result
 
-def generate_recommendations(missing_skills, missing_keywords, composite_score, skill_match_score):
-    """Generate actionable recommendations with improved scoring"""
+def generate_recommendations(missing_skills, missing_keywords, composite_score, skill_match_score, model=None):
+    """Generate actionable recommendations with improved scoring
+    
+    Thresholds and limits come from the scoring model (the current one when
+    model is None).
+    """
+    model = model or scoring_model.current()
     recommendations = []
     
     # Overall score assessment
-    if composite_score < 30:
+    low, moderate, good = model.composite_thresholds
+    if composite_score < low:
         recommendations.append("Your resume has low alignment with this job. Consider significant tailoring to match the requirements.")
-    elif composite_score < 50:
+    elif composite_score < moderate:
         recommendations.append("Your resume shows moderate alignment. Focus on highlighting relevant experience and skills.")
-    elif composite_score < 70:
+    elif composite_score < good:
         recommendations.append("Good alignment! Consider minor adjustments to strengthen your application.")
     else:
         recommendations.append("Excellent match! Your resume aligns very well with the job requirements.")
     
     # Skill-specific recommendations (prioritize by category weight)
-    priority_categories = ['programming_languages', 'data_science', 'cloud_platforms', 'databases']
+    priority_categories = model.priority_categories
     
     for category in priority_categories:
         if category in missing_skills and missing_skills[category]:
-            skills = missing_skills[category][:3]  # Top 3 missing skills
+            skills = missing_skills[category][:model.priority_skills_shown]
             category_name = category.replace('_', ' ').title()
             recommendations.append(f"Consider adding {category_name.lower()}: {', '.join(skills)}")
     
     # Handle other categories
     for category, skills in missing_skills.items():
         if category not in priority_categories and skills:
-            skills_subset = skills[:2]  # Top 2 for other categories
+            skills_subset = skills[:model.other_skills_shown]
             category_name = category.replace('_', ' ').title()
             recommendations.append(f"Include {category_name.lower()}: {', '.join(skills_subset)}")
     
     # Keyword recommendations
-    if len(missing_keywords) > 3:
-        recommendations.append(f"Include these important keywords: {', '.join(missing_keywords[:5])}")
+    if len(missing_keywords) >= model.min_missing_keywords:
+        recommendations.append(f"Include these important keywords: {', '.join(missing_keywords[:model.missing_keywords_shown])}")
     
     # Skill match specific advice
-    if skill_match_score < 40:
+    if skill_match_score < model.skill_match_low:
         recommendations.append("Focus on developing the key technical skills mentioned in the job description.")
-    elif skill_match_score > 80:
+    elif skill_match_score > model.skill_match_high:
         recommendations.append("Strong technical skill match! Ensure your experience examples demonstrate these skills.")
     
-    return recommendations[:8]  # Limit to 8 recommendations
+    return recommendations[:model.max_recommendations]
+
+# Analyzer tiers, most to least expensive. Under load the engine steps down
+# from the spaCy/TF-IDF tier to the keyword tier instead of queueing requests.
+analysis_engine.register_tier(
+    'full',
+    analyze_resume_job_match,
+    'spaCy keyword extraction and TF-IDF similarity'
+)
+analysis_engine.register_tier(
+    'keyword',
+    partial(analyze_resume_job_match,
+            extract_keywords=extract_keywords_simple,
+            similarity=calculate_similarity_simple),
+    'Frequency keyword extraction and word-overlap similarity'
+)
+
+def persist_analysis(job):
+    """Add the Resume, JobDescription and Analysis rows for an analysis to the session
+    
+    The caller commits, so the same function serves synchronous saves and
+    batched write-behind commits.
+    """
+    analysis_result = job['result']
+    
+    # Save or update resume
+    resume = Resume.query.filter_by(
+        user_id=job['user_id'],
+        filename=job['filename']
+    ).first()
+    
+    if not resume:
+        resume = Resume(
+            user_id=job['user_id'],
+            filename=job['filename'],
+            content=job['resume_text'],
+            file_type=job['filename'].split('.')[-1].lower()
+        )
+        db.session.add(resume)
+        db.session.flush()  # Get the ID
+    
+    # Reuse the job description entry for a posting analyzed before
+    job_desc = JobDescription.find_or_create(
+        job['job_description'],
+        title="Analyzed Position",
+        job_family=scoring_model.current().job_family(job['job_description'])
+    )
+    
+    # Save analysis (write-behind rows carry a pre-allocated id)
+    analysis = Analysis(
+        id=job.get('analysis_id'),
+        user_id=job['user_id'],
+        resume_id=resume.id,
+        job_description_id=job_desc.id,
+        composite_score=analysis_result['composite_score'],
+        similarity_score=analysis_result['similarity_score'],
+        skill_match_score=analysis_result['skill_match_score'],
+        created_at=job['created_at'],
+        analysis_version=analysis_result.get('scoring_model_version')
+    )
+    
+    # Set JSON fields
+    analysis.set_matching_keywords(analysis_result['matching_keywords'])
+    analysis.set_missing_keywords(analysis_result['missing_keywords'])
+    analysis.set_matching_skills(analysis_result['matching_skills'])
+    analysis.set_missing_skills(analysis_result['missing_skills'])
+    analysis.set_job_skills(analysis_result['job_skills'])
+    analysis.set_recommendations(analysis_result['recommendations'])
+    analysis.index_skills()
+    
+    db.session.add(analysis)
+    return analysis
+
+# Optional write-behind persistence (ANALYSIS_WRITE_BEHIND), see src/utils/write_behind.py
+analysis_writer = WriteBehindWriter(persist_analysis)
+analysis_id_allocator = IdAllocator('analysis')
+
+@analyzer_bp.record_once
+def configure_scoring_model(state):
+    """Load the skill vocabulary (SKILL_VOCAB_PATH) and the scoring model (SCORING_MODEL_PATH) when the blueprint is registered"""
+    skill_vocab.configure(state.app)
+    scoring_model.configure(state.app)
+
+@analyzer_bp.record_once
+def configure_analysis_engine(state):
+    """Apply ANALYZER_* settings and start the write-behind writer when the blueprint is registered"""
+    analysis_engine.configure(state.app.config)
+    analysis_writer.configure(state.app)
 
 @analyzer_bp.route('/analyze', methods=['POST'])
 @cross_origin()
+@scope_required('analyze')
+@rate_limited('analyze')
 def analyze_resume():
     """Main endpoint for resume analysis"""
     try:
+        # Start the clock before text extraction so the deadline covers the whole request
+        try:
+            deadline = Deadline.from_request(request, current_app.config)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Check if file is uploaded
         if 'resume' not in request.files:
             return jsonify({'error': 'No resume file uploaded'}), 400
@@ -241,69 +407,65 @@ def analyze_resume():
         if resume_text.startswith('Error'):
             return jsonify({'error': resume_text}), 400
         
-        # Perform analysis
-        analysis_result = analyze_resume_job_match(resume_text, job_description)
+        # Perform analysis with the requested (or load-adjusted) tier,
+        # computing only the requested fields
+        tier = request.args.get('tier') or request.form.get('tier')
+        try:
+            fields = parse_fields(request.args.get('fields') or request.form.get('fields'))
+            analysis_result = analysis_engine.analyze(resume_text, job_description,
+                                                      tier=tier, deadline=deadline, fields=fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Only complete analyses are saved; field projections are not persisted
+        save_analysis = current_user.is_authenticated and fields is None
         
         # Save to database if user is authenticated
-        if current_user.is_authenticated:
-            try:
-                # Save or update resume
-                resume = Resume.query.filter_by(
-                    user_id=current_user.id,
-                    filename=resume_file.filename
-                ).first()
-                
-                if not resume:
-                    resume = Resume(
-                        user_id=current_user.id,
-                        filename=resume_file.filename,
-                        content=resume_text,
-                        file_type=resume_file.filename.split('.')[-1].lower()
-                    )
-                    db.session.add(resume)
-                    db.session.flush()  # Get the ID
-                
-                # Create job description entry
-                job_desc = JobDescription(
-                    title="Analyzed Position",
-                    content=job_description
-                )
-                db.session.add(job_desc)
-                db.session.flush()  # Get the ID
-                
-                # Save analysis
-                analysis = Analysis(
-                    user_id=current_user.id,
-                    resume_id=resume.id,
-                    job_description_id=job_desc.id,
-                    composite_score=analysis_result['composite_score'],
-                    similarity_score=analysis_result['similarity_score'],
-                    skill_match_score=analysis_result['skill_match_score']
-                )
-                
-                # Set JSON fields
-                analysis.set_matching_keywords(analysis_result['matching_keywords'])
-                analysis.set_missing_keywords(analysis_result['missing_keywords'])
-                analysis.set_matching_skills(analysis_result['matching_skills'])
-                analysis.set_missing_skills(analysis_result['missing_skills'])
-                analysis.set_job_skills(analysis_result['job_skills'])
-                analysis.set_recommendations(analysis_result['recommendations'])
-                
-                db.session.add(analysis)
-                db.session.commit()
-                
-                # Add analysis ID to result
-                analysis_result['analysis_id'] = analysis.id
-                
-            except Exception as e:
-                db.session.rollback()
-                print(f"Database error: {e}")
-                # Continue without saving to database
+        persistence = None
+        if save_analysis:
+            job = {
+                'user_id': current_user.id,
+                'filename': resume_file.filename,
+                'resume_text': resume_text,
+                'job_description': job_description,
+                'result': analysis_result,
+                'created_at': datetime.utcnow()
+            }
+            
+            # Write-behind: respond with a pre-allocated id, commit in the background
+            if analysis_writer.enabled:
+                try:
+                    job['analysis_id'] = analysis_id_allocator.next_id()
+                    if analysis_writer.submit(job['analysis_id'], job):
+                        analysis_result['analysis_id'] = job['analysis_id']
+                        persistence = 'queued'
+                except Exception as e:
+                    print(f"Write-behind unavailable, saving synchronously: {e}")
+            
+            if persistence is None:
+                try:
+                    # Rows of reserved id blocks may still be queued: with
+                    # write-behind on, a synchronous insert takes its id from
+                    # a block too, never the table's next rowid
+                    if analysis_writer.enabled and job.get('analysis_id') is None:
+                        job['analysis_id'] = analysis_id_allocator.next_id()
+                    analysis = persist_analysis(job)
+                    db.session.commit()
+                    
+                    # Add analysis ID to result
+                    analysis_result['analysis_id'] = analysis.id
+                    persistence = 'committed'
+                    
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Database error: {e}")
+                    # Continue without saving to database
         
         return jsonify({
             'success': True,
             'analysis': analysis_result,
-            'saved': current_user.is_authenticated
+            'saved': save_analysis,
+            'persistence': persistence
         })
         
     except Exception as e:
@@ -312,18 +474,72 @@ def analyze_resume():
 @analyzer_bp.route('/history', methods=['GET'])
 @login_required
 @cross_origin()
+@scope_required('read')
 def get_analysis_history():
-    """Get user's analysis history"""
+    """Get user's analysis history
+    
+    Offset pagination (?page=) by default. Passing ?cursor= (empty for the
+    first page) switches to keyset pagination, which returns an opaque
+    next_cursor and only counts the total with ?include_total=true.
+    
+    Rows are summaries built from the scalar columns only; ?detail=true
+    loads and decodes the full analyses. ?skill=<name>&skill_status=missing
+    (or matching) limits the history to analyses with that job skill.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        detail = request.args.get('detail', '').lower() in ('1', 'true', 'yes')
+        
+        if detail:
+            base_query = Analysis.query.options(undefer_group('detail'))
+            serialize = Analysis.to_dict
+        else:
+            base_query = Analysis.summary_query()
+            serialize = Analysis.summary_dict
+        base_query = base_query.filter(Analysis.user_id == current_user.id)
         
-        analyses = Analysis.query.filter_by(user_id=current_user.id)\
-            .order_by(Analysis.created_at.desc())\
+        # Skill filter, answered from the analysis_skill index
+        skill = request.args.get('skill', '').strip().lower()
+        if skill:
+            skill_status = request.args.get('skill_status', 'missing')
+            if skill_status not in ('matching', 'missing'):
+                return jsonify({'error': 'skill_status must be matching or missing'}), 400
+            base_query = base_query.filter(Analysis.id.in_(
+                db.select(AnalysisSkill.analysis_id).where(
+                    AnalysisSkill.user_id == current_user.id,
+                    AnalysisSkill.skill == skill,
+                    AnalysisSkill.status == skill_status
+                )
+            ))
+        
+        if 'cursor' in request.args:
+            per_page = max(1, min(per_page, MAX_PER_PAGE))
+            try:
+                analyses, next_cursor = keyset_page(
+                    base_query, Analysis.created_at, Analysis.id,
+                    cursor=request.args.get('cursor'), per_page=per_page
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            result = {
+                'analyses': [serialize(analysis) for analysis in analyses],
+                'next_cursor': next_cursor,
+                'per_page': per_page
+            }
+            if request.args.get('include_total', '').lower() in ('1', 'true', 'yes'):
+                result['total'] = base_query.order_by(None).count()
+            
+            return jsonify(result)
+        
+        page = request.args.get('page', 1, type=int)
+        
+        analyses = base_query\
+            .order_by(Analysis.created_at.desc(), Analysis.id.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
         
         result = {
-            'analyses': [analysis.to_dict() for analysis in analyses.items],
+            'analyses': [serialize(analysis) for analysis in analyses.items],
             'total': analyses.total,
             'pages': analyses.pages,
             'current_page': page,
@@ -338,15 +554,23 @@ def get_analysis_history():
 @analyzer_bp.route('/analysis/<int:analysis_id>', methods=['GET'])
 @login_required
 @cross_origin()
+@scope_required('read')
 def get_analysis(analysis_id):
     """Get specific analysis by ID"""
     try:
-        analysis = Analysis.query.filter_by(
+        analysis = Analysis.query.options(undefer_group('detail')).filter_by(
             id=analysis_id,
             user_id=current_user.id
         ).first()
         
         if not analysis:
+            # Acknowledged by the write-behind writer but not committed yet
+            if analysis_writer.is_pending(analysis_id):
+                return jsonify({'success': True, 'pending': True}), 202
+            # Moved out by the retention job
+            archived = AnalysisArchive.query.filter_by(id=analysis_id, user_id=current_user.id).first()
+            if archived:
+                return jsonify({'success': True, 'analysis': archived.to_dict()})
             return jsonify({'error': 'Analysis not found'}), 404
         
         return jsonify({
@@ -360,22 +584,25 @@ def get_analysis(analysis_id):
 @analyzer_bp.route('/resumes', methods=['GET'])
 @login_required
 @cross_origin()
+@scope_required('read')
 def get_user_resumes():
     """Get user's saved resumes"""
     try:
-        resumes = Resume.query.filter_by(
-            user_id=current_user.id,
-            is_active=True
-        ).order_by(Resume.uploaded_at.desc()).all()
+        # Analysis counts come from resume_stats in the same query
+        resumes = db.session.query(Resume, ResumeStats.analysis_count)\
+            .outerjoin(ResumeStats, ResumeStats.resume_id == Resume.id)\
+            .filter(Resume.user_id == current_user.id, Resume.is_active == True)\
+            .order_by(Resume.uploaded_at.desc())\
+            .all()
         
         result = []
-        for resume in resumes:
+        for resume, analysis_count in resumes:
             result.append({
                 'id': resume.id,
                 'filename': resume.filename,
                 'file_type': resume.file_type,
                 'uploaded_at': resume.uploaded_at.isoformat(),
-                'analysis_count': len(resume.analyses)
+                'analysis_count': analysis_count or 0
             })
         
         return jsonify({
@@ -392,3 +619,17 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Resume analyzer is running'})
 
+@analyzer_bp.route('/status', methods=['GET'])
+@cross_origin()
+def analyzer_status():
+    """Analyzer tiers, current load and write-behind queue"""
+    status = analysis_engine.status()
+    status['write_behind'] = analysis_writer.status()
+    status['user_cache'] = user_cache.status()
+    status['password_hasher'] = password_hasher.status()
+    status['rate_limits'] = rate_limiter.status()
+    status['api_tokens'] = api_tokens.status()
+    status['scoring_model'] = scoring_model.status()
+    status['skill_vocab'] = skill_vocab.status()
+    return jsonify(status)
+
@@ -239,13 +239,11 @@ def analyze_resume():
                     db.session.add(resume)
                     db.session.flush()  # Get the ID
                 
-                # Create job description entry
-                job_desc = JobDescription(
-                    title="Analyzed Position",
-                    content=job_description
+                # Reuse the job description entry for a posting analyzed before
+                job_desc = JobDescription.find_or_create(
+                    job_description,
+                    title="Analyzed Position"
                 )
-                db.session.add(job_desc)
-                db.session.flush()  # Get the ID
                 
                 # Save analysis
                 analysis = Analysis(
@@ -264,6 +262,7 @@ def analyze_resume():
                 analysis.set_missing_skills(analysis_result['missing_skills'])
                 analysis.set_job_skills(analysis_result['job_skills'])
                 analysis.set_recommendations(analysis_result['recommendations'])
+                analysis.index_skills()
                 
                 db.session.add(analysis)
                 db.session.commit()
@@ -0,0 +1,224 @@
+"""
+Signed bearer tokens for programmatic API clients
+
+A token is 'rat_<payload>.<signature>': the payload (base64url JSON) holds
+the user id, username, scopes, expiry and a random token id, and the
+signature is an HMAC-SHA256 over it with a key derived from
+API_TOKEN_SECRET (SECRET_KEY by default). Checking a token needs no
+database access, so a client sending Authorization: Bearer on every
+request costs an HMAC and a set lookup.
+
+Each issued token is recorded in user_session under its token id (the
+token itself is never stored). Revoking a token marks that row inactive
+and adds the id to an in-memory denylist; other processes pick it up when
+they next sync the denylist from user_session, at most every
+API_TOKEN_DENYLIST_SYNC_SECONDS.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import jsonify
+from flask_login import UserMixin, current_user
+from src.models import db, UserSession
+from src.utils.user_cache import user_cache
+
+TOKEN_PREFIX = 'rat_'
+SCOPES = ('analyze', 'read', 'search', 'export')
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def parse_scopes(scopes):
+    """Validated scope tuple from a list or space-separated string; None means all scopes"""
+    if scopes is None:
+        return SCOPES
+    if isinstance(scopes, str):
+        scopes = scopes.split()
+    unknown = [scope for scope in scopes if scope not in SCOPES]
+    if unknown or not scopes:
+        raise ValueError(f"scopes must be a non-empty list of: {', '.join(SCOPES)}")
+    return tuple(scope for scope in SCOPES if scope in scopes)
+
+
+class TokenUser(UserMixin):
+    """current_user for a request authenticated by a bearer token
+
+    Built from the token alone. Columns the token does not carry are read
+    through the user cache when first used.
+    """
+
+    def __init__(self, id, username, scopes, token_id):
+        self.id = id
+        self.username = username
+        self.scopes = frozenset(scopes)
+        self.token_id = token_id
+
+    def has_scope(self, scope):
+        return scope in self.scopes
+
+    @property
+    def email(self):
+        return user_cache.get(self.id).email
+
+    @property
+    def created_at(self):
+        return user_cache.get(self.id).created_at
+
+    def __repr__(self):
+        return f'<TokenUser {self.username}>'
+
+
+class ApiTokens:
+    def __init__(self):
+        self._key = None
+        self.ttl_days = 30
+        self.max_ttl_days = 365
+        self.sync_interval = 30.0
+        self._denylist = frozenset()
+        self._synced_at = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.verified = 0
+        self.rejected = 0
+
+    def configure(self, app):
+        config = app.config
+        secret = config.get('API_TOKEN_SECRET') or config['SECRET_KEY']
+        # A key of its own, so tokens and session cookies never share a signature
+        self._key = hmac.new(secret.encode(), b'api-token-v1', hashlib.sha256).digest()
+        self.ttl_days = config.get('API_TOKEN_TTL_DAYS', self.ttl_days)
+        self.max_ttl_days = config.get('API_TOKEN_MAX_TTL_DAYS', self.max_ttl_days)
+        self.sync_interval = config.get('API_TOKEN_DENYLIST_SYNC_SECONDS', self.sync_interval)
+        self._denylist = frozenset()
+        self._synced_at = None
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self._key, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, user, scopes=None, ttl_days=None, name=None):
+        """Record a new token for user; returns (token, UserSession). The caller commits."""
+        scopes = parse_scopes(scopes)
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        if not 0 < ttl_days <= self.max_ttl_days:
+            raise ValueError(f'ttl_days must be between 1 and {self.max_ttl_days}')
+
+        token_id = secrets.token_urlsafe(16)
+        expires_at = datetime.utcnow().replace(microsecond=0) + timedelta(days=ttl_days)
+        record = UserSession(user_id=user.id, session_token=token_id, expires_at=expires_at,
+                             is_active=True, name=name, scopes=' '.join(scopes))
+        db.session.add(record)
+
+        payload = _b64encode(json.dumps({
+            'u': user.id,
+            'n': user.username,
+            's': ' '.join(scopes),
+            'e': int((expires_at - datetime(1970, 1, 1)).total_seconds()),
+            'j': token_id
+        }, separators=(',', ':')).encode())
+        return f'{TOKEN_PREFIX}{payload}.{self._sign(payload)}', record
+
+    def verify(self, token):
+        """TokenUser for a valid, unexpired, unrevoked token, or None"""
+        user = self._verify(token)
+        with self._lock:
+            if user is None:
+                self.rejected += 1
+            else:
+                self.verified += 1
+        return user
+
+    def _verify(self, token):
+        # Signing and compare_digest only take ASCII: anything else is no token of ours
+        if self._key is None or not token.isascii() or not token.startswith(TOKEN_PREFIX):
+            return None
+        payload, _, signature = token[len(TOKEN_PREFIX):].partition('.')
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims['e'] <= time.time():
+            return None
+        self._maybe_sync()
+        if claims['j'] in self._denylist:
+            return None
+        return TokenUser(claims['u'], claims['n'], claims['s'].split(), claims['j'])
+
+    def load_user(self, request):
+        """Flask-Login request loader: the user for an Authorization: Bearer header"""
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return None
+        return self.verify(token.strip())
+
+    def _maybe_sync(self):
+        """Refresh the denylist from user_session once it is older than sync_interval"""
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        # One thread refreshes; the others keep using the current list
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self.sync_denylist()
+        finally:
+            self._sync_lock.release()
+
+    def sync_denylist(self):
+        """Load the ids of revoked tokens that have not expired yet"""
+        synced_at = time.monotonic()
+        revoked = db.session.query(UserSession.session_token).filter(
+            UserSession.is_active.is_(False),
+            UserSession.expires_at > datetime.utcnow()
+        ).all()
+        with self._lock:
+            self._denylist = frozenset(row.session_token for row in revoked)
+            self._synced_at = synced_at
+
+    def revoke(self, records):
+        """Mark token records inactive and deny them in this process at once. The caller commits."""
+        token_ids = []
+        for record in records:
+            record.is_active = False
+            token_ids.append(record.session_token)
+        with self._lock:
+            self._denylist = self._denylist.union(token_ids)
+
+    def status(self):
+        with self._lock:
+            return {
+                'denylist_size': len(self._denylist),
+                'denylist_age_seconds': None if self._synced_at is None
+                else round(time.monotonic() - self._synced_at, 1),
+                'verified': self.verified,
+                'rejected': self.rejected
+            }
+
+
+api_tokens = ApiTokens()
+
+
+def scope_required(scope):
+    """Restrict a view to token clients holding scope; session logins keep full access"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if isinstance(current_user._get_current_object(), TokenUser) and not current_user.has_scope(scope):
+                return jsonify({'error': f'API token lacks the {scope} scope'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
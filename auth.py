@@ -1,13 +1,33 @@
 from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_bcrypt import Bcrypt
-from werkzeug.security import generate_password_hash, check_password_hash
-from src.models import db, User, Resume, Analysis
+from datetime import datetime
+from src.models import db, User, Resume, Analysis, UserStats, UserSession
+from src.utils.passwords import password_hasher, PasswordHasherBusy
+from src.utils.user_cache import user_cache
+from src.utils.api_tokens import api_tokens, scope_required, TokenUser
 import re
 
 auth_bp = Blueprint('auth', __name__)
 bcrypt = Bcrypt()
 
+@auth_bp.record_once
+def configure_password_hasher(state):
+    """Apply PASSWORD_HASH_* settings when the blueprint is registered"""
+    password_hasher.configure(state.app)
+
+@auth_bp.record_once
+def configure_api_tokens(state):
+    """Apply API_TOKEN_* settings when the blueprint is registered"""
+    api_tokens.configure(state.app)
+
+def hasher_busy_response():
+    """503 asking the client to retry once hashing capacity frees up"""
+    response = jsonify({'error': 'Too many authentication requests, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
 def validate_email(email):
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -58,7 +78,7 @@ def register():
             return jsonify({'error': 'Email already registered'}), 400
         
         # Create new user
-        password_hash = generate_password_hash(password)
+        password_hash = password_hasher.hash(password)
         user = User(
             username=username,
             email=email,
@@ -80,6 +100,9 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
@@ -102,9 +125,19 @@ def login():
             (User.username == username) | (User.email == username)
         ).first()
         
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify({'error': 'Invalid username or password'}), 401
         
+        # Upgrade hashes made with older parameters while the password is at hand.
+        # The password is already verified: when the hasher is busy the upgrade
+        # waits for a later login instead of failing this one.
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+            except PasswordHasherBusy:
+                pass
+        
         # Log in the user
         login_user(user)
         
@@ -117,6 +150,9 @@ def login():
             }
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         return jsonify({'error': 'Login failed'}), 500
 
@@ -132,15 +168,18 @@ def logout():
 
 @auth_bp.route('/profile', methods=['GET'])
 @login_required
+@scope_required('read')
 def get_profile():
     """Get current user profile"""
     try:
-        # Get user statistics
-        resume_count = Resume.query.filter_by(user_id=current_user.id, is_active=True).count()
-        analysis_count = Analysis.query.filter_by(user_id=current_user.id).count()
+        # Get user statistics (counters maintained on insert/delete)
+        stats = db.session.get(UserStats, current_user.id)
+        resume_count = stats.resume_count if stats else 0
+        analysis_count = stats.analysis_count if stats else 0
         
-        # Get recent analyses
-        recent_analyses = Analysis.query.filter_by(user_id=current_user.id)\
+        # Get recent analyses (summary columns only)
+        recent_analyses = Analysis.summary_query()\
+            .filter_by(user_id=current_user.id)\
             .order_by(Analysis.created_at.desc())\
             .limit(5)\
             .all()
@@ -156,7 +195,7 @@ def get_profile():
                 'resume_count': resume_count,
                 'analysis_count': analysis_count
             },
-            'recent_analyses': [analysis.to_dict() for analysis in recent_analyses]
+            'recent_analyses': [Analysis.summary_dict(analysis) for analysis in recent_analyses]
         }), 200
         
     except Exception as e:
@@ -181,6 +220,8 @@ def check_auth():
 @login_required
 def change_password():
     """Change user password"""
+    if isinstance(current_user._get_current_object(), TokenUser):
+        return token_session_forbidden('change the password')
     try:
         data = request.get_json()
         
@@ -190,8 +231,11 @@ def change_password():
         current_password = data['current_password']
         new_password = data['new_password']
         
+        # current_user is a cached snapshot without the password hash
+        user = db.session.get(User, current_user.id)
+        
         # Verify current password
-        if not check_password_hash(current_user.password_hash, current_password):
+        if not password_hasher.verify(user.password_hash, current_password):
             return jsonify({'error': 'Current password is incorrect'}), 401
         
         # Validate new password
@@ -200,12 +244,94 @@ def change_password():
             return jsonify({'error': message}), 400
         
         # Update password
-        current_user.password_hash = generate_password_hash(new_password)
+        user.password_hash = password_hasher.hash(new_password)
+        
+        # A new password ends every API token issued under the old one
+        api_tokens.revoke(UserSession.query.filter_by(user_id=user.id, is_active=True).all())
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to change password'}), 500
 
+
+def token_session_forbidden(action='manage API tokens'):
+    """403 for token clients on endpoints that need a password login"""
+    return jsonify({'error': f'API tokens cannot {action}; log in with a password'}), 403
+
+@auth_bp.route('/tokens', methods=['POST'])
+@login_required
+def issue_token():
+    """Issue a signed API token for the current user
+    
+    The token is only returned here; store it like a password.
+    """
+    if isinstance(current_user._get_current_object(), TokenUser):
+        return token_session_forbidden()
+    try:
+        data = request.get_json(silent=True) or {}
+        name = (data.get('name') or '').strip()[:100] or None
+        
+        try:
+            ttl_days = data.get('ttl_days')
+            token, record = api_tokens.issue(current_user, scopes=data.get('scopes'),
+                                             ttl_days=None if ttl_days is None else int(ttl_days),
+                                             name=name)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'API token created',
+            'token': token,
+            'token_info': record.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create API token'}), 500
+
+@auth_bp.route('/tokens', methods=['GET'])
+@login_required
+def list_tokens():
+    """List the current user's unexpired API tokens"""
+    if isinstance(current_user._get_current_object(), TokenUser):
+        return token_session_forbidden()
+    try:
+        records = UserSession.query.filter(
+            UserSession.user_id == current_user.id,
+            UserSession.is_active.is_(True),
+            UserSession.expires_at > datetime.utcnow()
+        ).order_by(UserSession.created_at.desc()).all()
+        
+        return jsonify({'tokens': [record.to_dict() for record in records]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to list API tokens'}), 500
+
+@auth_bp.route('/tokens/<int:token_id>', methods=['DELETE'])
+@login_required
+def revoke_token(token_id):
+    """Revoke one of the current user's API tokens"""
+    if isinstance(current_user._get_current_object(), TokenUser):
+        return token_session_forbidden()
+    try:
+        record = UserSession.query.filter_by(id=token_id, user_id=current_user.id).first()
+        if not record:
+            return jsonify({'error': 'API token not found'}), 404
+        
+        api_tokens.revoke([record])
+        db.session.commit()
+        
+        return jsonify({'message': 'API token revoked'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to revoke API token'}), 500
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark for field-selective analysis: full analysis vs ?fields= projections
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.routes.analyzer import analyze_resume_job_match
+
+SAMPLE_JOB = """
+Senior Software Engineer
+
+We are looking for an engineer with 5+ years of Python experience, strong React
+and JavaScript skills, PostgreSQL and MongoDB, AWS, Docker and Kubernetes.
+Experience with CI/CD, Agile/Scrum and mentoring is a plus.
+"""
+
+PROJECTIONS = [
+    ('all fields', None),
+    ('skill_match_score', {'skill_match_score'}),
+    ('skills + similarity', {'composite_score', 'matching_skills', 'missing_skills'}),
+    ('keywords only', {'matching_keywords', 'missing_keywords'})
+]
+
+def time_projection(resume_text, fields, runs):
+    """Return mean and p95 latency (ms) of an analysis projection"""
+    # Warm up model and vectorizer code paths
+    analyze_resume_job_match(resume_text, SAMPLE_JOB, fields=fields)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        analyze_resume_job_match(resume_text, SAMPLE_JOB, fields=fields)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return sum(timings) / len(timings), timings[int(0.95 * (len(timings) - 1))]
+
+def run_benchmark(runs=50):
+    """Compare projection latency against the full analysis"""
+    with open(os.path.join(os.path.dirname(__file__), 'sample_resume.txt')) as f:
+        resume_text = f.read()
+
+    print(f"=== Field projection benchmark ({runs} runs each) ===")
+    baseline = None
+    for name, fields in PROJECTIONS:
+        mean, p95 = time_projection(resume_text, fields, runs)
+        if baseline is None:
+            baseline = mean
+        print(f"{name:24s} mean {mean:8.2f} ms   p95 {p95:8.2f} ms   "
+              f"({baseline / mean:4.1f}x vs all fields)")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark for password hashing during a login storm: login throughput and
+analysis latency with inline hashing vs the bounded hashing pool
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from src.utils.passwords import PasswordHasher, PasswordHasherBusy
+from src.routes.analyzer import analyze_resume_job_match
+
+SAMPLE_JOB = """
+Senior Software Engineer
+
+We are looking for an engineer with 5+ years of Python experience, strong React
+and JavaScript skills, PostgreSQL and MongoDB, AWS, Docker and Kubernetes.
+"""
+
+SAMPLE_RESUME = """
+Software engineer with six years of Python, Django and React. Built services on
+AWS with Docker, PostgreSQL and Redis; mentored junior developers.
+"""
+
+def login_storm(verify, password_hash, stop, stats):
+    """One client logging in back to back"""
+    while not stop.is_set():
+        try:
+            verify(password_hash, 'correct horse 1')
+            stats['logins'] += 1
+        except PasswordHasherBusy:
+            stats['rejected'] += 1
+
+def run_case(name, verify, password_hash, clients, duration):
+    """Measure analysis latency while clients hammer verify()"""
+    per_client = [{'logins': 0, 'rejected': 0} for _ in range(clients)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=login_storm, args=(verify, password_hash, stop, stats))
+               for stats in per_client]
+    for thread in threads:
+        thread.start()
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        analyze_resume_job_match(SAMPLE_RESUME, SAMPLE_JOB)
+        latencies.append((time.perf_counter() - start) * 1000)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    logins = sum(stats['logins'] for stats in per_client)
+    rejected = sum(stats['rejected'] for stats in per_client)
+    latencies.sort()
+    print(f"{name:14s} logins/s {logins / duration:7.1f}   rejected {rejected:6d}   "
+          f"analyses {len(latencies):4d}   p50 {latencies[len(latencies) // 2]:8.1f} ms   "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:8.1f} ms")
+
+def run_benchmark(clients=16, duration=10.0, method='scrypt'):
+    """Compare no storm, inline hashing and the bounded pool"""
+    password_hash = generate_password_hash('correct horse 1', method)
+    analyze_resume_job_match(SAMPLE_RESUME, SAMPLE_JOB)  # warm up
+
+    print(f"=== Login storm benchmark ({clients} clients, {method}, {duration:.0f}s per case, "
+          f"{os.cpu_count()} CPUs) ===")
+    run_case('no storm', check_password_hash, password_hash, 0, duration)
+    run_case('inline', check_password_hash, password_hash, clients, duration)
+    for workers in (1, 2):
+        hasher = PasswordHasher(method=method, workers=workers, max_pending=clients)
+        run_case(f'pool ({workers})', hasher.verify, password_hash, clients, duration)
+
+if __name__ == "__main__":
+    run_benchmark(duration=float(sys.argv[1]) if len(sys.argv) > 1 else 10.0)
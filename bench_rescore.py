@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bulk rescoring after a weight change: vectorized chunks vs
+rescoring one analysis at a time
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import create_engine
+from src.utils.rescoring import rescore_analyses
+from src.utils.scoring_model import scoring_model
+from src.utils.skill_database import SKILL_DATABASE
+
+SCHEMA = """
+CREATE TABLE analysis (
+    id INTEGER PRIMARY KEY,
+    composite_score FLOAT NOT NULL,
+    similarity_score FLOAT NOT NULL,
+    skill_match_score FLOAT NOT NULL,
+    analysis_version VARCHAR(10)
+);
+CREATE TABLE analysis_skill (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER NOT NULL,
+    skill VARCHAR(100) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(10) NOT NULL
+);
+CREATE INDEX ix_analysis_skill_analysis ON analysis_skill (analysis_id);
+"""
+
+def seed(path, analyses, seed=11):
+    """Analyses with 2-5 job skill categories of 1-4 skills each"""
+    rng = random.Random(seed)
+    categories = list(SKILL_DATABASE)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute('PRAGMA journal_mode=WAL')
+    skill_id = 0
+    for start in range(1, analyses + 1, 50000):
+        analysis_rows, skill_rows = [], []
+        for analysis_id in range(start, min(start + 50000, analyses + 1)):
+            analysis_rows.append((analysis_id, 0.0, round(rng.uniform(0, 80), 2), 0.0, '1.0'))
+            for category in rng.sample(categories, rng.randint(2, 5)):
+                for skill in rng.sample(SKILL_DATABASE[category]['keywords'], rng.randint(1, 4)):
+                    skill_id += 1
+                    skill_rows.append((skill_id, analysis_id, skill, category,
+                                       'matching' if rng.random() < 0.5 else 'missing'))
+        conn.executemany('INSERT INTO analysis VALUES (?, ?, ?, ?, ?)', analysis_rows)
+        conn.executemany('INSERT INTO analysis_skill VALUES (?, ?, ?, ?, ?)', skill_rows)
+        conn.commit()
+    conn.close()
+    return skill_id
+
+def rescore_one_at_a_time(path, model, limit):
+    """Per analysis: load its skills, score in Python, update; returns analyses per second"""
+    conn = sqlite3.connect(path)
+    ids = [row[0] for row in conn.execute('SELECT id FROM analysis ORDER BY id LIMIT ?', (limit,))]
+    start = time.perf_counter()
+    for analysis_id in ids:
+        similarity = conn.execute('SELECT similarity_score FROM analysis WHERE id = ?', (analysis_id,)).fetchone()[0]
+        counts = {}
+        for category, status in conn.execute(
+                'SELECT category, status FROM analysis_skill WHERE analysis_id = ?', (analysis_id,)):
+            matched, total = counts.get(category, (0, 0))
+            counts[category] = (matched + (status == 'matching'), total + 1)
+        total_weight = sum(model.category_weight(category) for category in counts)
+        skill = sum(matched / total * model.category_weight(category)
+                    for category, (matched, total) in counts.items()) / total_weight * 100
+        composite = model.composite_score(similarity, skill)
+        conn.execute('UPDATE analysis SET skill_match_score = ?, composite_score = ?, analysis_version = ? '
+                     'WHERE id = ?', (round(skill, 2), round(composite, 2), model.version, analysis_id))
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return len(ids) / elapsed
+
+def run_benchmark(analyses=1000000):
+    """Seed analyses, then rescore all of them with the current scoring model"""
+    path = os.path.join(tempfile.mkdtemp(), 'rescore.db')
+    start = time.perf_counter()
+    skill_rows = seed(path, analyses)
+    print(f"=== Rescoring benchmark ({analyses} analyses, {skill_rows} analysis_skill rows, "
+          f"seeded in {time.perf_counter() - start:.0f}s) ===")
+
+    model = scoring_model.current()
+    rate = rescore_one_at_a_time(path, model, min(analyses, 5000))
+    print(f"one at a time  {rate:10.0f} analyses/s   ~{analyses / rate:7.0f}s for all")
+
+    engine = create_engine(f'sqlite:///{path}')
+    start = time.perf_counter()
+    stats = rescore_analyses(engine, model, everything=True)
+    elapsed = time.perf_counter() - start
+    print(f"vectorized     {stats['rescored'] / elapsed:10.0f} analyses/s   {elapsed:8.1f}s for all")
+    engine.dispose()
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the FTS5 search index on 100k documents: full and incremental
+rebuild time, index size, and search latency vs a LIKE scan over plain text
+"""
+
+import sys
+import os
+import itertools
+import random
+import sqlite3
+import tempfile
+import time
+import zlib
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import create_engine
+from src.utils.search_index import SEARCH_SQL, fts_query, rebuild_search_index
+from src.utils.skill_database import SKILL_DATABASE
+
+SCHEMA = """
+CREATE TABLE content_blob (hash VARCHAR(64) PRIMARY KEY, codec VARCHAR(10), size INTEGER, data BLOB, created_at DATETIME);
+CREATE TABLE resume (id INTEGER PRIMARY KEY, user_id INTEGER, filename VARCHAR(255), content_hash VARCHAR(64), is_active BOOLEAN);
+CREATE TABLE job_description (id INTEGER PRIMARY KEY, title VARCHAR(200), content_hash VARCHAR(64));
+CREATE TABLE analysis (id INTEGER PRIMARY KEY, user_id INTEGER, job_description_id INTEGER);
+CREATE INDEX ix_analysis_jd ON analysis (job_description_id);
+CREATE TABLE plain_text (id INTEGER PRIMARY KEY, user_id INTEGER, body TEXT);
+CREATE INDEX ix_plain_text_user ON plain_text (user_id);
+"""
+
+USERS = 1000
+SKILLS = list(dict.fromkeys(skill for data in SKILL_DATABASE.values() for skill in data['keywords'] if ' ' not in skill))
+
+# Zipf-distributed vocabulary: a few very common words and a long tail,
+# with the skills spread through it
+random.seed(7)
+VOCABULARY = SKILLS + [f'term{i}' for i in range(20000)]
+random.shuffle(VOCABULARY)
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+def make_text(words=150):
+    return ' '.join(random.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+def seed(path, resumes, job_descriptions):
+    """Create documents the way the app stores them (compressed blobs) plus a plain-text copy"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    blobs, resume_rows, jd_rows, analysis_rows, plain_rows = [], [], [], [], []
+    for doc_id in range(1, resumes + job_descriptions + 1):
+        body = make_text()
+        content_hash = f'{doc_id:064x}'
+        blobs.append((content_hash, 'zlib', len(body), zlib.compress(body.encode('utf-8'), 6)))
+        if doc_id <= resumes:
+            user_id = random.randint(1, USERS)
+            resume_rows.append((doc_id, user_id, f'resume{doc_id}.txt', content_hash))
+            plain_rows.append((doc_id, user_id, body))
+        else:
+            jd_id = doc_id - resumes
+            jd_rows.append((jd_id, 'Analyzed Position', content_hash))
+            for user_id in random.sample(range(1, USERS + 1), random.randint(1, 3)):
+                analysis_rows.append((user_id, jd_id))
+                plain_rows.append((None, user_id, body))
+    conn.executemany("INSERT INTO content_blob VALUES (?, ?, ?, ?, datetime('now'))", blobs)
+    conn.executemany('INSERT INTO resume VALUES (?, ?, ?, ?, 1)', resume_rows)
+    conn.executemany('INSERT INTO job_description VALUES (?, ?, ?)', jd_rows)
+    conn.executemany('INSERT INTO analysis (user_id, job_description_id) VALUES (?, ?)', analysis_rows)
+    conn.executemany('INSERT INTO plain_text VALUES (?, ?, ?)', plain_rows)
+    conn.commit()
+    conn.close()
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2], latencies[int(0.95 * (len(latencies) - 1))]
+
+def fts_search(user_id):
+    def run(conn, words):
+        conn.execute(SEARCH_SQL, {'query': fts_query(' '.join(words), user_id=user_id),
+                                  'kind': None, 'limit': 10, 'offset': 0}).fetchall()
+    return run
+
+def like_search(user_id):
+    def run(conn, words):
+        sql = 'SELECT id FROM plain_text WHERE ' + ' AND '.join('body LIKE ?' for _ in words)
+        params = [f'%{word}%' for word in words]
+        if user_id is not None:
+            sql += ' AND user_id = ?'
+            params.append(user_id)
+        # No LIMIT: ranking the matches needs all of them
+        conn.execute(sql, params).fetchall()
+    return run
+
+def run_benchmark(documents=100000, queries=100):
+    """Build the index over the documents, then compare search latencies"""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    resumes = documents * 4 // 5
+    seed(path, resumes, documents - resumes)
+    engine = create_engine(f'sqlite:///{path}')
+    print(f"=== Search index benchmark ({documents} documents, {USERS} users) ===")
+
+    start = time.perf_counter()
+    stats = rebuild_search_index(engine, batch_size=1000, full=True)
+    elapsed = time.perf_counter() - start
+    print(f"full rebuild         {elapsed:7.2f} s   {stats['indexed'] / elapsed:8.0f} docs/s")
+
+    start = time.perf_counter()
+    stats = rebuild_search_index(engine, batch_size=1000)
+    print(f"incremental, no-op   {time.perf_counter() - start:7.2f} s   unchanged {stats['unchanged']}")
+
+    conn = sqlite3.connect(path)
+    changed = random.sample(range(1, resumes + 1), documents // 100)
+    conn.executemany('UPDATE resume SET content_hash = ? WHERE id = ?',
+                     [(f'{random.randint(resumes + 1, documents):064x}', doc_id) for doc_id in changed])
+    conn.commit()
+    start = time.perf_counter()
+    stats = rebuild_search_index(engine, batch_size=1000)
+    print(f"incremental, 1% new  {time.perf_counter() - start:7.2f} s   indexed {stats['indexed']}")
+
+    pages = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'search_index%'").fetchone()[0]
+    print(f"index size           {pages / 1024 / 1024:7.1f} MB")
+
+    workload = [random.sample(SKILLS, random.randint(1, 2)) for _ in range(queries)]
+    users = [random.randint(1, USERS) for _ in range(queries)]
+    for name, search, scoped in (('fts user', fts_search, True), ('like user', like_search, True),
+                                 ('fts all', fts_search, False), ('like all', like_search, False)):
+        latencies = []
+        for words, user_id in zip(workload, users):
+            start = time.perf_counter()
+            search(user_id if scoped else None)(conn, words)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p50, p95 = percentiles(latencies)
+        print(f"{name:10s} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+    conn.close()
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
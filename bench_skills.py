@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for skill scoring of many resumes against one job description:
+per-keyword regex searches and set operations vs vocabulary bitsets, and
+the cost of aliases and of typo matching
+"""
+
+import sys
+import os
+import random
+import re
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.routes.analyzer import preprocess_text
+from src.utils.skill_database import (SKILL_DATABASE, get_all_skills_flat, get_relevant_skills_for_job, get_skill_weight,
+                                      load_taxonomy)
+from src.utils.skill_vocab import ALIAS_PATTERN, FUZZY_MIN_LENGTHS, TOKEN_PATTERN, SkillVocabulary, compile_vocabulary
+
+SAMPLE_JOB = """
+Senior Software Engineer
+
+We are looking for an engineer with 5+ years of Python experience, strong React
+and JavaScript skills, PostgreSQL and MongoDB, AWS, Docker and Kubernetes.
+Experience with CI/CD, Agile/Scrum and mentoring is a plus.
+"""
+
+FILLER = ('built', 'designed', 'team', 'services', 'customers', 'led', 'migrated', 'platform',
+          'production', 'improved', 'latency', 'reports', 'with', 'and', 'the', 'for')
+
+def make_resumes(count, seed=7):
+    """Synthetic resumes mixing skills from every category with filler words"""
+    rng = random.Random(seed)
+    skills = get_all_skills_flat()
+    return [' '.join(rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER)
+                     for _ in range(rng.randint(150, 400)))
+            for _ in range(count)]
+
+def extract_sets(clean_text, categories):
+    """The previous extraction: one regex search per keyword"""
+    return {category: {skill for skill in SKILL_DATABASE[category]['keywords']
+                       if re.search(r'\b' + re.escape(skill.lower()) + r'\b', clean_text)}
+            for category in categories}
+
+def score_sets(resume_skills, job_skills):
+    """The previous weighted score from per-category set intersections"""
+    score = total = 0
+    for category, job_cat_skills in job_skills.items():
+        if job_cat_skills:
+            weight = get_skill_weight(category)
+            score += len(resume_skills.get(category, set()) & job_cat_skills) / len(job_cat_skills) * weight
+            total += weight
+    return score / total * 100 if total else 0
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark(count=2000):
+    """Extract and score count resumes against SAMPLE_JOB both ways"""
+    resumes = [preprocess_text(text) for text in make_resumes(count)]
+    job_clean = preprocess_text(SAMPLE_JOB)
+    relevant = get_relevant_skills_for_job(SAMPLE_JOB)
+    # Without aliases and typos, which the regex searches do not know
+    vocab = SkillVocabulary(compile_vocabulary(dict(load_taxonomy(), aliases={})), fuzzy_distance=0)
+    print(f"=== Skill scoring benchmark ({count} resumes, {vocab.skill_count} skills) ===")
+
+    job_sets = extract_sets(job_clean, list(SKILL_DATABASE))
+    resume_sets, sets_extract = timed(lambda: [extract_sets(text, relevant) for text in resumes])
+    set_scores, sets_score = timed(lambda: [score_sets(skills, job_sets) for skills in resume_sets])
+
+    profile = vocab.job_profile(vocab.encode(job_clean))
+    resume_bits, bits_extract = timed(lambda: [vocab.encode(text, relevant) for text in resumes])
+    bit_scores, bits_score = timed(lambda: [vocab.match_score(bits, profile) for bits in resume_bits])
+
+    assert [round(score, 6) for score in set_scores] == [round(score, 6) for score in bit_scores]
+    for name, extract, score in (('sets', sets_extract, sets_score), ('bitsets', bits_extract, bits_score)):
+        print(f"{name:8s} extract {extract * 1e6 / count:8.1f} us/resume   "
+              f"score {score * 1e6 / count:6.2f} us/resume   "
+              f"total {(extract + score) * 1000:8.1f} ms")
+    print(f"speedup  extract {sets_extract / bits_extract:5.1f}x   score {sets_score / bits_score:5.1f}x")
+
+def with_aliases(taxonomy, count, seed=13):
+    """The taxonomy plus count synthetic aliases ('nodejs17', 'machinelearning 5') spread over its skills"""
+    rng = random.Random(seed)
+    skills = [skill for skill in get_all_skills_flat() if ALIAS_PATTERN.fullmatch(skill)]
+    aliases = {skill: list(names) for skill, names in taxonomy.get('aliases', {}).items()}
+    for i in range(count):
+        skill = rng.choice(skills)
+        name = skill.replace(' ', '')
+        aliases.setdefault(skill, []).append(f'{name}{i}' if i % 2 else f'{name} {i}')
+    return dict(taxonomy, aliases=aliases)
+
+def run_alias_benchmark(count=2000, alias_counts=(0, 1000, 10000)):
+    """Encode count resumes with the bundled taxonomy plus more and more aliases"""
+    resumes = [preprocess_text(text) for text in make_resumes(count)]
+    taxonomy = load_taxonomy()
+    print(f"=== Alias cost ({count} resumes) ===")
+    for extra in alias_counts:
+        vocab = SkillVocabulary(compile_vocabulary(with_aliases(taxonomy, extra)))
+        elapsed = min(timed(lambda: [vocab.encode(text) for text in resumes])[1] for _ in range(3))
+        print(f"{vocab.alias_count:6d} aliases  {vocab.size:8d} bytes   extract {elapsed * 1e6 / count:8.1f} us/resume")
+
+def misspell(word, rng):
+    """word with one character substituted, deleted, inserted or swapped with the next"""
+    i = rng.randrange(1, len(word) - 1)
+    letter = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    return rng.choice((word[:i] + letter + word[i + 1:], word[:i] + word[i + 1:],
+                       word[:i] + letter + word[i:], word[:i] + word[i + 1] + word[i] + word[i + 2:]))
+
+def make_typo_resumes(count, seed=17):
+    """Synthetic resumes of Zipf-distributed made-up words and skills, half of those misspelt
+
+    Returns (text, misspelt skills) pairs.
+    """
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 12))) for _ in range(20000)]
+    frequencies = [1 / rank for rank in range(1, len(words) + 1)]
+    skills = [skill for skill in get_all_skills_flat()
+              if TOKEN_PATTERN.fullmatch(skill) and len(skill) >= FUZZY_MIN_LENGTHS[0]]
+    resumes = []
+    for _ in range(count):
+        tokens, misspelt = rng.choices(words, frequencies, k=rng.randint(150, 400)), set()
+        for i in rng.sample(range(len(tokens)), len(tokens) // 10):
+            tokens[i] = rng.choice(skills)
+            if rng.random() < 0.5:
+                misspelt.add(tokens[i])
+                tokens[i] = misspell(tokens[i], rng)
+        resumes.append((' '.join(tokens), misspelt))
+    return resumes
+
+def run_fuzzy_benchmark(count=2000):
+    """Encode count resumes with exact matching only and with typos of up to 1 and 2 edits
+
+    Cold: the per-word typo cache is cleared before every resume, so every
+    unknown word is looked up; warm: words seen in earlier resumes are not.
+    """
+    resumes = make_typo_resumes(count)
+    data = compile_vocabulary(load_taxonomy())
+    print(f"=== Typo matching ({count} resumes, {sum(len(misspelt) for _, misspelt in resumes)} misspelt skills) ===")
+    exact = SkillVocabulary(data, fuzzy_distance=0)
+    base = min(timed(lambda: [exact.encode(text) for text, _ in resumes])[1] for _ in range(3))
+    print(f"exact          extract {base * 1e6 / count:8.1f} us/resume")
+    for distance in (1, 2):
+        vocab = SkillVocabulary(data, fuzzy_distance=distance)
+
+        def cold():
+            for text, _ in resumes:
+                vocab._fuzzy_cache.clear()
+                vocab.encode(text)
+        _, cold_elapsed = timed(cold)
+        warm_elapsed = min(timed(lambda: [vocab.encode(text) for text, _ in resumes])[1] for _ in range(3))
+        found = total = 0
+        for text, misspelt in resumes:
+            bits, forms = vocab.encode_forms(text)
+            recovered = vocab.surface_forms(bits, forms)
+            found += sum(1 for skill in misspelt if skill in recovered)
+            total += len(misspelt)
+        print(f"{distance} edit{'s' if distance > 1 else ' '}        overhead cold {(cold_elapsed - base) * 1e6 / count:8.1f} us/resume   "
+              f"warm {(warm_elapsed - base) * 1e6 / count:8.1f} us/resume   recovered {found / total:6.1%}")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run_benchmark(count)
+    run_alias_benchmark(count)
+    run_fuzzy_benchmark(count)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the SQLite performance profile: write throughput and read
+latency under concurrent analyze (insert + commit) and history (paged read)
+traffic, with SQLite defaults vs the tuned profile
+"""
+
+import sys
+import os
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.utils.db_profile import DEFAULT_SQLITE_PROFILE, SQLITE_DEFAULT_PRAGMAS, apply_sqlite_pragmas
+
+SCHEMA = """
+CREATE TABLE analysis (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    resume_id INTEGER NOT NULL,
+    job_description_id INTEGER,
+    composite_score FLOAT NOT NULL,
+    similarity_score FLOAT NOT NULL,
+    skill_match_score FLOAT NOT NULL,
+    matching_skills TEXT,
+    missing_skills TEXT,
+    recommendations TEXT,
+    created_at DATETIME
+)
+"""
+
+USERS = 50
+
+def connect(path, profile):
+    """Open a connection the way the app's engine would, with a pragma profile applied"""
+    conn = sqlite3.connect(path, timeout=profile['busy_timeout_ms'] / 1000.0, check_same_thread=False)
+    apply_sqlite_pragmas(conn, profile)
+    return conn
+
+def seed(path, profile, rows=20000):
+    """Create the schema and a starting history"""
+    conn = connect(path, profile)
+    conn.execute(SCHEMA)
+    payload = json.dumps({'programming_languages': ['python', 'java', 'go']})
+    conn.executemany(
+        "INSERT INTO analysis (user_id, resume_id, composite_score, similarity_score, "
+        "skill_match_score, matching_skills, missing_skills, recommendations, created_at) "
+        "VALUES (?, 1, 50, 40, 60, ?, ?, '[]', datetime('now'))",
+        [(random.randint(1, USERS), payload, payload) for _ in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+def writer(path, profile, stop, stats):
+    """Insert one analysis per transaction, like /api/analyze"""
+    conn = connect(path, profile)
+    payload = json.dumps({'databases': ['postgresql', 'redis']})
+    while not stop.is_set():
+        try:
+            conn.execute(
+                "INSERT INTO analysis (user_id, resume_id, composite_score, similarity_score, "
+                "skill_match_score, matching_skills, missing_skills, recommendations, created_at) "
+                "VALUES (?, 1, 55, 45, 65, ?, ?, '[]', datetime('now'))",
+                (random.randint(1, USERS), payload, payload)
+            )
+            conn.commit()
+            stats['writes'] += 1
+        except sqlite3.OperationalError:
+            conn.rollback()
+            stats['write_errors'] += 1
+    conn.close()
+
+def reader(path, profile, stop, stats):
+    """Read a history page, like /api/history"""
+    conn = connect(path, profile)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            user_id = random.randint(1, USERS)
+            conn.execute("SELECT COUNT(*) FROM analysis WHERE user_id = ?", (user_id,)).fetchone()
+            conn.execute(
+                "SELECT * FROM analysis WHERE user_id = ? ORDER BY created_at DESC LIMIT 10",
+                (user_id,)
+            ).fetchall()
+            stats['read_latencies'].append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError:
+            stats['read_errors'] += 1
+    conn.close()
+
+def run_profile(name, profile, writers=4, readers=4, duration=5.0):
+    """Run the mixed workload against a fresh database file"""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.db')
+    seed(path, profile)
+
+    # One stats dict per thread, merged afterwards
+    per_thread = [{'writes': 0, 'write_errors': 0, 'read_errors': 0, 'read_latencies': []}
+                  for _ in range(writers + readers)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=writer, args=(path, profile, stop, per_thread[i]))
+               for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(path, profile, stop, per_thread[writers + i]))
+                for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    stats = {'writes': 0, 'write_errors': 0, 'read_errors': 0, 'read_latencies': []}
+    for thread_stats in per_thread:
+        for key, value in thread_stats.items():
+            stats[key] += value
+
+    latencies = sorted(stats['read_latencies']) or [0.0]
+    print(f"{name:8s} writes/s {stats['writes'] / duration:9.1f}   "
+          f"write errors {stats['write_errors']:5d}   "
+          f"reads {len(stats['read_latencies']):6d}   "
+          f"read p50 {latencies[len(latencies) // 2]:7.2f} ms   "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:7.2f} ms   "
+          f"read errors {stats['read_errors']:5d}")
+
+def run_benchmark(duration=5.0):
+    """Compare SQLite defaults with the tuned profile"""
+    print(f"=== SQLite profile benchmark ({duration:.0f}s per profile, 4 writers + 4 readers) ===")
+    run_profile('default', SQLITE_DEFAULT_PRAGMAS, duration=duration)
+    run_profile('tuned', DEFAULT_SQLITE_PROFILE, duration=duration)
+
+if __name__ == "__main__":
+    run_benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark for job title classification of job descriptions: a substring
+search per title vs the compiled, memoized TitleMatcher
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.utils.job_titles import TitleMatcher
+from src.utils.skill_database import JOB_TITLE_SKILLS
+
+FILLER = ('we', 'are', 'hiring', 'to', 'join', 'our', 'team', 'you', 'will', 'build', 'data', 'platform', 'services',
+          'customers', 'security', 'cloud', 'web', 'mobile', 'engineer', 'developer', 'analyst', 'senior', 'experience',
+          'with', 'and', 'the', 'for', 'doctors', 'guide', 'directors', 'products', 'learning', 'apps', 'software')
+
+def make_job_descriptions(count, titles, seed=23):
+    """Synthetic JDs of 200-800 words: filler, and a title from titles in half of them"""
+    rng = random.Random(seed)
+    titles = list(titles)
+    descriptions = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(200, 800))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(titles))
+        descriptions.append(' '.join(words).capitalize())
+    return descriptions
+
+def families_by_substring(text, titles):
+    """The previous classification: a substring search per title, in taxonomy order"""
+    text = text.lower()
+    return tuple(dict.fromkeys(family for title, family in titles.items() if title in text))
+
+def with_titles(titles, count):
+    """titles plus count synthetic ones ('platform 17 engineer') spread over the same families"""
+    families = sorted(set(titles.values()))
+    return dict(titles, **{f'{("platform", "data", "web")[i % 3]} {i} {("engineer", "developer", "analyst")[i % 4 % 3]}':
+                           families[i % len(families)] for i in range(count)})
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark(count=2000):
+    """Classify count JDs with more and more titles, both ways"""
+    original = dict(list(JOB_TITLE_SKILLS.items())[:14])
+    descriptions = make_job_descriptions(count, JOB_TITLE_SKILLS)
+    print(f"=== Job title classification ({count} job descriptions) ===")
+    for titles in (original, JOB_TITLE_SKILLS, with_titles(JOB_TITLE_SKILLS, 10000)):
+        matcher = TitleMatcher(titles)
+        substring, substring_elapsed = timed(lambda: [families_by_substring(text, titles) for text in descriptions])
+        compiled, cold = timed(lambda: [matcher.families(text) for text in descriptions])
+        _, memoized = timed(lambda: [matcher.families(text) for text in descriptions])
+        substring_only = sum(1 for a, b in zip(substring, compiled) if set(a) - set(b))
+        print(f"{len(titles):6d} titles  substring {substring_elapsed * 1e6 / count:8.1f} us/JD   "
+              f"compiled {cold * 1e6 / count:6.1f} us/JD   memoized {memoized * 1e6 / count:5.1f} us/JD   "
+              f"families only found inside words: {substring_only} JDs")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,97 @@
+"""
+Per-request deadlines and stage budgets for the analysis pipeline
+"""
+
+import time
+
+DEADLINE_HEADER = 'X-Analysis-Deadline-Ms'
+
+# Minimum remaining time (ms) a stage needs to run its full or degraded
+# implementation. A stage without a 'degraded' budget is never skipped.
+DEFAULT_STAGE_BUDGETS_MS = {
+    'keywords': {'full': 600, 'degraded': 50},
+    'similarity': {'full': 200}
+}
+
+
+class Deadline:
+    """Time budget for one analysis, shared by every pipeline stage"""
+
+    def __init__(self, budget_ms, stage_budgets=None):
+        self.budget_ms = budget_ms
+        self.stage_budgets = stage_budgets or DEFAULT_STAGE_BUDGETS_MS
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_ms / 1000.0
+        self.skipped = []
+        self.degraded = []
+
+    @classmethod
+    def from_request(cls, request, config):
+        """Build a deadline from the request header, bounded by ANALYSIS_DEADLINE_* config"""
+        default_ms = config.get('ANALYSIS_DEADLINE_MS')
+        max_ms = config.get('ANALYSIS_DEADLINE_MAX_MS')
+        budget_ms = default_ms
+
+        header = request.headers.get(DEADLINE_HEADER)
+        if header:
+            try:
+                budget_ms = max(0, int(header))
+            except ValueError:
+                raise ValueError(f'{DEADLINE_HEADER} must be an integer number of milliseconds')
+
+        if max_ms and (budget_ms is None or budget_ms > max_ms):
+            budget_ms = max_ms
+        if budget_ms is None:
+            return None
+
+        return cls(budget_ms, config.get('ANALYSIS_STAGE_BUDGETS_MS'))
+
+    def remaining_ms(self):
+        """Milliseconds left before the deadline (never negative)"""
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000)
+
+    def elapsed_ms(self):
+        """Milliseconds since the deadline started"""
+        return (time.monotonic() - self.started_at) * 1000
+
+    def plan(self, stage):
+        """Return 'full', 'degraded' or 'skip' for a stage given the remaining time"""
+        budgets = self.stage_budgets.get(stage, {})
+        remaining = self.remaining_ms()
+
+        if remaining >= budgets.get('full', 0):
+            return 'full'
+        if remaining >= budgets.get('degraded', 0):
+            return 'degraded'
+        return 'skip'
+
+    @property
+    def partial(self):
+        """Whether any stage was degraded or skipped"""
+        return bool(self.skipped or self.degraded)
+
+    def report(self):
+        """Deadline summary for API responses"""
+        return {
+            'budget_ms': self.budget_ms,
+            'elapsed_ms': round(self.elapsed_ms(), 2),
+            'skipped_stages': list(self.skipped),
+            'degraded_stages': list(self.degraded)
+        }
+
+
+def choose_stage(deadline, stage, full_func, degraded_func):
+    """Pick the implementation for an optional stage, or None if it must be skipped"""
+    if deadline is None:
+        return full_func
+
+    plan = deadline.plan(stage)
+    if plan == 'full':
+        return full_func
+    if plan == 'degraded':
+        # Tiers that already run the cheap implementation are not degraded further
+        if degraded_func is not full_func:
+            deadline.degraded.append(stage)
+        return degraded_func
+    deadline.skipped.append(stage)
+    return None
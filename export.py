@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_cors import cross_origin
+from flask_login import current_user, login_required
+from sqlalchemy import type_coerce
+from src.models import db, Analysis, AnalysisArchive, ContentBlob
+from src.utils.rate_limit import rate_limited
+from src.utils.api_tokens import scope_required
+
+export_bp = Blueprint('export', __name__)
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows fetched per round trip, and bytes buffered before a chunk is sent
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def export_rows(user_id):
+    """Yield (summary dict, {field: JSON text}) for a user's analyses, archived ones first, oldest first
+    
+    Rows are fetched EXPORT_BATCH_SIZE at a time as plain columns, so nothing
+    accumulates in the session, and the JSON columns are read as text so they
+    are never decoded only to be encoded again. Analyses the retention job
+    moved to analysis_archive come first, with archived set: those archived
+    to a separate ANALYSIS_ARCHIVE_DATABASE_URI are not exported.
+    """
+    archive_columns = [getattr(AnalysisArchive, column.key) for column in Analysis.summary_columns()]
+    archived = AnalysisArchive.query.with_entities(*archive_columns, AnalysisArchive.codec, AnalysisArchive.payload)\
+        .filter(AnalysisArchive.user_id == user_id)\
+        .order_by(AnalysisArchive.created_at, AnalysisArchive.id)\
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for row in archived:
+        details = json.loads(ContentBlob.decode(row.codec, row.payload))
+        yield dict(Analysis.summary_dict(row), archived=True), {
+            name: json.dumps(details[name], separators=(',', ':')) if details.get(name) is not None else empty
+            for name, empty in Analysis.DETAIL_FIELDS.items()}
+
+    detail_columns = [type_coerce(getattr(Analysis, name), db.Text).label(name) for name in Analysis.DETAIL_FIELDS]
+    query = Analysis.query.with_entities(*Analysis.summary_columns(), *detail_columns)\
+        .filter(Analysis.user_id == user_id)\
+        .order_by(Analysis.created_at, Analysis.id)\
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for row in query:
+        yield dict(Analysis.summary_dict(row), archived=False), {name: getattr(row, name) or empty
+                                                                 for name, empty in Analysis.DETAIL_FIELDS.items()}
+
+def ndjson_lines(rows):
+    for summary, details in rows:
+        # Splice the stored JSON into the summary object
+        yield ''.join([
+            json.dumps(summary, separators=(',', ':'))[:-1],
+            *(f',"{name}":{text}' for name, text in details.items()),
+            '}\n'
+        ])
+
+def csv_lines(rows):
+    """CSV with a header row; list and dict fields are written as JSON"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in Analysis.summary_columns()] + ['archived'] + list(Analysis.DETAIL_FIELDS))
+    for summary, details in rows:
+        writer.writerow([*summary.values(), *details.values()])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def chunked(lines, size=EXPORT_CHUNK_SIZE):
+    """Join lines into chunks of about size characters"""
+    parts = []
+    length = 0
+    for line in lines:
+        parts.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(parts)
+            parts = []
+            length = 0
+    if parts:
+        yield ''.join(parts)
+
+@export_bp.route('/export', methods=['GET'])
+@login_required
+@cross_origin()
+@scope_required('export')
+@rate_limited('export')
+def export_analyses():
+    """Stream the user's full analysis history, archived analyses included, as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    rows = export_rows(current_user.id)
+    lines = ndjson_lines(rows) if export_format == 'ndjson' else csv_lines(rows)
+    filename = f"analyses-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+
+    return Response(
+        stream_with_context(chunked(lines)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
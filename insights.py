@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify
+from flask_cors import cross_origin
+from flask_login import current_user, login_required
+from sqlalchemy import func
+from src.models import db, Analysis, AnalysisSkill, JobDescription
+from src.utils.api_tokens import scope_required
+
+insights_bp = Blueprint('insights', __name__)
+
+# strftime formats for score trend buckets
+TREND_INTERVALS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m'
+}
+
+def skill_frequencies(user_id, limit):
+    """Most frequently matched and missing skills per category, counted in SQL"""
+    rows = db.session.query(
+        AnalysisSkill.status,
+        AnalysisSkill.category,
+        AnalysisSkill.skill,
+        func.count().label('count')
+    ).filter(AnalysisSkill.user_id == user_id)\
+        .group_by(AnalysisSkill.status, AnalysisSkill.category, AnalysisSkill.skill)\
+        .order_by(func.count().desc(), AnalysisSkill.skill)\
+        .all()
+
+    result = {'matching': {}, 'missing': {}}
+    for row in rows:
+        category_skills = result[row.status].setdefault(row.category, [])
+        if len(category_skills) < limit:
+            category_skills.append({'skill': row.skill, 'count': row.count})
+    return result
+
+def score_trend(user_id, interval):
+    """Average scores per time bucket"""
+    period = func.strftime(TREND_INTERVALS[interval], Analysis.created_at).label('period')
+    rows = db.session.query(
+        period,
+        func.count(Analysis.id).label('analyses'),
+        func.avg(Analysis.composite_score).label('composite'),
+        func.avg(Analysis.similarity_score).label('similarity'),
+        func.avg(Analysis.skill_match_score).label('skill_match')
+    ).filter(Analysis.user_id == user_id)\
+        .group_by(period)\
+        .order_by(period)\
+        .all()
+
+    return [{
+        'period': row.period,
+        'analyses': row.analyses,
+        'avg_composite_score': round(row.composite, 2),
+        'avg_similarity_score': round(row.similarity, 2),
+        'avg_skill_match_score': round(row.skill_match, 2)
+    } for row in rows]
+
+def job_family_stats(user_id, limit):
+    """Analysis counts, average scores and top missing skills per job family"""
+    rows = db.session.query(
+        JobDescription.job_family,
+        func.count(Analysis.id).label('analyses'),
+        func.avg(Analysis.composite_score).label('composite'),
+        func.avg(Analysis.skill_match_score).label('skill_match')
+    ).join(JobDescription, Analysis.job_description_id == JobDescription.id)\
+        .filter(Analysis.user_id == user_id)\
+        .group_by(JobDescription.job_family)\
+        .order_by(func.count(Analysis.id).desc())\
+        .all()
+
+    missing_rows = db.session.query(
+        JobDescription.job_family,
+        AnalysisSkill.skill,
+        func.count().label('count')
+    ).join(Analysis, AnalysisSkill.analysis_id == Analysis.id)\
+        .join(JobDescription, Analysis.job_description_id == JobDescription.id)\
+        .filter(AnalysisSkill.user_id == user_id, AnalysisSkill.status == 'missing')\
+        .group_by(JobDescription.job_family, AnalysisSkill.skill)\
+        .order_by(func.count().desc(), AnalysisSkill.skill)\
+        .all()
+
+    top_missing = {}
+    for row in missing_rows:
+        family_skills = top_missing.setdefault(row.job_family, [])
+        if len(family_skills) < limit:
+            family_skills.append({'skill': row.skill, 'count': row.count})
+
+    return [{
+        'job_family': row.job_family or 'general',
+        'analyses': row.analyses,
+        'avg_composite_score': round(row.composite, 2),
+        'avg_skill_match_score': round(row.skill_match, 2),
+        'top_missing_skills': top_missing.get(row.job_family, [])
+    } for row in rows]
+
+@insights_bp.route('/insights/skill-gaps', methods=['GET'])
+@login_required
+@cross_origin()
+@scope_required('read')
+def get_skill_gaps():
+    """Aggregate skill gaps, score trends and job family stats over the user's history"""
+    try:
+        limit = max(1, min(request.args.get('limit', 5, type=int), 50))
+        interval = request.args.get('interval', 'week')
+        if interval not in TREND_INTERVALS:
+            return jsonify({'error': f"interval must be one of: {', '.join(TREND_INTERVALS)}"}), 400
+
+        return jsonify({
+            'success': True,
+            'skills': skill_frequencies(current_user.id, limit),
+            'score_trend': score_trend(current_user.id, interval),
+            'job_families': job_family_stats(current_user.id, limit)
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to get skill gaps: {str(e)}'}), 500
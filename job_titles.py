@@ -0,0 +1,84 @@
+"""
+Job title classification: the job families of the titles a job description mentions
+
+A TitleMatcher compiles a {title: family} map (the skill taxonomy's titles,
+or a scoring model's title_families) into a trie of their words. A job
+description is split into words once and scanned left to right. At each
+word that starts a title, the longest title found there is taken and the
+scan resumes after it, so:
+
+    - titles only match whole words: 'cto' does not match in 'doctor',
+      nor 'ui designer' in 'gui designer'
+    - a title also matches with its last word in the plural
+      ('data analysts')
+    - 'senior machine learning engineer' is one machine learning engineer,
+      not also a 'learning engineer'
+
+The cost is a dict lookup per word of the text, and one more per word
+matched after the first word of a title, however many titles there are.
+Results are memoized per job description, keyed by a BLAKE2 digest of its
+text, so the many analyses of one posting classify it once.
+"""
+
+import hashlib
+import re
+
+TITLE_PATTERN = re.compile(r'[a-z0-9]+(?: [a-z0-9]+)*')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+TITLE_CACHE_SIZE = 10000
+
+
+class TitleMatcher:
+    """Job families of the titles a text mentions, in order of first mention"""
+
+    def __init__(self, titles, cache_size=TITLE_CACHE_SIZE):
+        self._titles = {}
+        for title, family in titles.items():
+            key = title.lower() if isinstance(title, str) else ''
+            if not TITLE_PATTERN.fullmatch(key):
+                raise ValueError(f'{title!r} must be words of letters and digits separated by single spaces')
+            if self._titles.setdefault(tuple(key.split(' ')), family) != family:
+                raise ValueError(f'{title!r} is listed under two families')
+        # Plurals never override a title listed as such
+        for words, family in list(self._titles.items()):
+            self._titles.setdefault(words[:-1] + (words[-1] + 's',), family)
+        # Word trie: word -> [family of the title ending here or None, {next word: node}]
+        self._trie = {}
+        for words, family in self._titles.items():
+            children = self._trie
+            for word in words[:-1]:
+                children = children.setdefault(word, [None, {}])[1]
+            children.setdefault(words[-1], [None, {}])[0] = family
+        self.title_count = len(titles)
+        self._cache = {}
+        self._cache_size = cache_size
+
+    def families(self, text):
+        """Families of the titles in text, each once, in the order their first title appears"""
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cache = self._cache
+        families = cache.get(key)
+        if families is None:
+            families = self._scan(WORD_PATTERN.findall(text.lower()))
+            if len(cache) >= self._cache_size:
+                cache.clear()
+            cache[key] = families
+        return families
+
+    def _scan(self, words):
+        trie, end = self._trie, len(words)
+        found, resume = {}, 0
+        for start in [i for i, word in enumerate(words) if word in trie]:
+            if start < resume:
+                continue
+            # Longest title starting here
+            family, children, i = None, trie, start
+            while i < end and words[i] in children:
+                node = children[words[i]]
+                i += 1
+                if node[0] is not None:
+                    family, resume = node[0], i
+                children = node[1]
+            if family is not None:
+                found.setdefault(family)
+        return tuple(found)
@@ -11,8 +11,18 @@ from datetime import timedelta
 
 # Import our models and routes
 from src.models import db, User
+from src.utils.db_profile import sqlite_engine_options, configure_sqlite
+from src.utils.user_cache import user_cache
+from src.utils.api_tokens import api_tokens
+from src.utils.rate_limit import rate_limiter
 from src.routes.analyzer import analyzer_bp
 from src.routes.auth import auth_bp
+from src.routes.insights import insights_bp
+from src.routes.search import search_bp
+from src.routes.export import export_bp
+from src.utils.retention import retention_cli
+from src.utils.rescoring import scores_cli
+from src.utils.skill_vocab import skills_cli
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 
@@ -23,8 +33,93 @@ app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirnam
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
 
+# SQLite performance profile (see src/utils/db_profile.py for defaults)
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+app.config['SQLITE_CACHE_SIZE_KB'] = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_POOL_SIZE'] = int(os.environ.get('SQLITE_POOL_SIZE', 5))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config)
+
+# Analyzer tiers: step down from 'full' to 'keyword' when a worker is overloaded
+app.config['ANALYZER_DEFAULT_TIER'] = os.environ.get('ANALYZER_DEFAULT_TIER', 'full')
+app.config['ANALYZER_MAX_QUEUE_DEPTH'] = int(os.environ.get('ANALYZER_MAX_QUEUE_DEPTH', 8))
+app.config['ANALYZER_P95_LATENCY_MS'] = int(os.environ.get('ANALYZER_P95_LATENCY_MS', 3000))
+app.config['ANALYZER_LATENCY_WINDOW_SECONDS'] = int(os.environ.get('ANALYZER_LATENCY_WINDOW_SECONDS', 30))
+
+# Analysis deadline: default budget, overridable per request via X-Analysis-Deadline-Ms
+app.config['ANALYSIS_DEADLINE_MS'] = int(os.environ.get('ANALYSIS_DEADLINE_MS', 5000))
+app.config['ANALYSIS_DEADLINE_MAX_MS'] = int(os.environ.get('ANALYSIS_DEADLINE_MAX_MS', 30000))
+app.config['ANALYSIS_STAGE_BUDGETS_MS'] = {
+    'keywords': {'full': 600, 'degraded': 50},
+    'similarity': {'full': 200}
+}
+
+# Write-behind persistence of analyses (see src/utils/write_behind.py for durability)
+app.config['ANALYSIS_WRITE_BEHIND'] = os.environ.get('ANALYSIS_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+app.config['ANALYSIS_WRITE_BEHIND_BATCH_SIZE'] = int(os.environ.get('ANALYSIS_WRITE_BEHIND_BATCH_SIZE', 50))
+app.config['ANALYSIS_WRITE_BEHIND_INTERVAL'] = float(os.environ.get('ANALYSIS_WRITE_BEHIND_INTERVAL', 1.0))
+app.config['ANALYSIS_WRITE_BEHIND_MAX_QUEUE'] = int(os.environ.get('ANALYSIS_WRITE_BEHIND_MAX_QUEUE', 1000))
+
+# Scoring model artifact, reloaded when the file changes (see src/utils/scoring_model.py)
+app.config['SCORING_MODEL_PATH'] = os.environ.get('SCORING_MODEL_PATH')
+app.config['SCORING_MODEL_CHECK_SECONDS'] = float(os.environ.get('SCORING_MODEL_CHECK_SECONDS', 5))
+
+# Skill taxonomy and its compiled, memory-mapped vocabulary (see src/utils/skill_vocab.py)
+app.config['SKILL_TAXONOMY_PATH'] = os.environ.get('SKILL_TAXONOMY_PATH')
+app.config['SKILL_VOCAB_PATH'] = os.environ.get('SKILL_VOCAB_PATH')
+app.config['SKILL_VOCAB_CHECK_SECONDS'] = float(os.environ.get('SKILL_VOCAB_CHECK_SECONDS', 5))
+app.config['SKILL_FUZZY_DISTANCE'] = int(os.environ.get('SKILL_FUZZY_DISTANCE', 0))
+
+# Retention (flask retention run): archive analyses older than this many days
+app.config['RETENTION_ANALYSIS_DAYS'] = int(os.environ.get('RETENTION_ANALYSIS_DAYS', 365))
+app.config['RETENTION_BATCH_SIZE'] = int(os.environ.get('RETENTION_BATCH_SIZE', 500))
+app.config['RETENTION_BATCH_PAUSE'] = float(os.environ.get('RETENTION_BATCH_PAUSE', 0.1))
+app.config['RETENTION_VACUUM_PAGES'] = int(os.environ.get('RETENTION_VACUUM_PAGES', 1000))
+app.config['RETENTION_VACUUM_MAX_PAGES'] = int(os.environ.get('RETENTION_VACUUM_MAX_PAGES', 100000))
+app.config['ANALYSIS_ARCHIVE_DATABASE_URI'] = os.environ.get('ANALYSIS_ARCHIVE_DATABASE_URI')
+
+# Flask-Login user loader cache
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+app.config['USER_CACHE_TTL_SECONDS'] = int(os.environ.get('USER_CACHE_TTL_SECONDS', 300))
+
+# Password hashing: werkzeug method and the per-process hashing pool
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+app.config['PASSWORD_HASH_TIMEOUT_SECONDS'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+
+# Signed API bearer tokens (see src/utils/api_tokens.py); secret defaults to SECRET_KEY
+app.config['API_TOKEN_SECRET'] = os.environ.get('API_TOKEN_SECRET')
+app.config['API_TOKEN_TTL_DAYS'] = int(os.environ.get('API_TOKEN_TTL_DAYS', 30))
+app.config['API_TOKEN_MAX_TTL_DAYS'] = int(os.environ.get('API_TOKEN_MAX_TTL_DAYS', 365))
+app.config['API_TOKEN_DENYLIST_SYNC_SECONDS'] = float(os.environ.get('API_TOKEN_DENYLIST_SYNC_SECONDS', 30))
+
+# Rate limits and concurrency caps per endpoint (see src/utils/rate_limit.py)
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['RATE_LIMIT_STORAGE'] = os.environ.get('RATE_LIMIT_STORAGE', 'memory')  # memory, sqlite
+app.config['RATE_LIMIT_SQLITE_PATH'] = os.environ.get('RATE_LIMIT_SQLITE_PATH')
+app.config['RATE_LIMITS'] = {
+    'analyze': {
+        'user': {'per_minute': 12, 'burst': 10},
+        'ip': {'per_minute': 30, 'burst': 20},
+        'concurrency': 4
+    },
+    'search': {
+        'user': {'per_minute': 120, 'burst': 30}
+    },
+    'export': {
+        'user': {'per_minute': 2, 'burst': 3},
+        'concurrency': 2
+    }
+}
+
 # Initialize extensions
 db.init_app(app)
+configure_sqlite(app, db)
+user_cache.configure(app)
+rate_limiter.configure(app)
 migrate = Migrate(app, db)
 
 # Setup CORS with credentials support
@@ -38,11 +133,22 @@ login_manager.login_message = 'Please log in to access this page.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
+
+@login_manager.request_loader
+def load_user_from_request(request):
+    # Authorization: Bearer API tokens, checked without a database lookup
+    return api_tokens.load_user(request)
 
 # Register blueprints
 app.register_blueprint(analyzer_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
+app.register_blueprint(insights_bp, url_prefix='/api')
+app.register_blueprint(search_bp, url_prefix='/api')
+app.register_blueprint(export_bp, url_prefix='/api')
+app.cli.add_command(retention_cli)
+app.cli.add_command(scores_cli)
+app.cli.add_command(skills_cli)
 
 # Create database directory if it doesn't exist
 os.makedirs(os.path.join(os.path.dirname(__file__), 'database'), exist_ok=True)
@@ -10,6 +10,9 @@ from datetime import timedelta
 
 # Import our models and routes
 from src.models import db, User
+from src.utils.db_profile import sqlite_engine_options, configure_sqlite
+from src.utils.user_cache import user_cache
+from src.utils.api_tokens import api_tokens
 from src.routes.analyzer_minimal import analyzer_bp
 from src.routes.auth import auth_bp
 
@@ -21,9 +24,22 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'resume_analyzer.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config)
+
+# Flask-Login user loader cache
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+app.config['USER_CACHE_TTL_SECONDS'] = int(os.environ.get('USER_CACHE_TTL_SECONDS', 300))
+
+# Password hashing: werkzeug method and the per-process hashing pool
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+app.config['PASSWORD_HASH_TIMEOUT_SECONDS'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
 
 # Initialize extensions
 db.init_app(app)
+configure_sqlite(app, db)
+user_cache.configure(app)
 
 # Setup CORS with credentials support
 CORS(app, supports_credentials=True)
@@ -36,7 +52,12 @@ login_manager.login_message = 'Please log in to access this page.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
+
+@login_manager.request_loader
+def load_user_from_request(request):
+    # Authorization: Bearer API tokens, checked without a database lookup
+    return api_tokens.load_user(request)
 
 # Register blueprints
 app.register_blueprint(analyzer_bp, url_prefix='/api')
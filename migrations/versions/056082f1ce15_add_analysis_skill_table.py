@@ -0,0 +1,59 @@
+"""add analysis_skill table
+
+Revision ID: 056082f1ce15
+Revises: 09468c9104cf
+Create Date: 2026-10-19 10:41:07.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '056082f1ce15'
+down_revision = '09468c9104cf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The analysis JSON columns keep their TEXT storage; SQLite JSON1 reads
+    # the existing json.dumps() values as they are.
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_skill (
+            id INTEGER NOT NULL PRIMARY KEY,
+            analysis_id INTEGER NOT NULL REFERENCES analysis (id),
+            user_id INTEGER NOT NULL REFERENCES user (id),
+            skill VARCHAR(100) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            status VARCHAR(10) NOT NULL
+        )
+    ''')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_skill_user_skill '
+               'ON analysis_skill (user_id, skill, status, analysis_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_skill_analysis '
+               'ON analysis_skill (analysis_id)')
+
+    # Backfill analyses that have no skill rows yet
+    op.execute('''
+        CREATE TEMP TABLE analysis_skill_backfill AS
+        SELECT id FROM analysis
+        WHERE NOT EXISTS (SELECT 1 FROM analysis_skill s WHERE s.analysis_id = analysis.id)
+    ''')
+    for column, status in (('matching_skills', 'matching'), ('missing_skills', 'missing')):
+        op.execute(f'''
+            INSERT INTO analysis_skill (analysis_id, user_id, skill, category, status)
+            SELECT a.id, a.user_id, skill.value, category.key, '{status}'
+            FROM analysis a
+            JOIN analysis_skill_backfill b ON b.id = a.id,
+                 json_each(a.{column}) AS category,
+                 json_each(category.value) AS skill
+            WHERE json_valid(a.{column})
+        ''')
+    op.execute('DROP TABLE analysis_skill_backfill')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_analysis_skill_analysis')
+    op.execute('DROP INDEX IF EXISTS ix_analysis_skill_user_skill')
+    op.execute('DROP TABLE IF EXISTS analysis_skill')
@@ -0,0 +1,35 @@
+"""add history indexes
+
+Revision ID: 09468c9104cf
+Revises: 
+Create Date: 2026-10-19 10:12:41.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '09468c9104cf'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: db.create_all() already builds these on fresh databases
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_user_created '
+               'ON analysis (user_id, created_at, id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_resume '
+               'ON analysis (resume_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_resume_user_uploaded '
+               'ON resume (user_id, is_active, uploaded_at)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_resume_user_filename '
+               'ON resume (user_id, filename)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_resume_user_filename')
+    op.execute('DROP INDEX IF EXISTS ix_resume_user_uploaded')
+    op.execute('DROP INDEX IF EXISTS ix_analysis_resume')
+    op.execute('DROP INDEX IF EXISTS ix_analysis_user_created')
@@ -0,0 +1,156 @@
+"""move resume and job description text into content_blob
+
+Revision ID: 46891dd3cec4
+Revises: 80962a85f06e
+Create Date: 2026-10-19 11:32:40.000000
+
+Texts are stored once per sha256, zlib-compressed, and job descriptions
+with the same text are merged into one row. The freed pages stay in the
+file until it is vacuumed; run VACUUM once after upgrading to shrink it.
+
+"""
+from datetime import datetime
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '46891dd3cec4'
+down_revision = '80962a85f06e'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def encode(text):
+    """Same encoding as ContentBlob.encode at the time of this revision"""
+    raw = text.encode('utf-8')
+    compressed = zlib.compress(raw, 6)
+    if len(compressed) < len(raw):
+        return 'zlib', len(raw), compressed
+    return 'raw', len(raw), raw
+
+
+def decode(codec, data):
+    if codec == 'zlib':
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+
+def move_content(conn, table):
+    """Store each row's text as a blob and point content_hash at it, in batches"""
+    columns = [column['name'] for column in sa.inspect(conn).get_columns(table)]
+    if 'content' not in columns:
+        return False
+    if 'content_hash' not in columns:
+        op.add_column(table, sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(f'SELECT id, content FROM {table} '
+                    'WHERE id > :last_id AND content_hash IS NULL ORDER BY id LIMIT :limit'),
+            {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        blobs = {}
+        updates = []
+        for row in rows:
+            text = row.content or ''
+            content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            if content_hash not in blobs:
+                codec, size, data = encode(text)
+                blobs[content_hash] = {'hash': content_hash, 'codec': codec, 'size': size,
+                                       'data': data, 'created_at': datetime.utcnow()}
+            updates.append({'id': row.id, 'content_hash': content_hash})
+        conn.execute(
+            sa.text('INSERT OR IGNORE INTO content_blob (hash, codec, size, data, created_at) '
+                    'VALUES (:hash, :codec, :size, :data, :created_at)'),
+            list(blobs.values())
+        )
+        conn.execute(sa.text(f'UPDATE {table} SET content_hash = :content_hash WHERE id = :id'), updates)
+        last_id = rows[-1].id
+    return True
+
+
+def upgrade():
+    conn = op.get_bind()
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS content_blob (
+            hash VARCHAR(64) NOT NULL PRIMARY KEY,
+            codec VARCHAR(10) NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at DATETIME
+        )
+    ''')
+
+    if move_content(conn, 'resume'):
+        with op.batch_alter_table('resume') as batch_op:
+            batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+            batch_op.create_foreign_key('fk_resume_content_hash', 'content_blob', ['content_hash'], ['hash'])
+            batch_op.drop_column('content')
+
+    if move_content(conn, 'job_description'):
+        # Merge duplicate postings into the oldest row with the same text
+        op.execute('''
+            CREATE TEMP TABLE job_description_keep AS
+            SELECT id, (SELECT MIN(k.id) FROM job_description k
+                        WHERE k.content_hash = job_description.content_hash) AS keep_id
+            FROM job_description
+        ''')
+        op.execute('''
+            UPDATE analysis SET job_description_id = (
+                SELECT keep_id FROM job_description_keep k WHERE k.id = analysis.job_description_id
+            )
+            WHERE job_description_id IN (SELECT id FROM job_description_keep WHERE id != keep_id)
+        ''')
+        op.execute('DELETE FROM job_description '
+                   'WHERE id IN (SELECT id FROM job_description_keep WHERE id != keep_id)')
+        op.execute('DROP TABLE job_description_keep')
+
+        with op.batch_alter_table('job_description') as batch_op:
+            batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+            batch_op.create_foreign_key('fk_job_description_content_hash', 'content_blob',
+                                        ['content_hash'], ['hash'])
+            batch_op.drop_column('content')
+
+    op.execute('CREATE INDEX IF NOT EXISTS ix_job_description_content_hash '
+               'ON job_description (content_hash)')
+
+
+def restore_content(conn, table):
+    """Copy blob text back into a content column"""
+    op.add_column(table, sa.Column('content', sa.Text(), nullable=True))
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(f'SELECT t.id, b.codec, b.data FROM {table} t '
+                    'JOIN content_blob b ON b.hash = t.content_hash '
+                    'WHERE t.id > :last_id ORDER BY t.id LIMIT :limit'),
+            {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text(f'UPDATE {table} SET content = :content WHERE id = :id'),
+            [{'id': row.id, 'content': decode(row.codec, row.data)} for row in rows]
+        )
+        last_id = rows[-1].id
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('content_hash')
+
+
+def downgrade():
+    # Merged job descriptions stay merged
+    conn = op.get_bind()
+    op.execute('DROP INDEX IF EXISTS ix_job_description_content_hash')
+    restore_content(conn, 'resume')
+    restore_content(conn, 'job_description')
+    op.execute('DROP TABLE IF EXISTS content_blob')
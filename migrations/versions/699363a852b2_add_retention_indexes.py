@@ -0,0 +1,30 @@
+"""add analysis indexes for the retention job
+
+Revision ID: 699363a852b2
+Revises: 9c2d03bae0ad
+Create Date: 2026-10-19 12:20:44.000000
+
+The analysis_archive table itself is created by db.create_all().
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '699363a852b2'
+down_revision = '9c2d03bae0ad'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_job_description '
+               'ON analysis (job_description_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_analysis_created '
+               'ON analysis (created_at)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_analysis_created')
+    op.execute('DROP INDEX IF EXISTS ix_analysis_job_description')
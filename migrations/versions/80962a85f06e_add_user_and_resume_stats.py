@@ -0,0 +1,51 @@
+"""add user_stats and resume_stats counters
+
+Revision ID: 80962a85f06e
+Revises: f3f7745906ba
+Create Date: 2026-10-19 11:14:52.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '80962a85f06e'
+down_revision = 'f3f7745906ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER NOT NULL PRIMARY KEY REFERENCES user (id),
+            resume_count INTEGER NOT NULL,
+            analysis_count INTEGER NOT NULL
+        )
+    ''')
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS resume_stats (
+            resume_id INTEGER NOT NULL PRIMARY KEY REFERENCES resume (id),
+            analysis_count INTEGER NOT NULL
+        )
+    ''')
+
+    # Recount from scratch so the counters match the existing rows
+    op.execute('''
+        INSERT OR REPLACE INTO user_stats (user_id, resume_count, analysis_count)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM resume r WHERE r.user_id = u.id AND r.is_active = 1),
+               (SELECT COUNT(*) FROM analysis a WHERE a.user_id = u.id)
+        FROM user u
+    ''')
+    op.execute('''
+        INSERT OR REPLACE INTO resume_stats (resume_id, analysis_count)
+        SELECT r.id, (SELECT COUNT(*) FROM analysis a WHERE a.resume_id = r.id)
+        FROM resume r
+    ''')
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS resume_stats')
+    op.execute('DROP TABLE IF EXISTS user_stats')
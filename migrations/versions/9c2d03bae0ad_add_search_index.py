@@ -0,0 +1,28 @@
+"""add search_index FTS5 table
+
+Revision ID: 9c2d03bae0ad
+Revises: 46891dd3cec4
+Create Date: 2026-10-19 11:51:06.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.search_index import SEARCH_INDEX_DDL, rebuild_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2d03bae0ad'
+down_revision = '46891dd3cec4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(SEARCH_INDEX_DDL)
+    # Index existing documents; up-to-date rows are only compared
+    rebuild_search_index(op.get_bind())
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS search_index')
@@ -0,0 +1,41 @@
+"""add user_session columns and indexes for API tokens
+
+Revision ID: b57d2c0e41a9
+Revises: 699363a852b2
+Create Date: 2026-10-19 13:05:12.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b57d2c0e41a9'
+down_revision = '699363a852b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if not inspector.has_table('user_session'):
+        # Created with the new columns by db.create_all()
+        return
+    columns = [column['name'] for column in inspector.get_columns('user_session')]
+    if 'name' not in columns:
+        op.add_column('user_session', sa.Column('name', sa.String(length=100), nullable=True))
+    if 'scopes' not in columns:
+        op.add_column('user_session', sa.Column('scopes', sa.String(length=255), nullable=True))
+    op.execute('CREATE INDEX IF NOT EXISTS ix_user_session_user '
+               'ON user_session (user_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_user_session_revoked '
+               'ON user_session (is_active, expires_at)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_user_session_revoked')
+    op.execute('DROP INDEX IF EXISTS ix_user_session_user')
+    with op.batch_alter_table('user_session') as batch_op:
+        batch_op.drop_column('scopes')
+        batch_op.drop_column('name')
@@ -0,0 +1,48 @@
+"""make analysis ids AUTOINCREMENT so archived ids are never reused
+
+Revision ID: c81e4a7d9f20
+Revises: b57d2c0e41a9
+Create Date: 2026-10-19 15:40:03.000000
+
+Without AUTOINCREMENT SQLite hands out MAX(id) + 1, so once the retention
+job archived the newest analyses their ids came back for new ones. The
+table is rebuilt with AUTOINCREMENT and its sequence starts above every id
+in analysis and analysis_archive. An archive kept in a separate database
+(ANALYSIS_ARCHIVE_DATABASE_URI) is not seen here; the retention job refuses
+to archive over an archived analysis of another row.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4a7d9f20'
+down_revision = 'b57d2c0e41a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if not inspector.has_table('analysis'):
+        # Created with AUTOINCREMENT by db.create_all()
+        return
+    sql = conn.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'analysis'")).scalar()
+    if 'AUTOINCREMENT' not in sql.upper():
+        with op.batch_alter_table('analysis', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+    highest = 'SELECT COALESCE(MAX(id), 0) FROM analysis'
+    if inspector.has_table('analysis_archive'):
+        highest = f'SELECT MAX(({highest}), (SELECT COALESCE(MAX(id), 0) FROM analysis_archive))'
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'analysis'")
+    op.execute(f"INSERT INTO sqlite_sequence (name, seq) SELECT 'analysis', ({highest})")
+
+
+def downgrade():
+    with op.batch_alter_table('analysis', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
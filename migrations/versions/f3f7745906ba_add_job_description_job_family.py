@@ -0,0 +1,52 @@
+"""add job_description.job_family
+
+Revision ID: f3f7745906ba
+Revises: 056082f1ce15
+Create Date: 2026-10-19 10:58:23.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.skill_database import get_job_family
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3f7745906ba'
+down_revision = '056082f1ce15'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    conn = op.get_bind()
+    columns = [column['name'] for column in sa.inspect(conn).get_columns('job_description')]
+    if 'job_family' not in columns:
+        op.add_column('job_description', sa.Column('job_family', sa.String(length=50), nullable=True))
+    if 'content' not in columns:
+        # Text already moved to content_blob: the database was created at a
+        # later schema and every row has its family set
+        return
+
+    # Classify existing job descriptions in batches
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text('SELECT id, content FROM job_description '
+                    'WHERE id > :last_id AND job_family IS NULL ORDER BY id LIMIT :limit'),
+            {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text('UPDATE job_description SET job_family = :family WHERE id = :id'),
+            [{'id': row.id, 'family': get_job_family(row.content or '')} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    with op.batch_alter_table('job_description') as batch_op:
+        batch_op.drop_column('job_family')
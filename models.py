@@ -1,10 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import DDL, event, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import deferred
+from src.utils.search_index import SEARCH_INDEX_DDL, index_document, remove_document, add_owner
 from datetime import datetime
+import hashlib
 import json
+import zlib
 
 db = SQLAlchemy()
 
+# create_all() knows nothing about virtual tables
+event.listen(db.metadata, 'after_create', DDL(SEARCH_INDEX_DDL))
+
 class User(UserMixin, db.Model):
     """User model for authentication and profile management"""
     id = db.Column(db.Integer, primary_key=True)
@@ -20,12 +29,80 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+class ContentBlob(db.Model):
+    """Content-addressed, compressed text shared by resumes and job descriptions"""
+    __tablename__ = 'content_blob'
+    
+    hash = db.Column(db.String(64), primary_key=True)  # sha256 of the UTF-8 text
+    codec = db.Column(db.String(10), nullable=False)   # zlib, raw
+    size = db.Column(db.Integer, nullable=False)       # uncompressed bytes
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ContentBlob {self.hash[:12]} {self.codec} {self.size}>'
+    
+    @staticmethod
+    def hash_text(text):
+        """Content address of a text"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def encode(text):
+        """Compress a text, returning (codec, size, data)"""
+        raw = text.encode('utf-8')
+        compressed = zlib.compress(raw, 6)
+        # Short texts can grow under zlib; keep those as they are
+        if len(compressed) < len(raw):
+            return 'zlib', len(raw), compressed
+        return 'raw', len(raw), raw
+    
+    @staticmethod
+    def decode(codec, data):
+        """Decompress stored data back to text"""
+        if codec == 'zlib':
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+    
+    @property
+    def text(self):
+        return self.decode(self.codec, self.data)
+    
+    @classmethod
+    def store(cls, text):
+        """Store a text if it is not stored yet and return its hash
+        
+        INSERT OR IGNORE in the current transaction makes concurrent stores
+        of the same text (request threads, the write-behind writer) safe.
+        """
+        content_hash = cls.hash_text(text)
+        if db.session.get(cls, content_hash) is None:
+            codec, size, data = cls.encode(text)
+            db.session.execute(
+                sqlite_insert(cls.__table__)
+                .values(hash=content_hash, codec=codec, size=size, data=data,
+                        created_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=['hash'])
+            )
+        return content_hash
+    
+    @classmethod
+    def load(cls, content_hash):
+        """Text for a hash, or None if it is not stored"""
+        blob = db.session.get(cls, content_hash)
+        return blob.text if blob is not None else None
+
 class Resume(db.Model):
     """Resume model to store user's resume files and content"""
+    __table_args__ = (
+        db.Index('ix_resume_user_uploaded', 'user_id', 'is_active', 'uploaded_at'),
+        db.Index('ix_resume_user_filename', 'user_id', 'filename'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content_hash = db.Column(db.String(64), db.ForeignKey('content_blob.hash'), nullable=False)
     file_type = db.Column(db.String(10), nullable=False)  # txt, pdf, docx
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
@@ -35,13 +112,28 @@ class Resume(db.Model):
     
     def __repr__(self):
         return f'<Resume {self.filename}>'
+    
+    @property
+    def content(self):
+        """Resume text, decompressed from the content store"""
+        return ContentBlob.load(self.content_hash)
+    
+    @content.setter
+    def content(self, text):
+        self.content_hash = ContentBlob.store(text)
 
 class JobDescription(db.Model):
     """Job description model to store job postings for analysis"""
+    __table_args__ = (
+        # One row per distinct posting text, see find_or_create
+        db.Index('ix_job_description_content_hash', 'content_hash'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(200))
-    content = db.Column(db.Text, nullable=False)
+    job_family = db.Column(db.String(50), default='general')  # INDUSTRY_SKILLS key
+    content_hash = db.Column(db.String(64), db.ForeignKey('content_blob.hash'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -49,9 +141,43 @@ class JobDescription(db.Model):
     
     def __repr__(self):
         return f'<JobDescription {self.title}>'
+    
+    @property
+    def content(self):
+        """Posting text, decompressed from the content store"""
+        return ContentBlob.load(self.content_hash)
+    
+    @content.setter
+    def content(self, text):
+        self.content_hash = ContentBlob.store(text)
+    
+    @classmethod
+    def find_or_create(cls, content, **fields):
+        """Reuse the job description with the same text, or add a new one
+        
+        fields are only used for a new row; an existing posting keeps its own.
+        """
+        job_desc = cls.query.filter_by(content_hash=ContentBlob.hash_text(content))\
+            .order_by(cls.id).first()
+        if job_desc is None:
+            job_desc = cls(content=content, **fields)
+            db.session.add(job_desc)
+            db.session.flush()  # Get the ID
+        return job_desc
 
 class Analysis(db.Model):
     """Analysis model to store resume analysis results"""
+    __table_args__ = (
+        # Covers history listing and keyset pagination: user_id = ? ORDER BY created_at, id
+        db.Index('ix_analysis_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_analysis_resume', 'resume_id'),
+        db.Index('ix_analysis_job_description', 'job_description_id'),
+        # Retention: oldest analyses first
+        db.Index('ix_analysis_created', 'created_at'),
+        # Ids of archived analyses are never handed out again
+        {'sqlite_autoincrement': True},
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), nullable=False)
@@ -62,68 +188,120 @@ class Analysis(db.Model):
     similarity_score = db.Column(db.Float, nullable=False)
     skill_match_score = db.Column(db.Float, nullable=False)
     
-    # Analysis results (stored as JSON)
-    matching_keywords = db.Column(db.Text)  # JSON array
-    missing_keywords = db.Column(db.Text)   # JSON array
-    matching_skills = db.Column(db.Text)    # JSON object
-    missing_skills = db.Column(db.Text)     # JSON object
-    job_skills = db.Column(db.Text)         # JSON object
-    recommendations = db.Column(db.Text)    # JSON array
+    # Analysis results (SQLite JSON1 columns). Deferred in the 'detail'
+    # group: they are loaded and decoded together on first access, or
+    # up front with .options(undefer_group('detail')).
+    matching_keywords = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')  # array
+    missing_keywords = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')   # array
+    matching_skills = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')    # object
+    missing_skills = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')     # object
+    job_skills = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')         # object
+    recommendations = deferred(db.Column(db.JSON(none_as_null=True)), group='detail')    # array
+    
+    # JSON result columns and the JSON text of their empty value, for
+    # code that reads them as stored text
+    DETAIL_FIELDS = {
+        'matching_keywords': '[]',
+        'missing_keywords': '[]',
+        'matching_skills': '{}',
+        'missing_skills': '{}',
+        'job_skills': '{}',
+        'recommendations': '[]'
+    }
     
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     analysis_version = db.Column(db.String(10), default='1.0')
     
+    # Relationships
+    skills = db.relationship('AnalysisSkill', backref='analysis', lazy=True, cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Analysis {self.id} - Score: {self.composite_score}%>'
     
     def get_matching_keywords(self):
         """Get matching keywords as Python list"""
-        return json.loads(self.matching_keywords) if self.matching_keywords else []
+        return self.matching_keywords or []
     
     def set_matching_keywords(self, keywords):
         """Set matching keywords from Python list"""
-        self.matching_keywords = json.dumps(keywords)
+        self.matching_keywords = keywords
     
     def get_missing_keywords(self):
         """Get missing keywords as Python list"""
-        return json.loads(self.missing_keywords) if self.missing_keywords else []
+        return self.missing_keywords or []
     
     def set_missing_keywords(self, keywords):
         """Set missing keywords from Python list"""
-        self.missing_keywords = json.dumps(keywords)
+        self.missing_keywords = keywords
     
     def get_matching_skills(self):
         """Get matching skills as Python dict"""
-        return json.loads(self.matching_skills) if self.matching_skills else {}
+        return self.matching_skills or {}
     
     def set_matching_skills(self, skills):
         """Set matching skills from Python dict"""
-        self.matching_skills = json.dumps(skills)
+        self.matching_skills = skills
     
     def get_missing_skills(self):
         """Get missing skills as Python dict"""
-        return json.loads(self.missing_skills) if self.missing_skills else {}
+        return self.missing_skills or {}
     
     def set_missing_skills(self, skills):
         """Set missing skills from Python dict"""
-        self.missing_skills = json.dumps(skills)
+        self.missing_skills = skills
     
     def get_job_skills(self):
         """Get job skills as Python dict"""
-        return json.loads(self.job_skills) if self.job_skills else {}
+        return self.job_skills or {}
     
     def set_job_skills(self, skills):
         """Set job skills from Python dict"""
-        self.job_skills = json.dumps(skills)
+        self.job_skills = skills
     
     def get_recommendations(self):
         """Get recommendations as Python list"""
-        return json.loads(self.recommendations) if self.recommendations else []
+        return self.recommendations or []
     
     def set_recommendations(self, recs):
         """Set recommendations from Python list"""
-        self.recommendations = json.dumps(recs)
+        self.recommendations = recs
+    
+    def index_skills(self):
+        """Build the normalized analysis_skill rows from the matching/missing skill dicts"""
+        self.skills = [
+            AnalysisSkill(user_id=self.user_id, skill=skill, category=category, status=status)
+            for status, skills_by_category in (('matching', self.get_matching_skills()),
+                                               ('missing', self.get_missing_skills()))
+            for category, skills in skills_by_category.items()
+            for skill in skills
+        ]
+    
+    @classmethod
+    def summary_columns(cls):
+        """Scalar columns needed for list views (no JSON blobs)"""
+        return [cls.id, cls.resume_id, cls.job_description_id, cls.composite_score,
+                cls.similarity_score, cls.skill_match_score, cls.created_at,
+                cls.analysis_version]
+    
+    @classmethod
+    def summary_query(cls):
+        """Query selecting only the summary columns, yielding rows for summary_dict"""
+        return cls.query.with_entities(*cls.summary_columns())
+    
+    @staticmethod
+    def summary_dict(row):
+        """Convert an analysis or a summary_query row to a summary dictionary"""
+        return {
+            'id': row.id,
+            'resume_id': row.resume_id,
+            'job_description_id': row.job_description_id,
+            'composite_score': round(row.composite_score, 2),
+            'similarity_score': round(row.similarity_score, 2),
+            'skill_match_score': round(row.skill_match_score, 2),
+            'created_at': row.created_at.isoformat(),
+            'analysis_version': row.analysis_version
+        }
     
     def to_dict(self):
         """Convert analysis to dictionary for API responses"""
@@ -142,14 +320,208 @@ class Analysis(db.Model):
             'analysis_version': self.analysis_version
         }
 
+class AnalysisArchive(db.Model):
+    """Analysis moved out of the analysis table by the retention job
+    
+    The scores stay in plain columns for queries; the JSON results are kept
+    as one compressed payload. No foreign keys, so the table can also live
+    in a separate archive database.
+    """
+    __tablename__ = 'analysis_archive'
+    __table_args__ = (
+        db.Index('ix_analysis_archive_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)  # the original analysis id
+    user_id = db.Column(db.Integer, nullable=False)
+    resume_id = db.Column(db.Integer, nullable=False)
+    job_description_id = db.Column(db.Integer)
+    job_family = db.Column(db.String(50))
+    composite_score = db.Column(db.Float, nullable=False)
+    similarity_score = db.Column(db.Float, nullable=False)
+    skill_match_score = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime)
+    analysis_version = db.Column(db.String(10))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    codec = db.Column(db.String(10), nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # JSON object of the result fields
+    
+    def __repr__(self):
+        return f'<AnalysisArchive {self.id}>'
+    
+    def to_dict(self):
+        """Same shape as Analysis.to_dict, flagged as archived"""
+        result = Analysis.summary_dict(self)
+        del result['resume_id'], result['job_description_id']
+        result.update(json.loads(ContentBlob.decode(self.codec, self.payload)))
+        result['archived'] = True
+        return result
+
+class AnalysisSkill(db.Model):
+    """One job skill of an analysis, matched or missing, for index-backed skill queries"""
+    __tablename__ = 'analysis_skill'
+    __table_args__ = (
+        # "my analyses where <skill> was <status>" without touching analysis rows
+        db.Index('ix_analysis_skill_user_skill', 'user_id', 'skill', 'status', 'analysis_id'),
+        db.Index('ix_analysis_skill_analysis', 'analysis_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # denormalized from analysis
+    skill = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(10), nullable=False)  # matching, missing
+    
+    def __repr__(self):
+        return f'<AnalysisSkill {self.analysis_id} {self.skill} {self.status}>'
+
+class UserStats(db.Model):
+    """Per-user counters, maintained transactionally by the mapper events below"""
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    resume_count = db.Column(db.Integer, nullable=False, default=0)  # active resumes
+    analysis_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+
+class ResumeStats(db.Model):
+    """Per-resume counters, maintained transactionally by the mapper events below"""
+    __tablename__ = 'resume_stats'
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), primary_key=True)
+    analysis_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ResumeStats {self.resume_id}>'
+
+def bump_counter(connection, model, key, column, delta):
+    """Add delta to a counter row inside the flushing transaction, creating the row if needed"""
+    table = model.__table__
+    key_column = table.primary_key.columns.values()[0]
+    connection.execute(
+        sqlite_insert(table)
+        .values({key_column.name: key, column: max(delta, 0)})
+        .on_conflict_do_update(index_elements=[key_column],
+                               set_={column: table.c[column] + delta})
+    )
+
+@event.listens_for(Analysis, 'after_insert')
+def count_analysis_insert(mapper, connection, target):
+    bump_counter(connection, UserStats, target.user_id, 'analysis_count', 1)
+    bump_counter(connection, ResumeStats, target.resume_id, 'analysis_count', 1)
+
+@event.listens_for(Analysis, 'after_delete')
+def count_analysis_delete(mapper, connection, target):
+    bump_counter(connection, UserStats, target.user_id, 'analysis_count', -1)
+    bump_counter(connection, ResumeStats, target.resume_id, 'analysis_count', -1)
+
+@event.listens_for(Resume, 'after_insert')
+def count_resume_insert(mapper, connection, target):
+    if target.is_active is not False:
+        bump_counter(connection, UserStats, target.user_id, 'resume_count', 1)
+
+@event.listens_for(Resume, 'after_update')
+def count_resume_update(mapper, connection, target):
+    history = inspect(target).attrs.is_active.history
+    if history.has_changes():
+        was_active = history.deleted[0] is not False if history.deleted else True
+        if was_active != (target.is_active is not False):
+            bump_counter(connection, UserStats, target.user_id, 'resume_count', 1 if target.is_active else -1)
+
+@event.listens_for(Resume, 'after_delete')
+def count_resume_delete(mapper, connection, target):
+    connection.execute(ResumeStats.__table__.delete().where(ResumeStats.resume_id == target.id))
+    if target.is_active is not False:
+        bump_counter(connection, UserStats, target.user_id, 'resume_count', -1)
+
+@event.listens_for(User, 'after_delete')
+def delete_user_stats(mapper, connection, target):
+    connection.execute(UserStats.__table__.delete().where(UserStats.user_id == target.id))
+
+# Keep the FTS5 search index in step with resumes and job descriptions. The
+# index rows are written on the flushing connection, so they commit or roll
+# back with the documents. Bulk changes that bypass the ORM must reindex
+# themselves (or run `flask search rebuild-index`).
+@event.listens_for(Resume, 'after_insert')
+def index_resume_insert(mapper, connection, target):
+    if target.is_active is not False:
+        index_document(connection, 'resume', target.id, target.content_hash,
+                       [target.user_id], target.filename)
+
+@event.listens_for(Resume, 'after_update')
+def index_resume_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ('is_active', 'content_hash', 'filename')):
+        return
+    if target.is_active is False:
+        remove_document(connection, 'resume', target.id)
+    else:
+        index_document(connection, 'resume', target.id, target.content_hash,
+                       [target.user_id], target.filename)
+
+@event.listens_for(Resume, 'after_delete')
+def index_resume_delete(mapper, connection, target):
+    remove_document(connection, 'resume', target.id)
+
+@event.listens_for(JobDescription, 'after_insert')
+@event.listens_for(JobDescription, 'after_update')
+def index_job_description(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.content_hash.history.has_changes() or state.attrs.title.history.has_changes():
+        # Owners are added as users analyze the posting
+        owners = [row.user_id for row in connection.execute(
+            db.select(Analysis.user_id).distinct().where(Analysis.job_description_id == target.id))]
+        index_document(connection, 'job_description', target.id, target.content_hash,
+                       owners, target.title)
+
+@event.listens_for(JobDescription, 'after_delete')
+def index_job_description_delete(mapper, connection, target):
+    remove_document(connection, 'job_description', target.id)
+
+@event.listens_for(Analysis, 'after_insert')
+def index_analysis_owner(mapper, connection, target):
+    if target.job_description_id is not None:
+        add_owner(connection, 'job_description', target.job_description_id, target.user_id)
+
+class IdSequence(db.Model):
+    """Block-allocated id counters for rows written behind the request path"""
+    __tablename__ = 'id_sequence'
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False)
+    
+    def __repr__(self):
+        return f'<IdSequence {self.name}={self.next_value}>'
+
 class UserSession(db.Model):
-    """User session model for tracking active sessions"""
+    """User session model for tracking active sessions
+    
+    API bearer tokens are recorded here by their token id (never the token
+    itself), so they can be listed and revoked; see src/utils/api_tokens.py.
+    """
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     session_token = db.Column(db.String(255), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
+    name = db.Column(db.String(100))
+    scopes = db.Column(db.String(255))  # space-separated
+    
+    __table_args__ = (
+        db.Index('ix_user_session_user', 'user_id'),
+        db.Index('ix_user_session_revoked', 'is_active', 'expires_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'scopes': (self.scopes or '').split(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat(),
+            'is_active': self.is_active
+        }
     
     def __repr__(self):
         return f'<UserSession {self.user_id}>'
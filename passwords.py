@@ -0,0 +1,92 @@
+"""
+Password hashing on a dedicated, bounded executor
+
+Key derivation is deliberately CPU-heavy. Running it inline lets a burst of
+logins take every core from the analyses served by the same workers. Here
+at most PASSWORD_HASH_WORKERS hashes run at once per process (hashlib
+releases the GIL while deriving, so they run next to request threads), at
+most PASSWORD_HASH_MAX_PENDING may wait for a slot, and beyond that callers
+get PasswordHasherBusy, answered with 503 and Retry-After.
+
+PASSWORD_HASH_METHOD is any werkzeug method string, e.g. 'scrypt',
+'scrypt:16384:8:1' or 'pbkdf2:sha256:600000'. Hashes made with other
+parameters are upgraded on the next successful login.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """All hashing slots and the waiting queue are taken, or the wait timed out"""
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', workers=2, max_pending=32, timeout=10.0):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._apply(method, workers, max_pending, timeout)
+        self.rejected = 0
+
+    def _apply(self, method, workers, max_pending, timeout):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.method = method
+            self.workers = workers
+            self.max_pending = max_pending
+            self.timeout = timeout
+            self._method_prefix = None
+            self._slots = threading.BoundedSemaphore(workers + max_pending)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+    def configure(self, app):
+        config = app.config
+        self._apply(config.get('PASSWORD_HASH_METHOD', self.method),
+                    config.get('PASSWORD_HASH_WORKERS', self.workers),
+                    config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending),
+                    config.get('PASSWORD_HASH_TIMEOUT_SECONDS', self.timeout))
+
+    def _run(self, func, *args):
+        """Run func on the executor and wait for it, or raise PasswordHasherBusy"""
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        # The slot is freed when the hash finishes, even if the caller gave up
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    @property
+    def method_prefix(self):
+        """Normalized parameters of the current method, e.g. 'scrypt' -> 'scrypt:32768:8:1'"""
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with other parameters than the current method"""
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+    def status(self):
+        return {'method': self.method_prefix, 'workers': self.workers,
+                'max_pending': self.max_pending, 'rejected': self.rejected}
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,234 @@
+"""
+Token-bucket rate limiting and admission control for expensive endpoints
+
+Each limited endpoint has a name and an entry in RATE_LIMITS:
+
+    'analyze': {
+        'user': {'per_minute': 12, 'burst': 10},   # per logged-in user
+        'ip': {'per_minute': 30, 'burst': 20},     # per client address
+        'concurrency': 4                           # requests in flight, per process
+    }
+
+Any part may be left out. Buckets live in process memory by default; with
+RATE_LIMIT_STORAGE = 'sqlite' they are kept in a small SQLite file of their
+own (RATE_LIMIT_SQLITE_PATH) so all workers on a host share them. The
+concurrency cap is always per process. A request takes a token from each
+of its buckets only when every bucket and the concurrency cap admit it, so
+rejected requests cost the caller nothing. Rejected requests get 429 with a
+Retry-After header, and every decision is counted in status().
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, request, jsonify
+from flask_login import current_user
+
+
+def refill(tokens, updated, now, rate, burst):
+    """Tokens in a bucket at now, given its level at updated"""
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Buckets in a bounded LRU dict; evicted buckets simply start full again"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Take one token; returns (allowed, seconds until a token is available)"""
+        rejected, retry_after = self.take_all([(key, rate, burst)])
+        return rejected is None, retry_after
+
+    def take_all(self, buckets):
+        """Take one token from each (key, rate, burst) bucket, or from none of them
+
+        Returns (None, 0.0), or the index of the first bucket without a token
+        and the seconds until it has one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = [refill(*self._buckets.get(key, (burst, now)), now, rate, burst)
+                      for key, rate, burst in buckets]
+            for index, (tokens, (_, rate, _)) in enumerate(zip(levels, buckets)):
+                if tokens < 1:
+                    return index, (1 - tokens) / rate
+            for tokens, (key, _, _) in zip(levels, buckets):
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return None, 0.0
+
+
+class SQLiteBucketStore:
+    """Buckets shared by the worker processes of a host through a SQLite file
+
+    The file holds nothing worth keeping across a crash, so it runs with
+    synchronous=OFF; each take is one short IMMEDIATE transaction.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute('CREATE TABLE IF NOT EXISTS rate_bucket '
+                               '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            self._local.connection = connection
+            self._local.takes = 0
+        return connection
+
+    def take(self, key, rate, burst):
+        rejected, retry_after = self.take_all([(key, rate, burst)])
+        return rejected is None, retry_after
+
+    def take_all(self, buckets):
+        """Take one token from each (key, rate, burst) bucket, or from none of them (see MemoryBucketStore)"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            levels = []
+            for key, rate, burst in buckets:
+                row = connection.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+                tokens = refill(*row, now, rate, burst) if row else burst
+                if tokens < 1:
+                    connection.execute('ROLLBACK')
+                    return len(levels), (1 - tokens) / rate
+                levels.append(tokens)
+            connection.executemany('INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                                   [(key, tokens - 1, now) for tokens, (key, _, _) in zip(levels, buckets)])
+            self._local.takes += 1
+            if self._local.takes % self.PRUNE_EVERY == 0:
+                # Buckets idle for an hour are full again; drop them
+                connection.execute('DELETE FROM rate_bucket WHERE updated < ?', (now - 3600,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return None, 0.0
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = True
+        self.limits = {}
+        self.store = MemoryBucketStore()
+        self._semaphores = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def configure(self, app):
+        config = app.config
+        self.enabled = config.get('RATE_LIMIT_ENABLED', True)
+        self.limits = config.get('RATE_LIMITS', {})
+        if config.get('RATE_LIMIT_STORAGE', 'memory') == 'sqlite':
+            path = config.get('RATE_LIMIT_SQLITE_PATH') or os.path.join(app.instance_path, 'rate_limit.db')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.store = SQLiteBucketStore(path)
+        else:
+            self.store = MemoryBucketStore(config.get('RATE_LIMIT_MAX_KEYS', 10000))
+        self._semaphores = {
+            endpoint: threading.BoundedSemaphore(limit['concurrency'])
+            for endpoint, limit in self.limits.items() if limit.get('concurrency')
+        }
+        self._metrics = {}
+
+    def _count(self, endpoint, decision):
+        with self._lock:
+            counts = self._metrics.setdefault(endpoint, {})
+            counts[decision] = counts.get(decision, 0) + 1
+
+    def _check_buckets(self, endpoint, limit):
+        """Name of the first bucket that rejects the request and its retry delay, or (None, 0)
+
+        Tokens are taken from the buckets only when all of them admit the request.
+        """
+        keys = [('ip', request.remote_addr or 'unknown')]
+        if current_user.is_authenticated:
+            keys.insert(0, ('user', current_user.id))
+        scopes, buckets = [], []
+        for scope, identity in keys:
+            bucket = limit.get(scope)
+            if bucket:
+                scopes.append(scope)
+                buckets.append((f'{endpoint}:{scope}:{identity}', bucket['per_minute'] / 60.0, bucket['burst']))
+        if not buckets:
+            return None, 0.0
+        rejected, retry_after = self.store.take_all(buckets)
+        return (None, 0.0) if rejected is None else (scopes[rejected], retry_after)
+
+    def _reject(self, endpoint, scope, retry_after):
+        self._count(endpoint, f'rejected_{scope}')
+        response = jsonify({'error': 'Too many requests, please retry later', 'limit': scope})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def limit(self, endpoint):
+        """Decorator applying the RATE_LIMITS entry named endpoint to a view"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                limit = self.limits.get(endpoint)
+                if not self.enabled or not limit or request.method == 'OPTIONS':
+                    return view(*args, **kwargs)
+
+                # The concurrency slot first: a request turned away for it
+                # takes no tokens
+                semaphore = self._semaphores.get(endpoint)
+                if semaphore is not None and not semaphore.acquire(blocking=False):
+                    return self._reject(endpoint, 'concurrency', 1)
+                try:
+                    scope, retry_after = self._check_buckets(endpoint, limit)
+                except Exception:
+                    if semaphore is not None:
+                        semaphore.release()
+                    raise
+                if scope:
+                    if semaphore is not None:
+                        semaphore.release()
+                    return self._reject(endpoint, scope, retry_after)
+                self._count(endpoint, 'allowed')
+                if semaphore is None:
+                    return view(*args, **kwargs)
+                try:
+                    response = view(*args, **kwargs)
+                except Exception:
+                    semaphore.release()
+                    raise
+                # A streamed body is still being produced after the view returns
+                if isinstance(response, Response) and response.is_streamed:
+                    response.call_on_close(semaphore.release)
+                else:
+                    semaphore.release()
+                return response
+            return wrapper
+        return decorator
+
+    def status(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'storage': 'sqlite' if isinstance(self.store, SQLiteBucketStore) else 'memory',
+                'endpoints': {endpoint: dict(counts) for endpoint, counts in self._metrics.items()}
+            }
+
+
+rate_limiter = RateLimiter()
+rate_limited = rate_limiter.limit
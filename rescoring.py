@@ -0,0 +1,171 @@
+"""
+Bulk rescoring of stored analyses after a scoring change
+
+After deploying a scoring model with a new version (see scoring_model.py),
+run:
+
+    flask --app main scores rescore
+
+Every analysis whose analysis_version differs from the model version is
+rescored with the model's weights and composite coefficients from what is
+already stored: the per-category matched and total job skill counts come
+from analysis_skill, and the similarity score from the analysis row.
+Analyses are read in id order, in chunks. For each chunk the counts are
+loaded into NumPy matrices of analyses x categories, and all skill and
+composite scores are computed at once. The results are written back with
+the new version in short batched transactions.
+
+Archived analyses keep the scores and version they were archived with.
+"""
+
+import time
+import click
+import numpy as np
+from flask.cli import AppGroup
+from src.models import db
+from src.utils.scoring_model import ScoringModel, ScoringModelError, scoring_model
+
+scores_cli = AppGroup('scores', help='Recompute stored analysis scores.')
+
+ANALYSES_SQL = '''
+    SELECT id, similarity_score, skill_match_score, composite_score FROM analysis
+    WHERE id > ? AND (? OR analysis_version IS NULL OR analysis_version != ?)
+    ORDER BY id LIMIT ?
+'''
+
+SKILL_COUNTS_SQL = '''
+    SELECT analysis_id, category, SUM(status = 'matching'), COUNT(*) FROM analysis_skill
+    WHERE analysis_id BETWEEN ? AND ?
+    GROUP BY analysis_id, category
+'''
+
+UPDATE_SQL = 'UPDATE analysis SET skill_match_score = ?, composite_score = ?, analysis_version = ? WHERE id = ?'
+
+
+class CategoryColumns:
+    """Column index and model weight of every category seen in analysis_skill"""
+
+    def __init__(self, model):
+        self.model = model
+        self.index = {}
+        self.weights = []
+
+    def __getitem__(self, category):
+        column = self.index.get(category)
+        if column is None:
+            column = self.index[category] = len(self.weights)
+            self.weights.append(self.model.category_weight(category))
+        return column
+
+
+def compute_scores(similarity, matched, total, weights, model):
+    """Skill match and composite scores (0-100, rounded like the analyzer) for arrays of analyses
+
+    similarity is a vector of stored similarity scores, matched and total are
+    analyses x categories matrices of job skill counts, weights is the
+    category weight vector.
+    """
+    present = total > 0
+    ratio = np.divide(matched, total, out=np.zeros(matched.shape), where=present)
+    weight_sum = present @ weights
+    skill = np.divide(ratio @ weights, weight_sum, out=np.zeros(len(similarity)), where=weight_sum > 0) * 100
+    composite = model.composite_score(similarity, skill)
+    return np.round(skill, 2), np.round(composite, 2)
+
+
+def rescore_chunk(connection, ids, similarity, columns):
+    """Scores for the analyses ids (sorted), from their analysis_skill counts"""
+    counts = connection.exec_driver_sql(SKILL_COUNTS_SQL, (int(ids[0]), int(ids[-1]))).fetchall()
+    analysis_ids = np.fromiter((row[0] for row in counts), dtype=np.int64, count=len(counts))
+    categories = np.fromiter((columns[row[1]] for row in counts), dtype=np.int64, count=len(counts))
+
+    # Counts of analyses in the id range that are not being rescored are dropped
+    rows = np.searchsorted(ids, analysis_ids)
+    keep = (rows < len(ids)) & (ids[np.minimum(rows, len(ids) - 1)] == analysis_ids)
+    matched = np.zeros((len(ids), len(columns.weights)))
+    total = np.zeros_like(matched)
+    matched[rows[keep], categories[keep]] = np.fromiter((row[2] for row in counts), dtype=float,
+                                                        count=len(counts))[keep]
+    total[rows[keep], categories[keep]] = np.fromiter((row[3] for row in counts), dtype=float,
+                                                      count=len(counts))[keep]
+    return compute_scores(similarity, matched, total, np.array(columns.weights, dtype=float), columns.model)
+
+
+def rescore_analyses(engine, model=None, chunk_size=100000, batch_size=10000,
+                     pause=0.0, dry_run=False, everything=False):
+    """Rescore every analysis not at the model's version (all of them with everything); returns a stats dict
+
+    model defaults to the current scoring model. With dry_run nothing is
+    written and the stats report how far the scores would move.
+    """
+    model = model or scoring_model.current()
+    version = model.version
+    columns = CategoryColumns(model)
+    stats = {'version': version, 'rescored': 0, 'changed': 0, 'max_composite_change': 0.0}
+    last_id = 0
+    while True:
+        with engine.connect() as connection:
+            rows = connection.exec_driver_sql(ANALYSES_SQL, (last_id, int(everything), version, chunk_size)).fetchall()
+            if not rows:
+                break
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            similarity = np.fromiter((row[1] for row in rows), dtype=float, count=len(rows))
+            skill, composite = rescore_chunk(connection, ids, similarity, columns)
+
+            if dry_run:
+                current = np.array([row[2:] for row in rows], dtype=float)
+                changed = (current[:, 0] != skill) | (current[:, 1] != composite)
+                stats['changed'] += int(changed.sum())
+                stats['max_composite_change'] = max(stats['max_composite_change'],
+                                                    float(np.abs(current[:, 1] - composite).max()))
+
+        if not dry_run:
+            params = list(zip(skill.tolist(), composite.tolist(), [version] * len(ids), ids.tolist()))
+            for start in range(0, len(params), batch_size):
+                with engine.begin() as connection:
+                    connection.exec_driver_sql(UPDATE_SQL, params[start:start + batch_size])
+                if pause:
+                    time.sleep(pause)
+
+        stats['rescored'] += len(ids)
+        last_id = int(ids[-1])
+    return stats
+
+
+@scores_cli.command('rescore')
+@click.option('--chunk-size', default=100000, show_default=True, help='Analyses scored per vectorized pass.')
+@click.option('--batch-size', default=10000, show_default=True, help='Rows per update transaction.')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to sleep between update transactions.')
+@click.option('--dry-run', is_flag=True, help='Report how scores would change without writing.')
+@click.option('--all', 'everything', is_flag=True, help='Include analyses already at the model version.')
+@click.option('--model', 'model_path', type=click.Path(exists=True, dir_okay=False),
+              help='Score with this model file instead of the configured one.')
+def rescore_command(chunk_size, batch_size, pause, dry_run, everything, model_path):
+    """Recompute skill match and composite scores of analyses not at the scoring model version"""
+    try:
+        model = ScoringModel.load(model_path) if model_path else scoring_model.current()
+    except ScoringModelError as e:
+        raise click.ClickException(f'invalid scoring model: {e}')
+    start = time.perf_counter()
+    stats = rescore_analyses(db.engine, model, chunk_size=chunk_size, batch_size=batch_size,
+                             pause=pause, dry_run=dry_run, everything=everything)
+    elapsed = time.perf_counter() - start
+    if dry_run:
+        click.echo(f"{stats['rescored']} analyses to rescore: "
+                   f"{stats['changed']} would change, composite by up to {stats['max_composite_change']:.2f}")
+    else:
+        click.echo(f"rescored {stats['rescored']} analyses to version {stats['version']} in {elapsed:.1f}s")
+
+
+@scores_cli.command('check-model')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def check_model_command(path):
+    """Validate a scoring model file before deploying it"""
+    try:
+        model = ScoringModel.load(path)
+    except ScoringModelError as e:
+        raise click.ClickException(f'invalid scoring model: {e}')
+    current = scoring_model.current()
+    click.echo(f'scoring model {model.version} is valid'
+               + (' (same version as the current model: give changes a new version)'
+                  if model.version == current.version else f' (current model is {current.version})'))
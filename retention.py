@@ -0,0 +1,240 @@
+"""
+Retention: archive old analyses and compact the database
+
+Meant to run from cron, e.g. nightly:
+
+    flask --app main retention run
+
+Every step works in bounded batches of short transactions with a pause in
+between, so request threads never wait long for the write lock:
+
+1. Analyses older than RETENTION_ANALYSIS_DAYS are copied to
+   analysis_archive (scores as columns, results as one compressed payload),
+   then deleted with their analysis_skill rows. The user and resume
+   counters are adjusted here, because bulk deletes bypass the mapper
+   events. A batch interrupted between the copy and the delete is simply
+   redone on the next run: an archived row is replaced only by the same
+   analysis, and an id already archived for another analysis stops the run
+   (analysis ids are AUTOINCREMENT, so only a database created before that
+   and not yet migrated can reuse them).
+2. Job descriptions no longer referenced by any analysis are deleted, with
+   their search index rows and any content blobs nothing else references.
+3. With auto_vacuum=INCREMENTAL, the freed pages are returned to the file
+   system RETENTION_VACUUM_PAGES at a time, up to RETENTION_VACUUM_MAX_PAGES
+   per run (the rest are left for the next run). Databases created before
+   auto_vacuum was enabled need one `flask retention enable-incremental-vacuum`
+   (a full VACUUM that locks the database while it runs).
+
+ANALYSIS_ARCHIVE_DATABASE_URI sends the archive to a separate database;
+the API only reads archived analyses kept in the main database.
+"""
+
+import time
+import click
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import create_engine, text, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import db, Analysis, AnalysisArchive, ContentBlob, JobDescription
+from src.utils.search_index import remove_document
+
+retention_cli = AppGroup('retention', help='Archive old analyses and compact the database.')
+
+class ArchiveConflictError(RuntimeError):
+    """An analysis to archive has the id of a different, already archived analysis"""
+
+def _in_clause(values):
+    return ', '.join(str(int(value)) for value in values)
+
+def archive_payload(row):
+    """Compress the stored JSON of the result fields into one object"""
+    fields = ','.join(f'"{name}":{getattr(row, name) or empty}'
+                      for name, empty in Analysis.DETAIL_FIELDS.items())
+    codec, _, payload = ContentBlob.encode('{' + fields + '}')
+    return codec, payload
+
+def archive_batch(engine, archive_engine, cutoff, batch_size):
+    """Archive and delete up to batch_size analyses older than cutoff; returns how many"""
+    with engine.connect() as connection:
+        rows = connection.execute(
+            db.select(
+                Analysis.id, Analysis.user_id, Analysis.resume_id, Analysis.job_description_id,
+                JobDescription.job_family, Analysis.composite_score, Analysis.similarity_score,
+                Analysis.skill_match_score, Analysis.created_at, Analysis.analysis_version,
+                *(type_coerce(getattr(Analysis, name), db.Text).label(name) for name in Analysis.DETAIL_FIELDS)
+            ).outerjoin(JobDescription, JobDescription.id == Analysis.job_description_id)
+            .where(Analysis.created_at < cutoff)
+            .order_by(Analysis.created_at)
+            .limit(batch_size)
+        ).fetchall()
+    if not rows:
+        return 0
+
+    archived_at = datetime.utcnow()
+    archive_rows = []
+    for row in rows:
+        codec, payload = archive_payload(row)
+        archive_rows.append({
+            'id': row.id, 'user_id': row.user_id, 'resume_id': row.resume_id,
+            'job_description_id': row.job_description_id, 'job_family': row.job_family,
+            'composite_score': row.composite_score, 'similarity_score': row.similarity_score,
+            'skill_match_score': row.skill_match_score, 'created_at': row.created_at,
+            'analysis_version': row.analysis_version, 'archived_at': archived_at,
+            'codec': codec, 'payload': payload
+        })
+    with archive_engine.begin() as connection:
+        # An archived row may only be replaced by the same analysis, copied
+        # again after a run stopped before its delete
+        archived = connection.execute(
+            db.select(AnalysisArchive.id, AnalysisArchive.user_id, AnalysisArchive.created_at)
+            .where(AnalysisArchive.id.in_([row.id for row in rows]))
+        ).fetchall()
+        if archived:
+            live = {row.id: (row.user_id, row.created_at) for row in rows}
+            reused = sorted(row.id for row in archived if live[row.id] != (row.user_id, row.created_at))
+            if reused:
+                raise ArchiveConflictError(
+                    f"analysis ids {', '.join(map(str, reused))} belong to other archived analyses; "
+                    'run the database migrations (analysis ids must be AUTOINCREMENT)'
+                )
+        statement = sqlite_insert(AnalysisArchive.__table__)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=['id'],
+                set_={column.name: statement.excluded[column.name]
+                      for column in AnalysisArchive.__table__.columns if column.name != 'id'}
+            ),
+            archive_rows
+        )
+
+    ids = _in_clause(row.id for row in rows)
+    user_counts, resume_counts = {}, {}
+    for row in rows:
+        user_counts[row.user_id] = user_counts.get(row.user_id, 0) + 1
+        resume_counts[row.resume_id] = resume_counts.get(row.resume_id, 0) + 1
+    with engine.begin() as connection:
+        connection.execute(text(f'DELETE FROM analysis_skill WHERE analysis_id IN ({ids})'))
+        connection.execute(text(f'DELETE FROM analysis WHERE id IN ({ids})'))
+        connection.execute(
+            text('UPDATE user_stats SET analysis_count = analysis_count - :count WHERE user_id = :key'),
+            [{'key': key, 'count': count} for key, count in user_counts.items()]
+        )
+        connection.execute(
+            text('UPDATE resume_stats SET analysis_count = analysis_count - :count WHERE resume_id = :key'),
+            [{'key': key, 'count': count} for key, count in resume_counts.items()]
+        )
+    return len(rows)
+
+def delete_orphan_job_descriptions(engine, batch_size, pause):
+    """Delete job descriptions without analyses, their index rows and unshared blobs"""
+    deleted = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(text('''
+                SELECT j.id, j.content_hash FROM job_description j
+                WHERE j.id > :last_id
+                  AND NOT EXISTS (SELECT 1 FROM analysis a WHERE a.job_description_id = j.id)
+                ORDER BY j.id LIMIT :limit
+            '''), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            connection.execute(text(f'DELETE FROM job_description WHERE id IN ({_in_clause(row.id for row in rows)})'))
+            for row in rows:
+                remove_document(connection, 'job_description', row.id)
+            connection.execute(
+                text('''
+                    DELETE FROM content_blob WHERE hash = :hash
+                      AND NOT EXISTS (SELECT 1 FROM job_description WHERE content_hash = :hash)
+                      AND NOT EXISTS (SELECT 1 FROM resume WHERE content_hash = :hash)
+                '''),
+                [{'hash': content_hash} for content_hash in {row.content_hash for row in rows}]
+            )
+        deleted += len(rows)
+        last_id = rows[-1].id
+        time.sleep(pause)
+    return deleted
+
+def incremental_vacuum(engine, pages, pause, budget=None):
+    """Release free pages in steps, at most budget in all; returns the pages released, or None if auto_vacuum is not incremental"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            return None
+        released = 0
+        remaining = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        while remaining and (budget is None or released < budget):
+            step = min(pages, remaining) if budget is None else min(pages, remaining, budget - released)
+            # Each step is its own short write transaction. The pragma frees
+            # one page per sqlite3 step, so a plain execute() would free just
+            # one: executescript() runs it to completion
+            cursor.executescript(f'BEGIN IMMEDIATE; PRAGMA incremental_vacuum({int(step)}); COMMIT;')
+            freelist = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            released += max(remaining - freelist, 0)
+            if remaining - freelist < step:
+                # Fewer pages freed than asked (or pages freed meanwhile by
+                # other writers): leave the rest to the next run
+                break
+            remaining = freelist
+            time.sleep(pause)
+        return released
+    finally:
+        raw.close()
+
+def run_retention(days, batch_size=500, pause=0.1, vacuum_pages=1000, vacuum_budget=None, archive_uri=None):
+    """Run the retention steps against the app's database; returns a stats dict"""
+    engine = db.engine
+    archive_engine = create_engine(archive_uri) if archive_uri else engine
+    if archive_uri:
+        AnalysisArchive.__table__.create(archive_engine, checkfirst=True)
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    stats = {'cutoff': cutoff.isoformat(), 'archived': 0}
+    try:
+        while True:
+            count = archive_batch(engine, archive_engine, cutoff, batch_size)
+            stats['archived'] += count
+            if count < batch_size:
+                break
+            time.sleep(pause)
+    finally:
+        if archive_engine is not engine:
+            archive_engine.dispose()
+
+    stats['job_descriptions_deleted'] = delete_orphan_job_descriptions(engine, batch_size, pause)
+    stats['pages_vacuumed'] = incremental_vacuum(engine, vacuum_pages, pause, vacuum_budget)
+    return stats
+
+@retention_cli.command('run')
+@click.option('--days', type=int, help='Archive analyses older than this (default RETENTION_ANALYSIS_DAYS).')
+@click.option('--batch-size', type=int, help='Rows per transaction (default RETENTION_BATCH_SIZE).')
+def run_command(days, batch_size):
+    """Archive old analyses, delete orphaned job descriptions and vacuum"""
+    config = current_app.config
+    try:
+        stats = run_retention(
+            days if days is not None else config['RETENTION_ANALYSIS_DAYS'],
+            batch_size=batch_size or config['RETENTION_BATCH_SIZE'],
+            pause=config['RETENTION_BATCH_PAUSE'],
+            vacuum_pages=config['RETENTION_VACUUM_PAGES'],
+            vacuum_budget=config.get('RETENTION_VACUUM_MAX_PAGES'),
+            archive_uri=config.get('ANALYSIS_ARCHIVE_DATABASE_URI')
+        )
+    except ArchiveConflictError as e:
+        raise click.ClickException(str(e))
+    vacuumed = stats['pages_vacuumed']
+    click.echo(f"archived {stats['archived']} analyses older than {stats['cutoff']}, "
+               f"deleted {stats['job_descriptions_deleted']} job descriptions, "
+               + (f'vacuumed {vacuumed} pages' if vacuumed is not None
+                  else 'auto_vacuum is not incremental: freed pages stay in the file for reuse'))
+
+@retention_cli.command('enable-incremental-vacuum')
+def enable_incremental_vacuum_command():
+    """Switch an existing database to auto_vacuum=INCREMENTAL (runs a full VACUUM)"""
+    with db.engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+        connection.exec_driver_sql('VACUUM')
+        mode = connection.execute(text('PRAGMA auto_vacuum')).scalar()
+    click.echo(f'auto_vacuum={mode}')
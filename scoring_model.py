@@ -0,0 +1,242 @@
+"""
+Scoring model: weights, formula coefficients, category mappings and
+recommendation thresholds, loaded from a versioned JSON artifact
+
+The bundled scoring_model.json is the baseline; SCORING_MODEL_PATH points a
+deployment at another file. A file is validated as a whole and compiled
+into a ScoringModel whose category weights are a tuple aligned with the
+skill vocabulary and whose job family relevance is a precomputed bitmask,
+so scoring reads them directly. Job families and titles come from the skill
+taxonomy (see skill_vocab.py); a model may still override them with
+family_categories and title_families. Titles are compiled into a
+TitleMatcher (see job_titles.py) that classifies a job description in one
+pass over its words and remembers the result per job description.
+
+Every worker checks the file's modification time at most every
+SCORING_MODEL_CHECK_SECONDS and swaps in the recompiled model by
+replacing one reference. An analysis takes the current model once and
+uses it throughout, together with the vocabulary the model was compiled
+against (model.vocab), and stores its version as analysis_version. A file
+that fails validation is reported in /api/status and the previous model
+stays in use. Replace the file atomically (write, then rename) and give
+every change a new version, then run `flask scores rescore` to bring
+stored analyses up to date.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from src.utils.job_titles import TitleMatcher
+from src.utils.skill_vocab import skill_vocab
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'scoring_model.json')
+
+RECOMMENDATION_LIMITS = ('priority_skills_shown', 'other_skills_shown', 'min_missing_keywords',
+                         'missing_keywords_shown', 'max_recommendations')
+
+
+class ScoringModelError(ValueError):
+    """The scoring model artifact is malformed"""
+
+
+def _number(value, name, minimum=0.0, maximum=None):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ScoringModelError(f'{name} must be a number')
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ScoringModelError(f'{name} must be between {minimum} and {maximum}' if maximum is not None
+                                else f'{name} must be at least {minimum}')
+    return float(value)
+
+
+def _categories(values, name, vocab):
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ScoringModelError(f'{name} must be a list of category names')
+    unknown = [value for value in values if value not in vocab.category_ranges]
+    if unknown:
+        raise ScoringModelError(f"{name} has unknown categories: {', '.join(unknown)}")
+    return tuple(values)
+
+
+class ScoringModel:
+    """A validated scoring model, compiled against a skill vocabulary (the current one by default)"""
+
+    def __init__(self, spec, vocab=None):
+        self.vocab = vocab = vocab or skill_vocab.current()
+        if not isinstance(spec, dict):
+            raise ScoringModelError('the model must be a JSON object')
+        version = spec.get('version')
+        if not isinstance(version, str) or not 0 < len(version) <= 10:
+            raise ScoringModelError('version must be a string of 1-10 characters')
+        self.version = version
+        self.description = spec.get('description', '')
+
+        weights = spec.get('category_weights', {})
+        if not isinstance(weights, dict):
+            raise ScoringModelError('category_weights must be an object')
+        _categories(list(weights), 'category_weights', vocab)
+        self.default_category_weight = _number(spec.get('default_category_weight', 1.0),
+                                               'default_category_weight', minimum=0.01)
+        # Aligned with vocab.categories
+        self.category_weights = tuple(
+            _number(weights[category], f'category_weights.{category}', minimum=0.01)
+            if category in weights else self.default_category_weight
+            for category in vocab.categories
+        )
+        self._weights_by_category = dict(zip(vocab.categories, self.category_weights))
+
+        composite = spec.get('composite')
+        if not isinstance(composite, dict) or set(composite) != {'similarity', 'skill_match'}:
+            raise ScoringModelError('composite must have exactly similarity and skill_match coefficients')
+        self.similarity_coefficient = _number(composite['similarity'], 'composite.similarity', maximum=1.0)
+        self.skill_match_coefficient = _number(composite['skill_match'], 'composite.skill_match', maximum=1.0)
+        if abs(self.similarity_coefficient + self.skill_match_coefficient - 1.0) > 1e-9:
+            raise ScoringModelError('composite coefficients must add up to 1')
+
+        # Families and titles come from the skill taxonomy unless the model overrides them
+        families = spec.get('family_categories', vocab.families)
+        if not isinstance(families, dict) or not families:
+            raise ScoringModelError('family_categories must be a non-empty object')
+        self.family_masks = {family: vocab.mask_for(_categories(categories, f'family_categories.{family}', vocab))
+                             for family, categories in families.items()}
+        self.family_categories = {family: list(categories) for family, categories in families.items()}
+
+        titles = spec.get('title_families', vocab.titles)
+        if not isinstance(titles, dict):
+            raise ScoringModelError('title_families must be an object')
+        for title, family in titles.items():
+            if family not in families:
+                raise ScoringModelError(f'title_families.{title} names an unknown family: {family}')
+        try:
+            self.title_matcher = TitleMatcher(titles)
+        except ValueError as e:
+            raise ScoringModelError(f'title_families: {e}')
+
+        recommendations = spec.get('recommendations')
+        if not isinstance(recommendations, dict):
+            raise ScoringModelError('recommendations must be an object')
+        thresholds = recommendations.get('composite_thresholds')
+        if (not isinstance(thresholds, list) or len(thresholds) != 3
+                or [_number(value, 'composite_thresholds', maximum=100) for value in thresholds] != sorted(thresholds)):
+            raise ScoringModelError('composite_thresholds must be 3 ascending scores')
+        self.composite_thresholds = tuple(float(value) for value in thresholds)
+        self.skill_match_low = _number(recommendations.get('skill_match_low'), 'skill_match_low', maximum=100)
+        self.skill_match_high = _number(recommendations.get('skill_match_high'), 'skill_match_high', maximum=100)
+        if self.skill_match_low > self.skill_match_high:
+            raise ScoringModelError('skill_match_low must not exceed skill_match_high')
+        self.priority_categories = _categories(recommendations.get('priority_categories'), 'priority_categories', vocab)
+        for name in RECOMMENDATION_LIMITS:
+            value = recommendations.get(name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ScoringModelError(f'{name} must be a non-negative integer')
+            setattr(self, name, value)
+
+    @classmethod
+    def load(cls, path, vocab=None):
+        return cls(cls.read_spec(path), vocab)
+
+    @staticmethod
+    def read_spec(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except ValueError as e:
+            raise ScoringModelError(f'not valid JSON: {e}')
+
+    def category_weight(self, category):
+        """Weight of a category, including categories no longer in the vocabulary"""
+        return self._weights_by_category.get(category, self.default_category_weight)
+
+    def job_family(self, job_description):
+        """Family of the first known job title in the JD, or 'general'"""
+        families = self.title_matcher.families(job_description)
+        return families[0] if families else 'general'
+
+    def relevant_mask(self, job_description):
+        """Vocabulary bits of the categories relevant to a JD: those of every family whose title it mentions, else all"""
+        mask = 0
+        for family in self.title_matcher.families(job_description):
+            mask |= self.family_masks[family]
+        return mask or self.vocab.all_mask
+
+    def composite_score(self, similarity, skill_match):
+        """Composite of a similarity and a skill match score, both 0-100"""
+        return similarity * self.similarity_coefficient + skill_match * self.skill_match_coefficient
+
+
+class ScoringModelLoader:
+    """The current ScoringModel of this process, recompiled when its file or the skill vocabulary changes
+
+    A model that does not compile against a new vocabulary (a category it
+    weights was removed, say) keeps the previous model and vocabulary pair
+    in use until the model file is fixed.
+    """
+
+    def __init__(self, path=DEFAULT_MODEL_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._model = None
+        self._spec = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loaded_at = None
+        self.last_error = None
+
+    def configure(self, app):
+        self.path = app.config.get('SCORING_MODEL_PATH') or DEFAULT_MODEL_PATH
+        self.check_interval = app.config.get('SCORING_MODEL_CHECK_SECONDS', self.check_interval)
+        with self._lock:
+            self._model = None
+            self._mtime = None
+        # A broken model at startup is an error; later ones keep the last good model
+        self.reload(raise_errors=True)
+
+    def current(self):
+        """The model to score with; reloaded first if the file changed"""
+        model = self._model
+        if model is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload(raise_errors=model is None)
+            model = self._model
+        return model
+
+    def reload(self, raise_errors=False):
+        """Recompile the model if the file changed since it was loaded; returns whether it was swapped"""
+        # One thread checks; the others keep scoring with the current model
+        if not self._lock.acquire(blocking=self._model is None):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                vocab = skill_vocab.current()
+                if mtime == self._mtime and self._model is not None and self._model.vocab is vocab:
+                    return False
+                spec = self._spec if mtime == self._mtime else ScoringModel.read_spec(self.path)
+                model = ScoringModel(spec, vocab)
+            except (OSError, ValueError) as e:
+                self.last_error = f'{self.path}: {e}'
+                print(f"Scoring model not reloaded: {self.last_error}")
+                if raise_errors:
+                    raise
+                return False
+            self._model, self._spec, self._mtime = model, spec, mtime
+            self.loaded_at = datetime.utcnow()
+            self.last_error = None
+            return True
+        finally:
+            self._lock.release()
+
+    def status(self):
+        model = self._model
+        return {
+            'version': model.version if model else None,
+            'vocabulary_version': model.vocab.version if model else None,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            # Public: whether the last reload failed, not where or why (that is printed to the log)
+            'reload_failed': self.last_error is not None
+        }
+
+
+scoring_model = ScoringModelLoader()
@@ -0,0 +1,63 @@
+import click
+from flask import Blueprint, request, jsonify
+from flask_cors import cross_origin
+from flask_login import current_user, login_required
+from sqlalchemy import text
+from src.models import db
+from src.utils.search_index import KINDS, SEARCH_SQL, fts_query, highlight_snippet, rebuild_search_index
+from src.utils.rate_limit import rate_limited
+from src.utils.api_tokens import scope_required
+
+search_bp = Blueprint('search', __name__)
+
+MAX_PER_PAGE = 50
+
+@search_bp.route('/search', methods=['GET'])
+@login_required
+@cross_origin()
+@scope_required('search')
+@rate_limited('search')
+def search_documents():
+    """Ranked full-text search over the user's resumes and analyzed job descriptions"""
+    try:
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 10, type=int), MAX_PER_PAGE))
+        kind = request.args.get('type')
+        if kind is not None and kind not in KINDS:
+            return jsonify({'error': f"type must be one of: {', '.join(KINDS)}"}), 400
+
+        query = fts_query(request.args.get('q', ''), user_id=current_user.id)
+        if query is None:
+            return jsonify({'error': 'Search query is required'}), 400
+
+        rows = db.session.execute(text(SEARCH_SQL), {
+            'query': query,
+            'kind': kind,
+            'limit': per_page,
+            'offset': (page - 1) * per_page
+        }).fetchall()
+
+        return jsonify({
+            'success': True,
+            'results': [{
+                'type': row.kind,
+                'id': row.doc_id,
+                'title': row.title,
+                'snippet': highlight_snippet(row.snippet),
+                'score': round(-row.rank, 4)  # bm25() is lower-is-better
+            } for row in rows],
+            'page': page,
+            'per_page': per_page,
+            'has_next': len(rows) == per_page
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
+
+@search_bp.cli.command('rebuild-index')
+@click.option('--full', is_flag=True, help='Empty the index and reindex every document.')
+@click.option('--batch-size', default=500, show_default=True, help='Documents per transaction.')
+def rebuild_index_command(full, batch_size):
+    """Reindex resumes and job descriptions whose index rows are missing or stale"""
+    stats = rebuild_search_index(db.engine, batch_size=batch_size, full=full)
+    click.echo(f"indexed {stats['indexed']}, removed {stats['removed']}, unchanged {stats['unchanged']}")
@@ -0,0 +1,233 @@
+"""
+SQLite FTS5 index over resume and job description text
+
+One index row per resume and per job description. The rowid is derived
+from the document id, so a document can be replaced or removed with a
+rowid lookup. The owners column holds one 'u<user_id>' token per user who
+may see the document: a user filter is then part of the MATCH expression
+and intersected inside FTS5 rather than applied row by row afterwards.
+"""
+
+import html
+import re
+import zlib
+from contextlib import nullcontext
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+SEARCH_INDEX_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    kind UNINDEXED,
+    doc_id UNINDEXED,
+    content_hash UNINDEXED,
+    owners,
+    title,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+KINDS = ('resume', 'job_description')
+
+# bm25() weights, one per column in DDL order: title matches count double,
+# the filter-only columns not at all
+BM25_WEIGHTS = '0.0, 0.0, 0.0, 0.0, 2.0, 1.0'
+
+INDEX_SQL = """
+INSERT OR REPLACE INTO search_index (rowid, kind, doc_id, content_hash, owners, title, body)
+VALUES (:rowid, :kind, :doc_id, :content_hash, :owners, :title, :body)
+"""
+
+# snippet() marks matches with control characters; highlight_snippet()
+# escapes the stored text and only then turns them into <mark> tags
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+SEARCH_SQL = f"""
+SELECT kind, doc_id, title,
+       snippet(search_index, 5, char(2), char(3), '...', 16) AS snippet,
+       bm25(search_index, {BM25_WEIGHTS}) AS rank
+FROM search_index
+WHERE search_index MATCH :query AND (:kind IS NULL OR kind = :kind)
+ORDER BY rank
+LIMIT :limit OFFSET :offset
+"""
+
+
+def search_rowid(kind, doc_id):
+    """Index rowid of a document"""
+    return doc_id * len(KINDS) + KINDS.index(kind)
+
+
+def highlight_snippet(snippet):
+    """HTML of a snippet() result: the document text escaped, its matches in <mark> tags"""
+    return html.escape(snippet or '').replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def owner_token(user_id):
+    return f'u{user_id}'
+
+
+def fts_query(query, user_id=None):
+    """Build an FTS5 MATCH expression from free text, or None if it has no terms
+
+    Every word is quoted, so user input cannot inject FTS5 syntax; a
+    trailing * keeps prefix matching. All words must match.
+    """
+    terms = [f'"{word}"*' if star else f'"{word}"'
+             for word, star in re.findall(r'(\w+)(\*?)', query or '')]
+    if not terms:
+        return None
+    expression = f"({' '.join(terms)})"
+    if user_id is not None:
+        expression = f'owners : "{owner_token(user_id)}" AND {expression}'
+    return expression
+
+
+def load_text(connection, content_hash):
+    """Text of a content_blob row, read on the given connection"""
+    row = connection.execute(
+        text('SELECT codec, data FROM content_blob WHERE hash = :hash'),
+        {'hash': content_hash}
+    ).first()
+    if row is None:
+        return ''
+    data = zlib.decompress(row.data) if row.codec == 'zlib' else row.data
+    return data.decode('utf-8')
+
+
+def index_document(connection, kind, doc_id, content_hash, owners, title, body=None):
+    """Add or replace a document; body is loaded from content_blob when not given"""
+    if body is None:
+        body = load_text(connection, content_hash)
+    connection.execute(text(INDEX_SQL), {
+        'rowid': search_rowid(kind, doc_id),
+        'kind': kind,
+        'doc_id': doc_id,
+        'content_hash': content_hash,
+        'owners': ' '.join(owner_token(user_id) for user_id in sorted(set(owners))),
+        'title': title or '',
+        'body': body
+    })
+
+
+def remove_document(connection, kind, doc_id):
+    connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'),
+                       {'rowid': search_rowid(kind, doc_id)})
+
+
+def add_owner(connection, kind, doc_id, user_id):
+    """Let another user see an indexed document (a job description they analyzed)"""
+    token = owner_token(user_id)
+    row = connection.execute(text('SELECT owners FROM search_index WHERE rowid = :rowid'),
+                             {'rowid': search_rowid(kind, doc_id)}).first()
+    if row is not None and token not in row.owners.split():
+        connection.execute(text('UPDATE search_index SET owners = :owners WHERE rowid = :rowid'),
+                           {'owners': f'{row.owners} {token}'.strip(),
+                            'rowid': search_rowid(kind, doc_id)})
+
+
+def _sync_batch(connection, kind, documents, stats):
+    """Reindex the documents of one batch whose text or owners changed
+
+    documents maps doc_id to (content_hash, owners, title), or to None for
+    a document that should not be indexed.
+    """
+    rowids = [search_rowid(kind, doc_id) for doc_id in documents]
+    indexed = {
+        row.rowid: (row.content_hash, row.owners)
+        for row in connection.execute(
+            text(f"SELECT rowid, content_hash, owners FROM search_index "
+                 f"WHERE rowid IN ({', '.join(str(rowid) for rowid in rowids)})")
+        )
+    }
+    for doc_id, document in documents.items():
+        current = indexed.get(search_rowid(kind, doc_id))
+        if document is None:
+            if current is not None:
+                remove_document(connection, kind, doc_id)
+                stats['removed'] += 1
+            continue
+        content_hash, owners, title = document
+        owners_text = ' '.join(owner_token(user_id) for user_id in sorted(set(owners)))
+        if current != (content_hash, owners_text):
+            index_document(connection, kind, doc_id, content_hash, owners, title)
+            stats['indexed'] += 1
+        else:
+            stats['unchanged'] += 1
+
+
+def _transaction(bind):
+    """A transaction per batch on an engine; the caller's transaction on a connection"""
+    return bind.begin() if isinstance(bind, Engine) else nullcontext(bind)
+
+
+def rebuild_search_index(bind, batch_size=500, full=False):
+    """Bring the index in line with the resume and job_description tables
+
+    Incremental by default: only documents that are missing, changed or
+    gone are written. Given an engine, each batch is its own transaction,
+    so an interrupted rebuild keeps its progress and a rerun on an
+    up-to-date index only reads. full=True empties the index first.
+    """
+    stats = {'indexed': 0, 'removed': 0, 'unchanged': 0}
+    with _transaction(bind) as connection:
+        connection.execute(text(SEARCH_INDEX_DDL))
+        if full:
+            connection.execute(text('DELETE FROM search_index'))
+
+    batch_queries = {
+        'resume': """
+            SELECT id, content_hash, filename AS title, is_active, user_id AS owners
+            FROM resume WHERE id > :last_id ORDER BY id LIMIT :limit
+        """,
+        'job_description': """
+            SELECT j.id, j.content_hash, j.title, 1 AS is_active,
+                   (SELECT group_concat(DISTINCT a.user_id) FROM analysis a
+                    WHERE a.job_description_id = j.id) AS owners
+            FROM job_description j WHERE j.id > :last_id ORDER BY j.id LIMIT :limit
+        """
+    }
+    for kind, query in batch_queries.items():
+        last_id = 0
+        while True:
+            with _transaction(bind) as connection:
+                rows = connection.execute(text(query), {'last_id': last_id, 'limit': batch_size}).fetchall()
+                if not rows:
+                    break
+                documents = {}
+                for row in rows:
+                    owners = [int(user_id) for user_id in str(row.owners).split(',')] if row.owners else []
+                    # Deactivated resumes are left out of search
+                    documents[row.id] = (row.content_hash, owners, row.title) if row.is_active != 0 else None
+                _sync_batch(connection, kind, documents, stats)
+                last_id = rows[-1].id
+
+    # Drop index rows of deleted documents
+    last_rowid = -1
+    while True:
+        with _transaction(bind) as connection:
+            rows = connection.execute(
+                text('SELECT rowid, kind, doc_id FROM search_index '
+                     'WHERE rowid > :last_rowid ORDER BY rowid LIMIT :limit'),
+                {'last_rowid': last_rowid, 'limit': batch_size}
+            ).fetchall()
+            if not rows:
+                break
+            for kind in KINDS:
+                doc_ids = [row.doc_id for row in rows if row.kind == kind]
+                if not doc_ids:
+                    continue
+                existing = {
+                    row.id for row in connection.execute(
+                        text(f"SELECT id FROM {kind} WHERE id IN ({', '.join(str(int(i)) for i in doc_ids)})")
+                    )
+                }
+                for doc_id in set(doc_ids) - existing:
+                    remove_document(connection, kind, doc_id)
+                    stats['removed'] += 1
+            last_rowid = rows[-1].rowid
+
+    with _transaction(bind) as connection:
+        # Merge the index b-trees written by many small transactions
+        connection.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+    return stats
@@ -0,0 +1,741 @@
+"""
+Compiled skill vocabulary: the skill taxonomy as integer ids and bitsets
+
+Every (category, skill) pair gets its own id, so a skill listed under two
+categories ('swift', 'agile', ...) has one bit in each; the ids of a
+category are contiguous. A skill set is a Python int with those bits set.
+Matches, misses and the weighted skill score then come from &, & ~ and
+popcounts instead of per-category set and list building:
+
+    vocab = skill_vocab.current()
+    job = vocab.encode(preprocess_text(job_description))
+    profile = vocab.job_profile(job, scoring_model.current().category_weights)
+    for resume in resumes:        # one JD against many resumes
+        score = vocab.match_score(vocab.encode(resume), profile)
+
+The taxonomy (skill_taxonomy.json, or SKILL_TAXONOMY_PATH) is compiled
+offline with `flask skills compile` into a binary file (SKILL_VOCAB_PATH,
+instance/skill_vocab.bin by default) that every worker memory-maps, so its
+pages are shared by all processes on the host and the per-worker cost does
+not grow with the taxonomy. The file holds:
+
+    header      magic, counts and section offsets
+    slots       open-addressing hash table: hash of a keyword's words ->
+                the run of keywords with those words, whether longer
+                keywords start with them, and whether it is a known word
+    keywords    keyword (skill name or alias) text, postings start and count
+    postings    skill ids each keyword sets
+    skills      skill id -> text as listed in the taxonomy
+    strings     UTF-8 text of keywords and skills
+    fuzzy slots deletion index: hash of a one-word skill name with
+                characters deleted -> the run of those keywords
+    fuzzy postings  keyword ids of the deletion index
+    fuzzy bitmap    one bit per deletion index hash, checked before probing
+    meta        JSON: version, categories with id ranges and weights,
+                families, titles and counts
+
+encode() takes preprocessed text (see preprocess_text in the analyzer). It
+looks up each distinct word of the text and, where longer keywords start
+with a word, the following words one at a time for as long as keywords
+start with them. A keyword whose words were found matches where it occurs
+with a word boundary at both ends, exactly as an r'\\b<keyword>\\b' search
+would. Keys only select candidates, so keys whose hashes collide simply
+share a run.
+
+The taxonomy's aliases ('k8s', 'postgres', 'sklearn', ...) are compiled as
+more keywords whose postings are their canonical skill's ids, so a match
+on an alias sets the canonical skill's bits and costs the same lookup as
+any other word: the cost per document depends on its distinct words, not
+on how many aliases there are. encode_forms() also reports which aliases
+were found. Compiling rejects aliases that are common English words
+(common_words.txt: 'torch', 'backbone') or a word of another skill's name
+('js' in 'node.js'), which would credit skills the text does not mention.
+
+Words the vocabulary does not know at all ('kubernates', 'tensorflw') are
+checked for typos of one-word skill names, SymSpell style: the word's
+deletions up to the allowed edits are looked up in the deletion index and
+the keywords found are verified with the actual edit distance. Words of
+FUZZY_MIN_LENGTHS characters or more may be one and two edits off, up to
+SKILL_FUZZY_DISTANCE (0, the default, turns typo matching off). A word
+equally close to two skills is left alone, and so are inflections of known
+words ('reacts', 'sparky', 'jenkin'); the taxonomy's fuzzy_exclude lists
+other real words that are a letter away from a skill ('string',
+'closure'). Typos found are reported by encode_forms() like aliases.
+
+Workers check the file's modification time at most every
+SKILL_VOCAB_CHECK_SECONDS and swap in a recompiled file by replacing one
+reference. Compiling always writes a new file and renames it into place,
+so a mapped file never changes under a reader.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+import click
+from datetime import datetime
+from flask import current_app
+from flask.cli import AppGroup
+from src.utils.job_titles import TitleMatcher
+from src.utils.skill_database import TAXONOMY_PATH, load_taxonomy
+
+# Words that may not be aliases, one per line
+COMMON_WORDS_PATH = os.path.join(os.path.dirname(__file__), 'common_words.txt')
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+# What preprocess_text leaves of a phrase: lowercase words of [a-z0-9.+#], single spaces
+ALIAS_PATTERN = re.compile(r'[a-z0-9.+#]+(?: [a-z0-9.+#]+)*')
+
+MAGIC = b'SKVOCAB3'
+HEADER = struct.Struct('<8s15I')   # magic, slot/keyword/skill/fuzzy slot counts, fuzzy bitmap bytes,
+                                   # 9 section offsets, meta length
+SLOT = struct.Struct('<IIII')      # key hash, first entry, entry count, flags
+SLOT_USED = 1
+SLOT_PREFIX = 2                    # longer keywords start with these words
+SLOT_WORD = 4                      # a word of some keyword, or excluded from fuzzy matching
+KEYWORD = struct.Struct('<IIII')   # text offset, text length, postings start, postings count
+SKILL = struct.Struct('<II')       # text offset, text length
+
+# A word of at least FUZZY_MIN_LENGTHS[n - 1] characters may be n edits from a keyword
+FUZZY_MIN_LENGTHS = (6, 10)
+FUZZY_MAX_DISTANCE = len(FUZZY_MIN_LENGTHS)
+FUZZY_BITMAP_BITS = 32             # per deletion index entry
+FUZZY_CACHE_SIZE = 100000
+# A word that is a known word with one of these endings added or with a
+# final 's' dropped ('reacts', 'sparky', 'jenkin') is never taken for a typo
+INFLECTIONS = ('s', 'es', 'y', 'ly', 'ed', 'd', 'ing', 'er', 'ers')
+
+skills_cli = AppGroup('skills', help='Compile the skill taxonomy.')
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+class TaxonomyError(ValueError):
+    """The skill taxonomy is malformed"""
+
+
+def word_hash(word):
+    return zlib.crc32(word.encode())
+
+
+def fuzzy_limit(length, distance):
+    """Edits allowed between a word of length characters and a keyword, at most distance"""
+    return min(distance, sum(1 for minimum in FUZZY_MIN_LENGTHS if length >= minimum))
+
+
+def keyword_fuzzy_depth(length):
+    """Most edits between a keyword of length characters and any word allowed to be a typo of it"""
+    return max((fuzzy_limit(word_length, FUZZY_MAX_DISTANCE)
+                for word_length in range(length - FUZZY_MAX_DISTANCE, length + FUZZY_MAX_DISTANCE + 1)
+                if abs(word_length - length) <= fuzzy_limit(word_length, FUZZY_MAX_DISTANCE)), default=0)
+
+
+def deletes(word, distance):
+    """word and every string (or bytes) made by deleting up to distance of its characters"""
+    variants, edge = {word}, {word}
+    for _ in range(distance):
+        edge = {variant[:i] + variant[i + 1:] for variant in edge for i in range(len(variant))}
+        variants |= edge
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions), or limit + 1 if above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return min(current[-1], limit + 1)
+
+
+def _hash_table(groups, flags):
+    """Open-addressing table of at least twice as many slots for {hash: [entries]}; returns (slots, entries)"""
+    slot_count = 1
+    while slot_count < 2 * len(groups):
+        slot_count *= 2
+    slots = [(0, 0, 0, 0)] * slot_count
+    entries = []
+    for hashed, group in groups.items():
+        slot = hashed & (slot_count - 1)
+        while slots[slot][3]:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = (hashed, len(entries), len(group), flags.get(hashed, 0) | SLOT_USED)
+        entries.extend(group)
+    return slots, entries
+
+
+def keyword_keys(keyword):
+    """Table key of a keyword (its words) and the keys of its shorter prefixes"""
+    words = TOKEN_PATTERN.findall(keyword)
+    return ' '.join(words), [' '.join(words[:length]) for length in range(1, len(words))]
+
+
+def _is_word(char):
+    return char.isalnum() or char == '_'
+
+
+def occurs(text, keyword):
+    """Whether keyword occurs in text with a word boundary (regex \\b) at both ends"""
+    starts_word, ends_word = _is_word(keyword[0]), _is_word(keyword[-1])
+    start = text.find(keyword)
+    while start != -1:
+        end = start + len(keyword)
+        before = text[start - 1] if start else ''
+        after = text[end] if end < len(text) else ''
+        if _is_word(before) != starts_word and _is_word(after) != ends_word:
+            return True
+        start = text.find(keyword, start + 1)
+    return False
+
+
+def load_common_words(path=COMMON_WORDS_PATH):
+    """The words of a word list file, skipping blank lines and '#' comments"""
+    with open(path) as f:
+        return frozenset(word for word in (line.strip().lower() for line in f) if word and not word.startswith('#'))
+
+
+def compile_vocabulary(taxonomy, common_words=None):
+    """Binary vocabulary for a taxonomy dict (see load_taxonomy)
+
+    Aliases in common_words (load_common_words() by default) are rejected.
+    """
+    if common_words is None:
+        common_words = load_common_words()
+    version = taxonomy.get('version')
+    if not isinstance(version, str) or not version:
+        raise TaxonomyError('version must be a non-empty string')
+    categories = taxonomy.get('categories')
+    if not isinstance(categories, dict) or not categories:
+        raise TaxonomyError('categories must be a non-empty object')
+    families = taxonomy.get('families', {})
+    titles = taxonomy.get('titles', {})
+    for family, family_categories in families.items():
+        unknown = [category for category in family_categories if category not in categories]
+        if unknown:
+            raise TaxonomyError(f"families.{family} has unknown categories: {', '.join(unknown)}")
+    for title, family in titles.items():
+        if family not in families:
+            raise TaxonomyError(f'titles.{title} names an unknown family: {family}')
+    try:
+        TitleMatcher(titles)
+    except ValueError as e:
+        raise TaxonomyError(f'titles: {e}')
+
+    strings = bytearray()
+    string_offsets = {}
+
+    def add_string(text):
+        if text not in string_offsets:
+            data = text.encode()
+            string_offsets[text] = (len(strings), len(data))
+            strings.extend(data)
+        return string_offsets[text]
+
+    # Skill ids, contiguous per category
+    skills, keyword_skills, category_meta = [], {}, []
+    for category, data in categories.items():
+        start = len(skills)
+        for skill in data.get('skills', []):
+            if not isinstance(skill, str) or not TOKEN_PATTERN.search(skill.lower()):
+                raise TaxonomyError(f'{category} has a skill without letters or digits: {skill!r}')
+            keyword_skills.setdefault(skill.lower(), []).append(len(skills))
+            skills.append(add_string(skill))
+        category_meta.append([category, start, len(skills), float(data.get('weight', 1.0))])
+
+    # Aliases set the bits of their canonical skill in every category it is in
+    aliases = taxonomy.get('aliases', {})
+    if not isinstance(aliases, dict):
+        raise TaxonomyError('aliases must be an object')
+    alias_of = {}
+    for skill, skill_aliases in aliases.items():
+        canonical = skill.lower()
+        if canonical not in keyword_skills:
+            raise TaxonomyError(f'aliases.{skill} is not a skill in any category')
+        if not isinstance(skill_aliases, list):
+            raise TaxonomyError(f'aliases.{skill} must be a list')
+        for alias in skill_aliases:
+            keyword = alias.lower() if isinstance(alias, str) else None
+            # Aliases match preprocessed text, so only its characters can ever match
+            if keyword is None or not ALIAS_PATTERN.fullmatch(keyword):
+                raise TaxonomyError(f'aliases.{skill} has an alias that preprocessed text cannot contain: {alias!r}')
+            if keyword == canonical:
+                continue
+            # An alias matches wherever it occurs, so an ordinary word would credit skills the text lacks
+            if keyword in common_words:
+                raise TaxonomyError(f'aliases.{skill}: {alias!r} is a common word')
+            if keyword in keyword_skills and alias_of.get(keyword) is None:
+                raise TaxonomyError(f'aliases.{skill}: {alias!r} is itself a skill')
+            if alias_of.setdefault(keyword, canonical) != canonical:
+                raise TaxonomyError(f'aliases.{skill}: {alias!r} is also an alias of {alias_of[keyword]}')
+            keyword_skills[keyword] = keyword_skills[canonical]
+    # '.' and '-' end words, so an alias that is a word of another skill's
+    # keyword ('js' in 'node.js') would match inside every mention of it
+    keyword_words = {}
+    for keyword in keyword_skills:
+        for word in set(TOKEN_PATTERN.findall(keyword)):
+            keyword_words.setdefault(word, []).append(keyword)
+    for alias, canonical in alias_of.items():
+        for keyword in keyword_words.get(alias, ()):
+            if keyword != alias and alias_of.get(keyword, keyword) != canonical:
+                raise TaxonomyError(f'aliases.{canonical}: {alias!r} would also match inside {keyword!r}')
+
+    # Words that are never taken for typos of a keyword: its own words and the exclusions
+    fuzzy_exclude = taxonomy.get('fuzzy_exclude', [])
+    if not isinstance(fuzzy_exclude, list) or not all(isinstance(word, str) for word in fuzzy_exclude):
+        raise TaxonomyError('fuzzy_exclude must be a list of words')
+    known_words = {word for keyword in keyword_skills for word in TOKEN_PATTERN.findall(keyword)}
+    known_words.update(word.lower() for word in fuzzy_exclude)
+
+    # Keywords grouped by key hash
+    by_hash, flags = {}, {}
+    for keyword in keyword_skills:
+        key, key_prefixes = keyword_keys(keyword)
+        by_hash.setdefault(word_hash(key), []).append(keyword)
+        for prefix in key_prefixes:
+            flags[word_hash(prefix)] = flags.get(word_hash(prefix), 0) | SLOT_PREFIX
+    for word in known_words:
+        flags[word_hash(word)] = flags.get(word_hash(word), 0) | SLOT_WORD
+    for hashed in flags:
+        by_hash.setdefault(hashed, [])
+    slots, slot_keywords = _hash_table(by_hash, flags)
+    keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(slot_keywords)}
+    keywords, postings = [], []
+    for keyword in slot_keywords:
+        keywords.append((*add_string(keyword), len(postings), len(keyword_skills[keyword])))
+        postings.extend(keyword_skills[keyword])
+
+    # Deletion index of one-word skill names: every string made by deleting
+    # up to as many characters as a word that could be a typo of the skill
+    # may differ by -> keyword ids, and a bitmap of those hashes that rules
+    # out most words without probing the table
+    by_delete = {}
+    for keyword, keyword_id in keyword_ids.items():
+        if keyword not in alias_of and TOKEN_PATTERN.fullmatch(keyword):
+            for variant in deletes(keyword, keyword_fuzzy_depth(len(keyword))):
+                by_delete.setdefault(word_hash(variant), []).append(keyword_id)
+    fuzzy_slots, fuzzy_postings = _hash_table(by_delete, {})
+    bitmap_bits = 8
+    while bitmap_bits < FUZZY_BITMAP_BITS * len(by_delete):
+        bitmap_bits *= 2
+    fuzzy_bitmap = bytearray(bitmap_bits // 8)
+    for hashed in by_delete:
+        bit = hashed & (bitmap_bits - 1)
+        fuzzy_bitmap[bit >> 3] |= 1 << (bit & 7)
+
+    meta = json.dumps({
+        'version': version,
+        'categories': category_meta,
+        'families': families,
+        'titles': titles,
+        'aliases': len(alias_of),
+        'fuzzy_distance': FUZZY_MAX_DISTANCE
+    }).encode()
+
+    sections = [b''.join(SLOT.pack(*slot) for slot in slots),
+                b''.join(KEYWORD.pack(*keyword) for keyword in keywords),
+                struct.pack(f'<{len(postings)}I', *postings),
+                b''.join(SKILL.pack(*skill) for skill in skills),
+                bytes(strings),
+                b''.join(SLOT.pack(*slot) for slot in fuzzy_slots),
+                struct.pack(f'<{len(fuzzy_postings)}I', *fuzzy_postings),
+                bytes(fuzzy_bitmap),
+                meta]
+    offsets, position = [], HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = HEADER.pack(MAGIC, len(slots), len(keywords), len(skills), len(fuzzy_slots), len(fuzzy_bitmap),
+                         *offsets, len(meta))
+    return header + b''.join(sections)
+
+
+def write_vocabulary(taxonomy_path, output_path):
+    """Compile a taxonomy file and atomically replace output_path; returns the new SkillVocabulary"""
+    data = compile_vocabulary(load_taxonomy(taxonomy_path))
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    temporary = f'{output_path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, output_path)
+    return SkillVocabulary(data)
+
+
+def is_vocabulary(path):
+    """Whether path is a vocabulary file in the current format"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class SkillVocabulary:
+    """Read-only view of a compiled vocabulary in a buffer (a memory-mapped file or bytes)"""
+
+    def __init__(self, buffer, path=None, fuzzy_distance=0):
+        self._buffer = buffer
+        self.path = path
+        magic, self.slot_count, self.keyword_count, self.skill_count, self.fuzzy_slot_count, bitmap_bytes, \
+            self._slots, self._keywords, self._postings, self._skills, self._strings, self._fuzzy_slots, \
+            self._fuzzy_postings, self._fuzzy_bitmap, meta_offset, meta_length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise TaxonomyError('not a compiled skill vocabulary')
+        meta = json.loads(bytes(buffer[meta_offset:meta_offset + meta_length]))
+        self.version = meta['version']
+        self.families = meta['families']
+        self.titles = meta['titles']
+        self.alias_count = meta['aliases']
+        # Edits allowed for a typo (0: exact matching only), at most what the file was compiled for
+        self.fuzzy_distance = min(fuzzy_distance, meta['fuzzy_distance'])
+        self._fuzzy_bitmap_mask = bitmap_bytes * 8 - 1
+        self._fuzzy_cache = {}
+        self.categories = [name for name, _, _, _ in meta['categories']]
+        self.category_ranges = {name: (start, end) for name, start, end, _ in meta['categories']}
+        self._category_starts = [start for _, start, _, _ in meta['categories']]
+        # Baseline weights, aligned with categories; scoring passes the scoring model's
+        self.weights = tuple(weight for _, _, _, weight in meta['categories'])
+        self.all_mask = (1 << self.skill_count) - 1
+
+    @classmethod
+    def open(cls, path, fuzzy_distance=0):
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path, fuzzy_distance)
+
+    @property
+    def size(self):
+        return len(self._buffer)
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._buffer[start:start + length].decode()
+
+    def skill(self, skill_id):
+        """Text of a skill id as listed in the taxonomy"""
+        return self._string(*SKILL.unpack_from(self._buffer, self._skills + skill_id * SKILL.size))
+
+    def category_of(self, skill_id):
+        return self.categories[bisect.bisect_right(self._category_starts, skill_id) - 1]
+
+    def category_mask(self, category):
+        start, end = self.category_ranges[category]
+        return ((1 << (end - start)) - 1) << start
+
+    def mask_for(self, categories):
+        """Bits of the given categories (all categories when None)"""
+        if categories is None:
+            return self.all_mask
+        mask = 0
+        for category in categories:
+            if category in self.category_ranges:
+                mask |= self.category_mask(category)
+        return mask
+
+    def categories_of(self, mask):
+        """Categories with bits in mask, in taxonomy order"""
+        return [category for category in self.categories if mask & self.category_mask(category)]
+
+    def _probe(self, table, slot_count, hashed):
+        """(first entry, entry count, flags) of the slot of a key hash in a hash table; flags is 0 when there is none"""
+        slot = hashed & (slot_count - 1)
+        while True:
+            slot_hash, first, count, flags = SLOT.unpack_from(self._buffer, table + slot * SLOT.size)
+            if not flags or slot_hash == hashed:
+                return first, count, flags
+            slot = (slot + 1) & (slot_count - 1)
+
+    def _lookup(self, key):
+        """(ids of the keywords whose key hashes like key, whether longer keywords start with it)"""
+        first, count, flags = self._probe(self._slots, self.slot_count, word_hash(key))
+        return range(first, first + count), bool(flags & SLOT_PREFIX)
+
+    def _keyword(self, keyword_id):
+        """(text, skill ids) of a keyword"""
+        offset, length, postings, count = KEYWORD.unpack_from(self._buffer, self._keywords + keyword_id * KEYWORD.size)
+        return (self._string(offset, length),
+                struct.unpack_from(f'<{count}I', self._buffer, self._postings + postings * 4))
+
+    def _candidates(self, words, unknown):
+        """Ids of the keywords whose words occur as a run of words; words the vocabulary does not know go to unknown"""
+        prefixes = set()
+        for word in set(words):
+            first, count, flags = self._probe(self._slots, self.slot_count, word_hash(word))
+            yield from range(first, first + count)
+            if flags & SLOT_PREFIX:
+                prefixes.add(word)
+            elif not flags:
+                unknown.append(word)
+        if not prefixes:
+            return
+        # Extend each occurrence of a prefix word while keywords start with the run
+        looked_up = dict.fromkeys(prefixes, True)
+        for start, word in enumerate(words):
+            if word not in prefixes:
+                continue
+            key = word
+            for following in words[start + 1:]:
+                key = f'{key} {following}'
+                prefix = looked_up.get(key)
+                if prefix is None:
+                    keyword_ids, prefix = self._lookup(key)
+                    looked_up[key] = prefix
+                    yield from keyword_ids
+                if not prefix:
+                    break
+
+    def _matches(self, clean_text):
+        """(surface form, skill ids) of every keyword (skill or alias) occurring in preprocessed text, and of typos
+
+        Only words the vocabulary does not know are checked for typos.
+        """
+        unknown = []
+        for keyword_id in self._candidates(TOKEN_PATTERN.findall(clean_text), unknown):
+            keyword, skill_ids = self._keyword(keyword_id)
+            if occurs(clean_text, keyword):
+                yield keyword, skill_ids
+        if self.fuzzy_distance:
+            for word in unknown:
+                if len(word) >= FUZZY_MIN_LENGTHS[0] and not word.isdigit():
+                    skill_ids = self._typo_of(word)
+                    if skill_ids:
+                        yield word, skill_ids
+
+    def _is_inflection(self, word):
+        """Whether word is a known word with a plural, adjective, past or agent ending added, or its singular"""
+        stems = [word[:-len(ending)] for ending in INFLECTIONS if word.endswith(ending)]
+        stems.append(word + 's')
+        return any(self._probe(self._slots, self.slot_count, word_hash(stem))[2] & SLOT_WORD for stem in stems)
+
+    def _typo_of(self, word):
+        """Skill ids of the one-word keyword closest to word within the allowed edits, if there is exactly one
+
+        Looks up the word's deletions in the deletion index and verifies the
+        keywords found with the actual edit distance. Results are cached per
+        word, as the same words recur from document to document.
+        """
+        cache = self._fuzzy_cache
+        if word in cache:
+            return cache[word]
+        if self._is_inflection(word):
+            cache[word] = None
+            return None
+        limit = fuzzy_limit(len(word), self.fuzzy_distance)
+        buffer, bitmap, mask, crc32 = self._buffer, self._fuzzy_bitmap, self._fuzzy_bitmap_mask, zlib.crc32
+        encoded = word.encode()
+        if limit == 1:
+            # Repeated deletions (of a doubled letter) only repeat a probe
+            variants = [encoded] + [encoded[:i] + encoded[i + 1:] for i in range(len(encoded))]
+        else:
+            variants = deletes(encoded, limit)
+        hits = {hashed for hashed in map(crc32, variants)
+                if buffer[bitmap + ((hashed & mask) >> 3)] >> (hashed & 7) & 1}
+        best, best_distance, seen = set(), limit + 1, set()
+        for hashed in hits:
+            first, count, _ = self._probe(self._fuzzy_slots, self.fuzzy_slot_count, hashed)
+            for keyword_id in struct.unpack_from(f'<{count}I', buffer, self._fuzzy_postings + first * 4):
+                if keyword_id in seen:
+                    continue
+                seen.add(keyword_id)
+                keyword, skill_ids = self._keyword(keyword_id)
+                distance = edit_distance(word, keyword, limit)
+                if distance < best_distance:
+                    best, best_distance = {skill_ids}, distance
+                elif distance == best_distance <= limit:
+                    best.add(skill_ids)
+        # Equally close to two different skills: ambiguous
+        result = next(iter(best)) if len(best) == 1 else None
+        if len(cache) >= FUZZY_CACHE_SIZE:
+            cache.clear()
+        cache[word] = result
+        return result
+
+    def encode(self, clean_text, categories=None):
+        """Bitset of the skills found in preprocessed text under their name, an alias or a typo, limited to categories"""
+        bits = 0
+        for _, skill_ids in self._matches(clean_text):
+            for skill_id in skill_ids:
+                bits |= 1 << skill_id
+        return bits if categories is None else bits & self.mask_for(categories)
+
+    def encode_forms(self, clean_text, categories=None):
+        """encode() and the other forms found: (bits, {skill id: {aliases and typos}})
+
+        Skills found only under their own name have no entry.
+        """
+        bits, forms = 0, {}
+        for keyword, skill_ids in self._matches(clean_text):
+            for skill_id in skill_ids:
+                bits |= 1 << skill_id
+                if keyword != self.skill(skill_id).lower():
+                    forms.setdefault(skill_id, set()).add(keyword)
+        if categories is not None:
+            bits &= self.mask_for(categories)
+        return bits, forms
+
+    def surface_forms(self, bits, forms):
+        """{skill: sorted forms} for the skills in bits that encode_forms found under an alias or a typo"""
+        return {self.skill(skill_id): sorted(aliases) for skill_id, aliases in forms.items() if bits >> skill_id & 1}
+
+    def decode(self, bits, categories=None):
+        """{category: [skills]} for a bitset, in taxonomy order
+
+        Every requested category is present, with an empty list when none
+        of its bits are set.
+        """
+        result = {category: [] for category in (self.categories if categories is None else categories)
+                  if category in self.category_ranges}
+        while bits:
+            low = bits & -bits
+            skill_id = low.bit_length() - 1
+            category = self.category_of(skill_id)
+            if category in result:
+                result[category].append(self.skill(skill_id))
+            bits ^= low
+        return result
+
+    def job_profile(self, job_bits, weights=None):
+        """Per-category (job bits, job skill count, weight) for the categories a JD asks for, and their total weight
+
+        weights is a sequence aligned with categories (the baseline weights
+        when None). Computed once per JD and reused for every resume scored
+        against it.
+        """
+        categories = []
+        for category, weight in zip(self.categories, weights or self.weights):
+            start, end = self.category_ranges[category]
+            category_bits = (job_bits >> start) & ((1 << (end - start)) - 1)
+            if category_bits:
+                categories.append((category_bits << start, popcount(category_bits), weight))
+        return tuple(categories), sum(weight for _, _, weight in categories)
+
+    def match_score(self, resume_bits, profile):
+        """Weighted share of the JD's skills found in the resume, 0-100"""
+        categories, total_weight = profile
+        if not total_weight:
+            return 0
+        score = 0
+        for category_bits, count, weight in categories:
+            score += popcount(resume_bits & category_bits) / count * weight
+        return score / total_weight * 100
+
+
+class SkillVocabularyLoader:
+    """The current SkillVocabulary of this process, reloaded when its file changes
+
+    Outside an app (scripts, benchmarks) the bundled taxonomy is compiled
+    in memory instead.
+    """
+
+    def __init__(self):
+        self.taxonomy_path = TAXONOMY_PATH
+        self.path = None
+        self.check_interval = 5.0
+        self.fuzzy_distance = 0
+        self._vocab = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loaded_at = None
+        self.last_error = None
+
+    def configure(self, app):
+        self.taxonomy_path = app.config.get('SKILL_TAXONOMY_PATH') or TAXONOMY_PATH
+        self.path = app.config.get('SKILL_VOCAB_PATH') or os.path.join(app.instance_path, 'skill_vocab.bin')
+        self.check_interval = app.config.get('SKILL_VOCAB_CHECK_SECONDS', self.check_interval)
+        self.fuzzy_distance = app.config.get('SKILL_FUZZY_DISTANCE', self.fuzzy_distance)
+        # First start, a taxonomy edited since the last compile, or a file of an older format
+        if (not os.path.exists(self.path) or os.stat(self.taxonomy_path).st_mtime > os.stat(self.path).st_mtime
+                or not is_vocabulary(self.path)):
+            write_vocabulary(self.taxonomy_path, self.path)
+        with self._lock:
+            self._vocab = None
+            self._mtime = None
+        self.reload(raise_errors=True)
+
+    def current(self):
+        """The vocabulary to match with; reloaded first if the file changed"""
+        vocab = self._vocab
+        if vocab is None or (self.path and time.monotonic() - self._checked_at >= self.check_interval):
+            self.reload(raise_errors=vocab is None)
+            vocab = self._vocab
+        return vocab
+
+    def reload(self, raise_errors=False):
+        """Map the vocabulary file again if it changed since it was loaded; returns whether it was swapped"""
+        # One thread checks; the others keep matching with the current vocabulary
+        if not self._lock.acquire(blocking=self._vocab is None):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                if self.path is None:
+                    if self._vocab is not None:
+                        return False
+                    mtime, vocab = None, SkillVocabulary(compile_vocabulary(load_taxonomy(self.taxonomy_path)),
+                                                   fuzzy_distance=self.fuzzy_distance)
+                else:
+                    mtime = os.stat(self.path).st_mtime_ns
+                    if mtime == self._mtime and self._vocab is not None:
+                        return False
+                    vocab = SkillVocabulary.open(self.path, self.fuzzy_distance)
+            except (OSError, ValueError, struct.error) as e:
+                self.last_error = f'{self.path or self.taxonomy_path}: {e}'
+                print(f"Skill vocabulary not reloaded: {self.last_error}")
+                if raise_errors:
+                    raise
+                return False
+            self._vocab, self._mtime = vocab, mtime
+            self.loaded_at = datetime.utcnow()
+            self.last_error = None
+            return True
+        finally:
+            self._lock.release()
+
+    def status(self):
+        vocab = self._vocab
+        return {
+            'version': vocab.version if vocab else None,
+            'skills': vocab.skill_count if vocab else None,
+            'aliases': vocab.alias_count if vocab else None,
+            'fuzzy_distance': vocab.fuzzy_distance if vocab else None,
+            'bytes': vocab.size if vocab else None,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            # Public: whether the last reload failed, not where or why (that is printed to the log)
+            'reload_failed': self.last_error is not None
+        }
+
+
+skill_vocab = SkillVocabularyLoader()
+
+
+@skills_cli.command('compile')
+@click.option('--taxonomy', 'taxonomy_path', type=click.Path(exists=True, dir_okay=False),
+              help='Taxonomy file (default SKILL_TAXONOMY_PATH).')
+@click.option('--output', 'output_path', type=click.Path(dir_okay=False),
+              help='Vocabulary file (default SKILL_VOCAB_PATH).')
+def compile_command(taxonomy_path, output_path):
+    """Compile the skill taxonomy; running workers pick the new file up on their next check"""
+    taxonomy_path = taxonomy_path or current_app.config.get('SKILL_TAXONOMY_PATH') or TAXONOMY_PATH
+    output_path = output_path or skill_vocab.path
+    try:
+        vocab = write_vocabulary(taxonomy_path, output_path)
+    except ValueError as e:
+        raise click.ClickException(f'invalid taxonomy: {e}')
+    click.echo(f'compiled taxonomy {vocab.version}: {vocab.skill_count} skills in '
+               f'{len(vocab.categories)} categories, {vocab.alias_count} aliases, {vocab.size} bytes -> {output_path}')
@@ -178,6 +178,43 @@ def test_user_resumes(cookies):
     
     print(f"✅ User resumes passed - Found {len(data['resumes'])} resumes")
 
+def test_api_tokens(cookies):
+    """Test issuing, using, scoping and revoking API tokens"""
+    print("🔍 Testing API tokens...")
+    response = requests.post(f"{BASE_URL}/auth/tokens", json={"name": "ci", "scopes": ["search"]}, cookies=cookies)
+    assert response.status_code == 201
+    data = response.json()
+    token, token_id = data['token'], data['token_info']['id']
+    assert token.startswith('rat_')
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = requests.get(f"{BASE_URL}/auth/check-auth", headers=headers)
+    assert response.json()['authenticated'] == True
+    assert response.json()['user']['username'] == 'testuser2'
+    
+    # Scopes the token does not hold, and password-only endpoints, are forbidden
+    assert requests.get(f"{BASE_URL}/search", params={"q": "python"}, headers=headers).status_code == 200
+    assert requests.get(f"{BASE_URL}/auth/profile", headers=headers).status_code == 403
+    assert requests.get(f"{BASE_URL}/history", headers=headers).status_code == 403
+    response = requests.post(f"{BASE_URL}/auth/change-password", headers=headers,
+                             json={"current_password": "password123", "new_password": "password456"})
+    assert response.status_code == 403
+    assert requests.post(f"{BASE_URL}/auth/tokens", json={}, headers=headers).status_code == 403
+    
+    # A tampered signature, or one that is not ASCII, is no token at all
+    for bad_token in (token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB'), token + 'é'):
+        response = requests.get(f"{BASE_URL}/auth/check-auth",
+                                headers={"Authorization": f"Bearer {bad_token}".encode('utf-8')})
+        assert response.status_code == 200
+        assert response.json()['authenticated'] == False
+    
+    response = requests.delete(f"{BASE_URL}/auth/tokens/{token_id}", cookies=cookies)
+    assert response.status_code == 200
+    response = requests.get(f"{BASE_URL}/auth/check-auth", headers=headers)
+    assert response.json()['authenticated'] == False
+    
+    print("✅ API tokens passed")
+
 def run_all_tests():
     """Run all tests in sequence"""
     print("🚀 Starting comprehensive test suite for AI Resume Analyzer")
@@ -196,6 +233,7 @@ def run_all_tests():
         analysis_result = test_resume_analysis(login_cookies)
         test_analysis_history(login_cookies)
         test_user_resumes(login_cookies)
+        test_api_tokens(login_cookies)
         
         print("\n" + "=" * 60)
         print("🎉 ALL TESTS PASSED! The AI Resume Analyzer is fully functional!")
@@ -209,6 +247,7 @@ def run_all_tests():
         print("✅ Resume analysis with database saving")
         print("✅ Analysis history retrieval")
         print("✅ User resume management")
+        print("✅ API token scopes and revocation")
         
         print(f"\n📊 Sample Analysis Results:")
         if 'analysis' in analysis_result:
@@ -5,6 +5,10 @@ Test script for the resume analyzer functionality
 
 import sys
 import os
+import re
+import json
+import tempfile
+from datetime import datetime, timedelta
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.routes.analyzer import (
@@ -14,6 +18,13 @@ from src.routes.analyzer import (
     calculate_similarity,
     analyze_resume_job_match
 )
+from src.utils.analysis_engine import analysis_engine
+from src.utils.job_titles import TitleMatcher
+from src.utils.pagination import decode_cursor, encode_cursor, keyset_page
+from src.utils.rate_limit import MemoryBucketStore, RateLimiter, SQLiteBucketStore, refill
+from src.utils.skill_database import SKILL_DATABASE, get_job_family, get_skill_weight, load_taxonomy
+from src.utils.skill_vocab import (SkillVocabulary, SkillVocabularyLoader, TaxonomyError, compile_vocabulary,
+                                   write_vocabulary)
 
 def test_basic_functionality():
     """Test basic NLP functions"""
@@ -108,12 +119,320 @@ def test_edge_cases():
     
     return True
 
+def test_analyzer_tiers():
+    """Test tier selection in the analysis engine"""
+    print("\n=== Testing Analyzer Tiers ===")
+    
+    resume = "Python developer with React and AWS experience"
+    job = "Software Engineer needed with Python, React, AWS and Docker"
+    
+    for tier in ['full', 'keyword']:
+        result = analysis_engine.analyze(resume, job, tier=tier)
+        assert result['tier'] == tier
+        assert result['degraded'] is False
+        print(f"{tier} tier skill match: {result['skill_match_score']}%")
+    
+    # Unknown tiers are rejected
+    try:
+        analysis_engine.analyze(resume, job, tier='unknown')
+        raise AssertionError("Unknown tier should raise ValueError")
+    except ValueError:
+        print("Unknown tier rejected: OK")
+    
+    # An overloaded worker steps down to the keyword tier
+    controller = analysis_engine.controller
+    original_depth = controller.max_queue_depth
+    controller.configure(max_queue_depth=0)
+    try:
+        result = analysis_engine.analyze(resume, job, tier='full')
+        assert result['tier'] == 'keyword'
+        assert result['degraded'] is True
+        print("Degradation under load: OK")
+    finally:
+        controller.configure(max_queue_depth=original_depth)
+    
+    return True
+
+def test_bitset_scoring():
+    """Test that vocabulary bitsets find and score skills like per-keyword regex searches"""
+    print("\n=== Testing Bitset Skill Scoring ===")
+    
+    # Without aliases and typos, which the regex searches do not know
+    vocab = SkillVocabulary(compile_vocabulary(dict(load_taxonomy(), aliases={})))
+    resume = preprocess_text("Go and C++ developer: Node.js, JavaScript (not Java), R, CI/CD, AWS, "
+                             "machine learning, scikit-learn, Git; react-native apps")
+    job = preprocess_text("Need Java, JavaScript, Node.js, Python, Docker, Kubernetes, Git and CI/CD")
+    
+    for text in (resume, job):
+        expected = {category: {skill for skill in data['keywords']
+                               if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text)}
+                    for category, data in SKILL_DATABASE.items()}
+        found = {category: set(skills) for category, skills in vocab.decode(vocab.encode(text)).items()}
+        assert found == expected, (found, expected)
+    print("Extraction matches regex searches: OK")
+    
+    # The weighted score of the previous per-category set intersections
+    resume_sets = {category: set(skills) for category, skills in vocab.decode(vocab.encode(resume)).items()}
+    job_sets = {category: set(skills) for category, skills in vocab.decode(vocab.encode(job)).items()}
+    score = total = 0
+    for category, job_skills in job_sets.items():
+        if job_skills:
+            weight = get_skill_weight(category)
+            score += len(resume_sets[category] & job_skills) / len(job_skills) * weight
+            total += weight
+    bits_score = vocab.match_score(vocab.encode(resume), vocab.job_profile(vocab.encode(job)))
+    assert abs(bits_score - score / total * 100) < 1e-9
+    print(f"Bitset score matches set score: {bits_score:.2f}%")
+    
+    return True
+
+def test_compiled_vocabulary():
+    """Test compiling the taxonomy to a file, memory-mapping it and swapping in a recompiled file"""
+    print("\n=== Testing Compiled Vocabulary ===")
+    
+    directory = tempfile.mkdtemp()
+    taxonomy_path = os.path.join(directory, 'taxonomy.json')
+    vocab_path = os.path.join(directory, 'skill_vocab.bin')
+    taxonomy = load_taxonomy()
+    taxonomy['categories']['programming_languages']['skills'].append('zig')
+    taxonomy['version'] = 'test-1'
+    with open(taxonomy_path, 'w') as f:
+        json.dump(taxonomy, f)
+    
+    text = preprocess_text("Zig, Python and PostgreSQL")
+    in_memory = SkillVocabulary(compile_vocabulary(taxonomy))
+    mapped = write_vocabulary(taxonomy_path, vocab_path)
+    assert SkillVocabulary.open(vocab_path).encode(text) == mapped.encode(text) == in_memory.encode(text)
+    assert 'zig' in mapped.decode(mapped.encode(text))['programming_languages']
+    print(f"Mapped file ({mapped.size} bytes) matches in-memory compile: OK")
+    
+    # Malformed taxonomies are rejected at compile time
+    for broken in ({'version': '', 'categories': {'a': {'skills': ['x']}}},
+                   {'version': '1', 'categories': {'a': {'skills': ['+++']}}},
+                   dict(taxonomy, aliases={'no such skill': ['nss']})):
+        try:
+            compile_vocabulary(broken)
+            raise AssertionError(f"Taxonomy should be rejected: {broken}")
+        except TaxonomyError:
+            pass
+    print("Malformed taxonomies rejected: OK")
+    
+    # Workers pick up a recompiled file, and keep the last good one over a broken file
+    loader = SkillVocabularyLoader()
+    loader.taxonomy_path, loader.path, loader.check_interval = taxonomy_path, vocab_path, 0
+    assert loader.current().version == 'test-1'
+    taxonomy['version'] = 'test-2'
+    with open(taxonomy_path, 'w') as f:
+        json.dump(taxonomy, f)
+    write_vocabulary(taxonomy_path, vocab_path)
+    os.utime(vocab_path, ns=(0, os.stat(vocab_path).st_mtime_ns + 10 ** 9))
+    assert loader.current().version == 'test-2'
+    with open(vocab_path + '.tmp', 'wb') as f:
+        f.write(b'not a vocabulary')
+    os.replace(vocab_path + '.tmp', vocab_path)
+    assert loader.current().version == 'test-2' and loader.last_error
+    print("Hot swap and broken file fallback: OK")
+    
+    return True
+
+def test_skill_aliases():
+    """Test that aliases set their canonical skill and are reported as surface forms"""
+    print("\n=== Testing Skill Aliases ===")
+    
+    vocab = SkillVocabulary(compile_vocabulary(load_taxonomy()))
+    text = preprocess_text("Deployed on K8s with Postgres; C Sharp and sklearn. Kubernetes certified.")
+    bits, forms = vocab.encode_forms(text)
+    skills = vocab.decode(bits)
+    assert 'kubernetes' in skills['cloud_platforms']
+    assert 'postgresql' in skills['databases']
+    assert 'c#' in skills['programming_languages']
+    assert 'scikit-learn' in skills['data_science']
+    # Forms of a skill also found under its own name still list the alias
+    surface = vocab.surface_forms(bits, forms)
+    assert surface == {'kubernetes': ['k8s'], 'postgresql': ['postgres'], 'c#': ['c sharp'], 'scikit-learn': ['sklearn']}, surface
+    print(f"Surface forms: {surface}")
+    
+    # Aliases match whole words only
+    assert vocab.encode(preprocess_text("k8ss postgresx csharpy")) == 0
+    print("Alias word boundaries: OK")
+    
+    # Ordinary words and the end of dotted names are not aliases
+    for sentence in ("Be the backbone of our support team and carry the torch",
+                     "Unreal deadlines fanned the last ember of the project",
+                     "Node.js, Vue.js and Next.js"):
+        skills = vocab.decode(vocab.encode(preprocess_text(sentence)))
+        assert not skills['programming_languages'] and not skills['data_science'], skills
+        assert set(skills['web_technologies']) <= {'node.js', 'vue', 'next.js'}, skills
+    print("Common words set no skills: OK")
+    
+    # An alias of two skills, one that is itself a skill, a common word or a
+    # word of another skill's name is rejected
+    taxonomy = load_taxonomy()
+    for aliases in ({'python': ['snake'], 'java': ['snake']}, {'python': ['java']},
+                    {'pytorch': ['torch']}, {'backbone.js': ['Backbone']}, {'javascript': ['js']}):
+        try:
+            compile_vocabulary(dict(taxonomy, aliases=aliases))
+            raise AssertionError(f"Aliases should be rejected: {aliases}")
+        except TaxonomyError:
+            pass
+    print("Conflicting aliases rejected: OK")
+    
+    return True
+
+def test_typo_matching():
+    """Test that misspelt skill names are matched only when typo matching is on, and ordinary words never are"""
+    print("\n=== Testing Typo Matching ===")
+    
+    data = compile_vocabulary(load_taxonomy())
+    text = preprocess_text("Kubernates, tensorflw and dockerr in production")
+    assert SkillVocabulary(data).encode(text) == 0
+    print("Off by default: OK")
+    
+    vocab = SkillVocabulary(data, fuzzy_distance=1)
+    bits, forms = vocab.encode_forms(text)
+    surface = vocab.surface_forms(bits, forms)
+    assert surface == {'kubernetes': ['kubernates'], 'tensorflow': ['tensorflw'], 'docker': ['dockerr']}, surface
+    print(f"Typos found: {surface}")
+    
+    # Inflections of known words, excluded words and short words are left alone
+    for word in ('reacts', 'swifty', 'shelly', 'sparky', 'jenkin', 'string', 'sprint', 'closure', 'monitoring', 'rusty'):
+        assert vocab.encode(word) == 0, word
+    print("Ordinary words left alone: OK")
+    
+    return True
+
+def test_title_matching():
+    """Test that job titles match whole words, plurals and the longest title at each position"""
+    print("\n=== Testing Job Title Matching ===")
+    
+    for text, family in (("Senior Software Engineers wanted", 'software_engineering'),
+                         ("Big-data analysts", 'data_science'),
+                         ("GUI designer for a doctor's practice", 'general'),
+                         ("Hiring a CTO", 'software_engineering')):
+        assert get_job_family(text) == family, (text, get_job_family(text))
+    print("Whole words and plurals: OK")
+    
+    matcher = TitleMatcher({'machine learning engineer': 'ml', 'learning engineer': 'education', 'data analyst': 'data'})
+    assert matcher.families("Senior Machine Learning Engineer") == ('ml',)
+    text = "Learning engineer, then data analysts and a machine learning engineer"
+    assert matcher.families(text) == ('education', 'data', 'ml')
+    # A second classification of the same text is served from the memo
+    assert matcher.families(text) is matcher.families(text)
+    print("Longest title first, in order of mention: OK")
+    
+    for titles in ({'c++ developer': 'x'}, {'Data Analyst': 'data', 'data analyst': 'ml'}):
+        try:
+            TitleMatcher(titles)
+            raise AssertionError(f"Titles should be rejected: {titles}")
+        except ValueError:
+            pass
+    print("Invalid titles rejected: OK")
+    
+    return True
+
+def test_keyset_pagination():
+    """Test that cursors round-trip and a cursor walk returns every row once, newest first"""
+    print("\n=== Testing Keyset Pagination ===")
+    from sqlalchemy import Column, DateTime, Integer, create_engine
+    from sqlalchemy.orm import Session, declarative_base
+    
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for cursor in ('', 'not a cursor', encode_cursor(created_at, 42)[:-3], 'WyJ4IiwxXQ'):
+        try:
+            decode_cursor(cursor)
+            raise AssertionError(f"Cursor should be rejected: {cursor!r}")
+        except ValueError:
+            pass
+    print("Cursor round trip and invalid cursors: OK")
+    
+    Base = declarative_base()
+    
+    class Row(Base):
+        __tablename__ = 'rows'
+        id = Column(Integer, primary_key=True)
+        created_at = Column(DateTime, nullable=False)
+    
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # Rows share timestamps, so the id must break ties
+        session.add_all(Row(id=i, created_at=created_at + timedelta(seconds=i // 3)) for i in range(1, 24))
+        session.commit()
+        
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(session.query(Row), Row.created_at, Row.id, cursor, per_page=5)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+        assert seen == list(range(23, 0, -1)), seen
+    print(f"Cursor walk of {len(seen)} rows: OK")
+    
+    return True
+
+def test_rate_limiting():
+    """Test token-bucket refill, and that an exhausted bucket gets 429 with Retry-After"""
+    print("\n=== Testing Rate Limiting ===")
+    from flask import Flask
+    from flask_login import LoginManager
+    
+    assert refill(0, 100.0, 104.0, 0.5, 10) == 2.0
+    assert refill(3, 100.0, 200.0, 0.5, 10) == 10
+    assert refill(3, 100.0, 99.0, 0.5, 10) == 3  # a clock step back adds nothing
+    print("Refill: OK")
+    
+    # One token every 2 seconds, burst of 3
+    for store in (MemoryBucketStore(), SQLiteBucketStore(os.path.join(tempfile.mkdtemp(), 'rate_limit.db'))):
+        decisions = [store.take('analyze:ip:1', 0.5, 3) for _ in range(4)]
+        assert [allowed for allowed, _ in decisions] == [True, True, True, False]
+        assert 1.9 < decisions[-1][1] <= 2.0, decisions[-1]
+        assert store.take('analyze:ip:2', 0.5, 3)[0]  # buckets are per key
+        # A request one bucket rejects takes no token from the others
+        assert store.take_all([('analyze:user:1', 0.5, 3), ('analyze:ip:1', 0.5, 3)])[0] == 1
+        assert [store.take('analyze:user:1', 0.5, 3)[0] for _ in range(4)] == [True, True, True, False]
+        print(f"{type(store).__name__} burst then reject: OK")
+    
+    app = Flask(__name__)
+    app.config['RATE_LIMITS'] = {'analyze': {'ip': {'per_minute': 6, 'burst': 2}}}
+    LoginManager(app).user_loader(lambda user_id: None)
+    limiter = RateLimiter()
+    limiter.configure(app)
+    app.add_url_rule('/analyze', 'analyze', limiter.limit('analyze')(lambda: 'ok'))
+    client = app.test_client()
+    statuses = [client.get('/analyze') for _ in range(3)]
+    assert [response.status_code for response in statuses] == [200, 200, 429]
+    assert statuses[-1].headers['Retry-After'] == '10'
+    assert statuses[-1].get_json()['limit'] == 'ip'
+    assert limiter.status()['endpoints']['analyze'] == {'allowed': 2, 'rejected_ip': 1}
+    print("429 with Retry-After: OK")
+    
+    # Requests turned away by the concurrency cap take no tokens
+    app.config['RATE_LIMITS'] = {'analyze': {'ip': {'per_minute': 6, 'burst': 2}, 'concurrency': 1}}
+    limiter.configure(app)
+    limiter._semaphores['analyze'].acquire()
+    assert [client.get('/analyze').status_code for _ in range(3)] == [429, 429, 429]
+    limiter._semaphores['analyze'].release()
+    assert [client.get('/analyze').status_code for _ in range(3)] == [200, 200, 429]
+    assert limiter.status()['endpoints']['analyze'] == {'rejected_concurrency': 3, 'allowed': 2, 'rejected_ip': 1}
+    print("Rejected requests take no tokens: OK")
+    
+    return True
+
 if __name__ == "__main__":
     print("Starting Resume Analyzer Tests...")
     
     try:
         test_basic_functionality()
         test_edge_cases()
+        test_analyzer_tiers()
+        test_bitset_scoring()
+        test_compiled_vocabulary()
+        test_skill_aliases()
+        test_typo_matching()
+        test_title_matching()
+        test_keyset_pagination()
+        test_rate_limiting()
         print("\n=== All Tests Completed Successfully! ===")
     except Exception as e:
         print(f"\n=== Test Failed: {e} ===")
@@ -0,0 +1,212 @@
+"""
+Write-behind persistence for analysis results
+
+When ANALYSIS_WRITE_BEHIND is enabled, /api/analyze returns as soon as the
+analysis is computed. The row id is pre-allocated from a block reserved in
+the id_sequence table, and the Resume/JobDescription/Analysis rows are queued
+for a background thread that commits them in batches.
+
+Durability guarantees:
+- A queued analysis is held only in this worker's memory until its batch
+  commits, at most ANALYSIS_WRITE_BEHIND_INTERVAL seconds after it was queued
+  (sooner once ANALYSIS_WRITE_BEHIND_BATCH_SIZE rows are waiting).
+- The queue is flushed on normal interpreter shutdown (atexit). A crash or
+  SIGKILL loses analyses that were acknowledged but not yet committed.
+- The queue is bounded; when it is full the request falls back to a
+  synchronous write, so memory use and the loss window stay bounded. That
+  write uses an allocated id as well, so it never takes an id of a block
+  whose rows are still queued; if no id can be allocated the analysis is
+  returned without being saved.
+- A batch that fails to commit is retried row by row so one bad row does not
+  drop the rest; rows that still fail are logged and discarded.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from sqlalchemy import text
+from src.models import db
+
+
+class IdAllocator:
+    """Hand out primary keys from blocks reserved in the id_sequence table"""
+
+    def __init__(self, table_name, block_size=100):
+        self.table_name = table_name
+        self.block_size = block_size
+        self.next_value = 0
+        self.limit = 0
+        self.lock = threading.Lock()
+
+    def next_id(self):
+        """Return an id that no other worker will use
+
+        Rows inserted without an explicit id get the table's next rowid, which
+        may be an id of a block whose rows are still queued; while write-behind
+        is enabled every insert takes its id from here.
+        """
+        with self.lock:
+            if self.next_value >= self.limit:
+                self._reserve_block()
+            value = self.next_value
+            self.next_value += 1
+            return value
+
+    def _reserve_block(self):
+        """Reserve the next block of ids in one short write transaction"""
+        # Never hand out ids below the table's current maximum, so blocks stay
+        # clear of rows written synchronously while write-behind was disabled,
+        # nor below its AUTOINCREMENT sequence, so ids of rows moved out of the
+        # table (archived analyses) are not reused.
+        max_id = (f"(SELECT MAX(COALESCE(MAX(id), 0), COALESCE((SELECT seq FROM sqlite_sequence "
+                  f"WHERE name = '{self.table_name}'), 0)) + 1 FROM {self.table_name})")
+        with db.engine.begin() as conn:
+            conn.execute(
+                text(f"INSERT OR IGNORE INTO id_sequence (name, next_value) SELECT :name, {max_id}"),
+                {'name': self.table_name}
+            )
+            conn.execute(
+                text(f"UPDATE id_sequence SET next_value = MAX(next_value, {max_id}) + :size "
+                     "WHERE name = :name"),
+                {'name': self.table_name, 'size': self.block_size}
+            )
+            end = conn.execute(
+                text("SELECT next_value FROM id_sequence WHERE name = :name"),
+                {'name': self.table_name}
+            ).scalar()
+        self.next_value = end - self.block_size
+        self.limit = end
+
+
+class WriteBehindWriter:
+    """Queue persistence jobs and commit them in batches on a background thread"""
+
+    def __init__(self, persist_func, batch_size=50, flush_interval=1.0, max_queue=1000):
+        self.persist_func = persist_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.app = None
+        self.queue = None
+        self.thread = None
+        self.pending_ids = set()
+        self.lock = threading.Lock()
+        self.stats = {'queued': 0, 'committed': 0, 'failed': 0, 'batches': 0}
+
+    @property
+    def enabled(self):
+        """Whether the background writer is running"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def configure(self, app):
+        """Start the writer if ANALYSIS_WRITE_BEHIND is enabled in the app config"""
+        if not app.config.get('ANALYSIS_WRITE_BEHIND') or self.enabled:
+            return
+
+        self.app = app
+        self.batch_size = app.config.get('ANALYSIS_WRITE_BEHIND_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('ANALYSIS_WRITE_BEHIND_INTERVAL', self.flush_interval)
+        self.max_queue = app.config.get('ANALYSIS_WRITE_BEHIND_MAX_QUEUE', self.max_queue)
+        self.queue = queue.Queue(maxsize=self.max_queue)
+        self.thread = threading.Thread(target=self._run, name='analysis-write-behind', daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, job_id, job):
+        """Queue a job; returns False when the queue is full and the caller must write synchronously"""
+        with self.lock:
+            self.pending_ids.add(job_id)
+        try:
+            self.queue.put_nowait((job_id, job))
+        except queue.Full:
+            with self.lock:
+                self.pending_ids.discard(job_id)
+            return False
+
+        with self.lock:
+            self.stats['queued'] += 1
+        return True
+
+    def is_pending(self, job_id):
+        """Whether a job has been acknowledged but not yet committed"""
+        with self.lock:
+            return job_id in self.pending_ids
+
+    def flush(self):
+        """Block until every queued job has been committed or discarded"""
+        if self.queue is not None:
+            self.queue.join()
+
+    def stop(self):
+        """Flush the queue and stop the background thread"""
+        if not self.enabled:
+            return
+        self.queue.put(None)
+        self.thread.join()
+
+    def status(self):
+        """Queue depth and counters for status reporting"""
+        with self.lock:
+            return dict(self.stats,
+                        enabled=self.enabled,
+                        queue_depth=self.queue.qsize() if self.queue is not None else 0)
+
+    def _run(self):
+        """Collect jobs into batches and commit them until stopped"""
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch = []
+            flush_at = time.monotonic() + self.flush_interval
+
+            # Gather rows until the batch is full or the flush interval passes
+            while item is not None:
+                batch.append(item)
+                remaining = flush_at - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            else:
+                stopping = True
+                self.queue.task_done()
+
+            if batch:
+                self._commit_batch(batch)
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _commit_batch(self, batch):
+        """Commit a batch in one transaction, retrying row by row on failure"""
+        with self.app.app_context():
+            try:
+                for _, job in batch:
+                    self.persist_func(job)
+                db.session.commit()
+                self._finish(batch, 'committed')
+                with self.lock:
+                    self.stats['batches'] += 1
+                return
+            except Exception as e:
+                db.session.rollback()
+                print(f"Write-behind batch failed, retrying individually: {e}")
+
+            for item in batch:
+                try:
+                    self.persist_func(item[1])
+                    db.session.commit()
+                    self._finish([item], 'committed')
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Write-behind dropped analysis {item[0]}: {e}")
+                    self._finish([item], 'failed')
+
+    def _finish(self, batch, outcome):
+        """Clear pending ids and update counters"""
+        with self.lock:
+            for job_id, _ in batch:
+                self.pending_ids.discard(job_id)
+            self.stats[outcome] += len(batch)